@@ -1,5 +1,8 @@
 import os
+import time
+import uuid
 
+import structlog
 import uvicorn
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
@@ -7,12 +10,25 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.cors import CORSMiddleware
 
 import walking_on_sunshine.api.app_router as app_router
+from walking_on_sunshine.api.config import Config
+from walking_on_sunshine.api.metrics import HTTP_IN_FLIGHT, HTTP_REQUESTS, HTTP_SECONDS
+from walking_on_sunshine.api.route_pool import RoutePool
 from walking_on_sunshine.app.app import App
+from walking_on_sunshine.common.logging.logger import get_logger
+from walking_on_sunshine.common.logging.spans import collect_spans, server_timing, summarize_spans
+
+logger = get_logger(__name__)
 
 
 class API:
-    def __init__(self, app: App):
+    def __init__(self, app: App, config: Config | None = None):
         self.app = app
+        self.config = config or Config()
+        self.route_pool = RoutePool(
+            max_workers=self.config.route_workers,
+            max_queue=self.config.route_queue_size,
+            retry_after_s=self.config.route_retry_after_s,
+        )
         self.fast_api = FastAPI()
 
         # Get the absolute path to the frontend directory
@@ -21,10 +37,8 @@ class API:
             "frontend/src",
         )
 
-        # Print debug info about static files path
         static_path = os.path.join(frontend_path, "assets")
-        print(f"Mounting static files from: {static_path}")
-        print(f"Does path exist? {os.path.exists(static_path)}")
+        logger.debug("Mounting static files", path=static_path, exists=os.path.exists(static_path))
 
         # Mount static files
         self.fast_api.mount(
@@ -41,7 +55,9 @@ class API:
             allow_methods=["*"],
             allow_headers=["*"],
         )
-        self.fast_api.add_middleware(AppMiddleware, app=self.app)
+        self.fast_api.add_middleware(AppMiddleware, app=self.app, route_pool=self.route_pool)
+        self.fast_api.add_middleware(TimingMiddleware)
+        self.fast_api.add_middleware(MetricsMiddleware)
         self.fast_api.include_router(app_router.router)
         self.fast_api.add_middleware(
             CORSMiddleware,
@@ -60,11 +76,64 @@ class API:
 
 
 class AppMiddleware(BaseHTTPMiddleware):
-    def __init__(self, asgi_app, app: App):
+    def __init__(self, asgi_app, app: App, route_pool: RoutePool):
         super().__init__(asgi_app)
         self.my_app = app
+        self.route_pool = route_pool
 
     async def dispatch(self, request, call_next):
         request.state.app = self.my_app
+        request.state.route_pool = self.route_pool
         response = await call_next(request)
         return response
+
+
+class TimingMiddleware(BaseHTTPMiddleware):
+    """
+    Binds a request id for structlog, collects the stage spans recorded while handling the request,
+    and returns them in a Server-Timing header. Streaming endpoints send their headers before the later stages
+    run, so they set request.state.timing_in_stream and report the spans in their final event instead.
+    """
+
+    async def dispatch(self, request, call_next):
+        request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+        start = time.perf_counter()
+        request.state.started_at = start
+        with structlog.contextvars.bound_contextvars(request_id=request_id), collect_spans() as spans:
+            request.state.spans = spans
+            response = await call_next(request)
+            total_ms = (time.perf_counter() - start) * 1000
+            timing_in_stream = getattr(request.state, "timing_in_stream", False)
+            if spans and not timing_in_stream:
+                logger.info(
+                    "request timing",
+                    path=request.url.path,
+                    status=response.status_code,
+                    total_ms=round(total_ms, 1),
+                    stages=summarize_spans(spans),
+                )
+        if not timing_in_stream:
+            response.headers["Server-Timing"] = server_timing(spans, total_ms)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """
+    Counts requests and records their latency per route template (/routes/{route_id}/map, not each id).
+    """
+
+    async def dispatch(self, request, call_next):
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = request.scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            HTTP_SECONDS.observe(time.perf_counter() - start, route_path, request.method)
+            HTTP_REQUESTS.inc(route_path, request.method, status)
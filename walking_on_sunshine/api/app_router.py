@@ -1,8 +1,22 @@
+import asyncio
+import json
 import os
+import time
+from concurrent.futures import Future
 
-from fastapi import APIRouter, Request
-from fastapi.responses import FileResponse
-from starlette.responses import JSONResponse
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+
+from walking_on_sunshine.api.metrics import state_metrics
+from walking_on_sunshine.api.route_pool import PoolSaturatedError, RoutePool
+from walking_on_sunshine.app.geometry import CoordFormat, format_coords
+from walking_on_sunshine.common.logging.logger import get_logger
+from walking_on_sunshine.common.logging.spans import span, summarize_spans
+from walking_on_sunshine.common.metrics.registry import REGISTRY
+
+logger = get_logger(__name__)
 
 router = APIRouter()
 
@@ -14,14 +28,29 @@ async def serve_frontend():
 
 
 @router.get("/generate_route")
-async def generate_route(request: Request, album_name: str, start_address: str, album_id: str | None = None):
-    print(f"Received request with album_name: {album_name}, start_address: {start_address}")
+async def generate_route(
+    request: Request,
+    album_name: str,
+    start_address: str,
+    album_id: str | None = None,
+    seed: int | None = None,
+    reroll: bool = False,
+    embed_map: bool = False,
+    coord_format: CoordFormat = Query("objects", alias="format"),
+    precision: int = Query(5, ge=1, le=7),
+    full_geometry: bool = False,
+):
+    logger.info("generate_route", album_name=album_name, start_address=start_address)
     app = request.state.app
+    route_pool = request.state.route_pool
     try:
-        result = app.run(album_name, start_address, album_id)
-        print(f"Success response: {result}")
-        return JSONResponse(
-            {
+        result = await asyncio.wrap_future(
+            route_pool.submit(app.run, album_name, start_address, album_id, seed, reroll, embed_map)
+        )
+        # Full payloads are only logged for the configured sample of requests at debug level
+        logger.debug("generate_route payload", sampled=True, result=result)
+        with span("serialize"):
+            body = {
                 "status": "success",
                 "album_name": result["album_name"],
                 "album_id": result.get("album_id", album_id),
@@ -32,14 +61,24 @@ async def generate_route(request: Request, album_name: str, start_address: str,
                 "release_year": result.get("release_year"),
                 "album_image_url": result.get("album_image_url"),
                 "distance_km": result["distance_km"],
+                "route_distance_km": result.get("route_distance_km"),
+                "length_error": result.get("length_error"),
                 "maps_url": result["maps_url"],
                 "start_address": result.get("start_address", start_address),
-                "route_preview": result.get("route_preview", []),
+                "route_preview": format_coords(result.get("preview_coords", []), coord_format, precision),
+                "route_id": result.get("route_id"),
+                "map_url": result.get("map_url"),
                 "map_embed_html": result.get("map_embed_html"),
+                "seed": result.get("seed"),
             }
-        )
+            if full_geometry:
+                body["route_geometry"] = format_coords(result.get("route_coords", []), coord_format, precision)
+            response = JSONResponse(body)
+        return response
+    except PoolSaturatedError as e:
+        return _saturated_response(route_pool, e)
     except Exception as e:
-        print(f"Error in generate_route: {str(e)}")
+        logger.exception("generate_route failed", error=str(e))
         return JSONResponse(
             {
                 "status": "error",
@@ -49,20 +88,160 @@ async def generate_route(request: Request, album_name: str, start_address: str,
         )
 
 
+def _saturated_response(route_pool: RoutePool, error: PoolSaturatedError) -> JSONResponse:
+    logger.warning("generate_route rejected", error=str(error))
+    return JSONResponse(
+        {
+            "status": "error",
+            "detail": "Route generation is at capacity, please retry shortly.",
+        },
+        status_code=503,
+        headers={"Retry-After": str(route_pool.retry_after_s)},
+    )
+
+
+def _stream_event(stage: str, payload: dict, sse: bool) -> str:
+    if sse:
+        return f"event: {stage}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+    return json.dumps({"event": stage, "data": payload}, separators=(",", ":")) + "\n"
+
+
+@router.get("/generate_route/stream")
+async def generate_route_stream(
+    request: Request,
+    album_name: str,
+    start_address: str,
+    album_id: str | None = None,
+    seed: int | None = None,
+    reroll: bool = False,
+    embed_map: bool = False,
+    coord_format: CoordFormat = Query("objects", alias="format"),
+    precision: int = Query(5, ge=1, le=7),
+    full_geometry: bool = False,
+):
+    """
+    Streaming /generate_route: one event per stage as soon as it completes, so the album card can be shown after
+    the Spotify stage alone. Events are album, start, route, maps and map, then done, or error if a stage fails.
+    Sent as server-sent events when the client accepts text/event-stream, as NDJSON otherwise. The stage timings
+    that other endpoints put in Server-Timing arrive as "timing" in the done or error event.
+    """
+    logger.info("generate_route_stream", album_name=album_name, start_address=start_address)
+    app = request.state.app
+    route_pool = request.state.route_pool
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    request.state.timing_in_stream = True
+    started_at = getattr(request.state, "started_at", time.perf_counter())
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue[tuple[str | None, dict | Future]] = asyncio.Queue()
+
+    def post(item: tuple[str | None, dict | Future]):
+        try:
+            loop.call_soon_threadsafe(events.put_nowait, item)
+        except RuntimeError:
+            # The event loop is gone (server shutting down); the route still finishes and is cached
+            pass
+
+    def on_stage(stage: str, payload: dict):
+        # Runs on the route worker, so coordinate formatting stays off the event loop
+        if stage == "route":
+            route = {
+                "route_id": payload["route_id"],
+                "route_distance_km": payload["route_distance_km"],
+                "length_error": payload["length_error"],
+                "seed": payload["seed"],
+                "route_preview": format_coords(payload["preview_coords"], coord_format, precision),
+            }
+            if full_geometry:
+                route["route_geometry"] = format_coords(payload["route_coords"], coord_format, precision)
+            payload = route
+        post((stage, payload))
+
+    try:
+        future = route_pool.submit(app.run, album_name, start_address, album_id, seed, reroll, embed_map, on_stage)
+    except PoolSaturatedError as e:
+        return _saturated_response(route_pool, e)
+    # Stage events are posted before run returns, so the end marker always comes last
+    future.add_done_callback(lambda f: post((None, f)))
+
+    async def stream():
+        while True:
+            stage, payload = await events.get()
+            if stage is not None:
+                yield _stream_event(stage, payload, sse)
+                continue
+            # Every stage has run by now, unlike when the response headers went out with the first event
+            timing = {
+                "stages": summarize_spans(getattr(request.state, "spans", [])),
+                "total_ms": round((time.perf_counter() - started_at) * 1000, 1),
+            }
+            logger.info("request timing", path=request.url.path, status=200, **timing)
+            error = payload.exception()
+            if error is None:
+                yield _stream_event("done", {"status": "success", "timing": timing}, sse)
+            else:
+                logger.warning("generate_route_stream failed", error=str(error))
+                yield _stream_event("error", {"status": "error", "detail": str(error), "timing": timing}, sse)
+            return
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        # Keep proxies from buffering the events
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/routes/{route_id}/map")
+async def route_map(request: Request, route_id: str):
+    app = request.state.app
+    rendered = await run_in_threadpool(app.render_route_map, route_id)
+    if rendered is None:
+        return JSONResponse({"status": "error", "detail": "Unknown or expired route"}, status_code=404)
+
+    html, etag = rendered
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(html, headers=headers)
+
+
+@router.get("/routes/{route_id}/geometry")
+async def route_geometry(
+    request: Request,
+    route_id: str,
+    coord_format: CoordFormat = Query("objects", alias="format"),
+    precision: int = Query(5, ge=1, le=7),
+):
+    route_coords = request.state.app.route_store.get(route_id)
+    if route_coords is None:
+        return JSONResponse({"status": "error", "detail": "Unknown or expired route"}, status_code=404)
+    return JSONResponse({"route_id": route_id, "route_geometry": format_coords(route_coords, coord_format, precision)})
+
+
 @router.get("/search_albums")
 async def search_albums(request: Request, query: str):
     app = request.state.app
     try:
-        albums = app.album_length.sp.search(f"album:{query}", type="album", limit=10)["albums"]["items"]
-        results = [
-            {
-                "id": album["id"],
-                "name": album["name"],
-                "artist": album["artists"][0]["name"],
-                "image": album["images"][0]["url"] if album["images"] else None,
-            }
-            for album in albums
-        ]
+        results = await run_in_threadpool(app.album_length.search_albums, query)
         return JSONResponse({"results": results})
     except Exception as e:
         return JSONResponse({"results": [], "error": str(e)}, status_code=400)
+
+
+@router.get("/stats")
+async def stats(request: Request):
+    return JSONResponse(
+        {
+            "route_pool": request.state.route_pool.stats(),
+            "caches": request.state.app.cache_stats(),
+            "directions_hedging": request.state.app.hedge_stats(),
+            "http": request.state.app.http_stats(),
+            "single_flight": request.state.app.single_flight_stats(),
+        }
+    )
+
+
+@router.get("/metrics")
+async def metrics(request: Request):
+    text = REGISTRY.render(state_metrics(request.state.app, request.state.route_pool))
+    return Response(text, media_type="text/plain; version=0.0.4; charset=utf-8")
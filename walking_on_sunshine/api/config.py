@@ -1,5 +1,13 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
 
 class Config(BaseModel):
     test: str | None = None
+    route_workers: int = 4
+    route_queue_size: int = 8
+    route_retry_after_s: int = 2
+    log_level: Literal["debug", "info", "warning", "error"] = "info"
+    # Share of generate_route responses logged in full at debug level
+    log_payload_sample_rate: float = 0.0
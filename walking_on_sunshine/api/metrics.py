@@ -0,0 +1,132 @@
+from walking_on_sunshine.api.route_pool import RoutePool
+from walking_on_sunshine.app.app import App
+from walking_on_sunshine.common.metrics.registry import REGISTRY, CallbackMetric
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route template.", ["route", "method", "status"]
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ["route", "method"]
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "HTTP requests currently being handled.")
+
+
+def _cache_stat(app: App, key: str) -> dict[tuple, float]:
+    return {(name,): stats[key] for name, stats in app.cache_stats().items() if key in stats}
+
+
+def _hedge_outcomes(app: App) -> dict[tuple, float]:
+    stats = app.hedge_stats()
+    if stats is None:
+        return {}
+    return {("fired",): stats["hedges_fired"], ("won",): stats["hedges_won"]}
+
+
+def state_metrics(app: App, route_pool: RoutePool) -> list[CallbackMetric]:
+    """
+    Metrics read from the caches, route pool and hedger at scrape time; they already keep their own counters.
+    """
+    metrics = [
+        CallbackMetric(
+            "cache_hits_total",
+            "Cache lookups that found an entry.",
+            "counter",
+            ["cache"],
+            lambda: _cache_stat(app, "hits"),
+        ),
+        CallbackMetric(
+            "cache_narrowed_total",
+            "Prefix cache lookups answered by narrowing a shorter query.",
+            "counter",
+            ["cache"],
+            lambda: _cache_stat(app, "narrowed"),
+        ),
+        CallbackMetric(
+            "cache_misses_total",
+            "Cache lookups that found nothing.",
+            "counter",
+            ["cache"],
+            lambda: _cache_stat(app, "misses"),
+        ),
+        CallbackMetric(
+            "cache_evictions_total",
+            "Entries evicted to stay within max_size.",
+            "counter",
+            ["cache"],
+            lambda: _cache_stat(app, "evictions"),
+        ),
+        CallbackMetric(
+            "cache_stale_hits_total",
+            "Lookups served past their fresh TTL while a background refresh ran.",
+            "counter",
+            ["cache"],
+            lambda: _cache_stat(app, "stale_hits"),
+        ),
+        CallbackMetric(
+            "cache_refresh_errors_total",
+            "Background refreshes that failed, leaving the stale entry in place.",
+            "counter",
+            ["cache"],
+            lambda: _cache_stat(app, "refresh_errors"),
+        ),
+        CallbackMetric(
+            "cache_errors_total",
+            "Cache backend operations that failed and were treated as misses.",
+            "counter",
+            ["cache"],
+            lambda: _cache_stat(app, "errors"),
+        ),
+        CallbackMetric(
+            "cache_entries", "Entries currently cached.", "gauge", ["cache"], lambda: _cache_stat(app, "size")
+        ),
+        CallbackMetric(
+            "route_pool_jobs",
+            "Route generation jobs by state.",
+            "gauge",
+            ["state"],
+            lambda: {(state,): route_pool.stats()[state] for state in ("running", "queued")},
+        ),
+        CallbackMetric(
+            "route_pool_rejected_total",
+            "Route generation jobs rejected with 503.",
+            "counter",
+            [],
+            lambda: {(): route_pool.stats()["rejected"]},
+        ),
+        CallbackMetric(
+            "upstream_http_requests_total",
+            "HTTP requests sent to each upstream, retries included.",
+            "counter",
+            ["upstream"],
+            lambda: {(name,): stats["requests"] for name, stats in app.http_stats().items()},
+        ),
+        CallbackMetric(
+            "upstream_http_connections_total",
+            "New connections (TCP/TLS handshakes) opened to each upstream.",
+            "counter",
+            ["upstream"],
+            lambda: {(name,): stats["connections"] for name, stats in app.http_stats().items()},
+        ),
+        CallbackMetric(
+            "single_flight_coalesced_total",
+            "Upstream calls skipped because an identical call was already in flight.",
+            "counter",
+            ["upstream", "kind"],
+            lambda: {
+                (name, kind): count
+                for name, stats in app.single_flight_stats().items()
+                for kind, count in stats["coalesced_by_kind"].items()
+            },
+        ),
+    ]
+    if app.hedge_stats() is not None:
+        metrics.append(
+            CallbackMetric(
+                "directions_hedges_total",
+                "Hedged directions calls by outcome.",
+                "counter",
+                ["outcome"],
+                lambda: _hedge_outcomes(app),
+            )
+        )
+    return metrics
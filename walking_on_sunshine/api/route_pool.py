@@ -0,0 +1,91 @@
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from walking_on_sunshine.common.logging.spans import record_span, submit_with_context
+
+
+class PoolSaturatedError(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class RoutePool:
+    """
+    Bounded thread pool for blocking route generation work.
+    Accepts at most `max_workers` running plus `max_queue` waiting jobs and rejects
+    anything beyond that instead of queueing it without limit.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 8, retry_after_s: int = 2):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after_s = retry_after_s
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="route")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total_s = 0.0
+        self._wait_max_s = 0.0
+        self._wait_last_s = 0.0
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Schedule fn on the pool. Raises PoolSaturatedError when no slot is free.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PoolSaturatedError(f"route pool saturated ({self.max_workers} running, {self.max_queue} queued)")
+
+        with self._lock:
+            self._queued += 1
+        # Run in the caller's context so the request id and timing spans follow the job into the worker.
+        future = submit_with_context(self._executor, self._run, time.perf_counter(), fn, args, kwargs)
+        future.add_done_callback(self._release)
+        return future
+
+    def _run(self, enqueued_at: float, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        wait_s = time.perf_counter() - enqueued_at
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_total_s += wait_s
+            self._wait_max_s = max(self._wait_max_s, wait_s)
+            self._wait_last_s = wait_s
+        record_span("queue_wait", wait_s * 1000)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    def _release(self, future: Future):
+        if future.cancelled():
+            # Cancelled before a worker picked it up, so _run never left the queue.
+            with self._lock:
+                self._queued -= 1
+        self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._queued,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_ms_avg": round(self._wait_total_s / started * 1000, 3) if started else 0.0,
+                "wait_ms_max": round(self._wait_max_s * 1000, 3),
+                "wait_ms_last": round(self._wait_last_s * 1000, 3),
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -1,10 +1,18 @@
 # walking_on_sunshine/api/server.py
+import logging
+
 from walking_on_sunshine.api.api import API
+from walking_on_sunshine.api.config import Config as ApiConfig
 from walking_on_sunshine.app.app import App
 from walking_on_sunshine.app.config import Config as AppConfig
 from walking_on_sunshine.command.config import RootConfig
+from walking_on_sunshine.common.logging.logger import init_logger
+from walking_on_sunshine.common.logging.processors import set_payload_sample_rate
 
 root_cfg = RootConfig()
 app_cfg = root_cfg.app or AppConfig()  # defaults every field to None
-api = API(App(app_cfg))
+api_cfg = root_cfg.api or ApiConfig()
+init_logger(level=logging.getLevelNamesMapping()[api_cfg.log_level.upper()])
+set_payload_sample_rate(api_cfg.log_payload_sample_rate)
+api = API(App(app_cfg), api_cfg)
 app = api.fast_api
@@ -0,0 +1,123 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from walking_on_sunshine.api.api import API
+from walking_on_sunshine.app.app import App
+from walking_on_sunshine.app.config import Config
+from walking_on_sunshine.common.logging.spans import record_span
+
+ROUTE = {
+    "route_id": "r1",
+    "route_distance_km": 1.3,
+    "length_error": 0.04,
+    "seed": 42,
+    "route_preview": [{"lat": 37.78, "lon": -122.4}],
+    "preview_coords": [[-122.4, 37.78]],
+    "route_coords": [[-122.4, 37.78], [-122.41, 37.79]],
+}
+
+
+def _run(album_name, start_address, album_id, seed, reroll, embed_map, on_stage):
+    on_stage("album", {"album_name": album_name, "length_minutes": 30.0})
+    on_stage("start", {"start_address": start_address})
+    record_span("directions", 12.5)
+    on_stage("route", ROUTE)
+    on_stage("maps", {"maps_url": "https://www.google.com/maps/dir/"})
+    on_stage("map", {"route_id": "r1", "map_url": "/routes/r1/map", "map_embed_html": None})
+    return {}
+
+
+@pytest.fixture
+def app():
+    app = MagicMock()
+    app.run.side_effect = _run
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return TestClient(API(app).fast_api)
+
+
+def test_generate_route_stream_sends_ndjson_events_in_stage_order(client, app):
+    response = client.get(
+        "/generate_route/stream",
+        params={"album_name": "Abbey Road", "start_address": "1 Market St", "format": "columnar"},
+    )
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [event["event"] for event in events] == ["album", "start", "route", "maps", "map", "done"]
+    assert events[0]["data"] == {"album_name": "Abbey Road", "length_minutes": 30.0}
+    assert events[2]["data"]["route_preview"] == {"lat": [37.78], "lon": [-122.4]}
+    assert "route_geometry" not in events[2]["data"]
+    assert app.run.call_args.args[:6] == ("Abbey Road", "1 Market St", None, None, False, False)
+
+
+def test_generate_route_stream_reports_timing_in_the_final_event(client):
+    response = client.get("/generate_route/stream", params={"album_name": "Abbey Road", "start_address": "1 Market St"})
+
+    done = json.loads(response.text.splitlines()[-1])
+    # The headers went out with the first event, before the directions span was recorded
+    assert "server-timing" not in response.headers
+    assert done["data"]["timing"]["stages"]["directions"] == 12.5
+    assert done["data"]["timing"]["total_ms"] > 0
+
+
+def test_generate_route_stream_sends_server_sent_events(client):
+    response = client.get(
+        "/generate_route/stream",
+        params={"album_name": "Abbey Road", "start_address": "1 Market St", "full_geometry": True},
+        headers={"Accept": "text/event-stream"},
+    )
+
+    blocks = response.text.strip().split("\n\n")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert blocks[0] == 'event: album\ndata: {"album_name":"Abbey Road","length_minutes":30.0}'
+    route = json.loads(blocks[2].split("data: ", 1)[1])
+    assert route["route_geometry"] == [{"lat": 37.78, "lon": -122.4}, {"lat": 37.79, "lon": -122.41}]
+    assert blocks[-1].startswith("event: done")
+
+
+def test_generate_route_stream_ends_with_an_error_event(client, app):
+    def fail_after_album(album_name, start_address, album_id, seed, reroll, embed_map, on_stage):
+        on_stage("album", {"album_name": album_name})
+        raise ValueError("Address not found")
+
+    app.run.side_effect = fail_after_album
+    response = client.get("/generate_route/stream", params={"album_name": "Abbey Road", "start_address": "nowhere"})
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["event"] for event in events] == ["album", "error"]
+    assert events[1]["data"]["detail"] == "Address not found"
+    assert events[1]["data"]["status"] == "error"
+
+
+def test_route_ids_resolve_on_any_app_sharing_the_sqlite_cache(tmp_path):
+    config = Config(cache_backend="sqlite", cache_path=str(tmp_path / "cache.sqlite3"))
+    with patch("walking_on_sunshine.app.app.AlbumLength"), patch("walking_on_sunshine.app.app.PathGen"):
+        first, second = App(config), App(config)
+    first.album_length.get_album_details.return_value = {"id": "album_1", "name": "Abbey Road", "total_ms": 60_000}
+    first.album_length._time_format.return_value = "1:00"
+    first.path_gen.resolve_start.return_value = {"address": "1 Market St", "coordinates": [-122.4, 37.78]}
+    first.path_gen.build_route.return_value = {
+        "route_coords": ROUTE["route_coords"],
+        "sampled_coords": ROUTE["preview_coords"],
+        "route_length_m": 1300.0,
+        "length_error": 0.04,
+        "maps_url": "https://www.google.com/maps/dir/",
+        "route_preview": ROUTE["route_preview"],
+        "map_embed_html": None,
+    }
+    second.path_gen.render_map_html.return_value = "<html>map</html>"
+
+    route_id = first.run("Abbey Road", "1 Market St")["route_id"]
+    client = TestClient(API(second).fast_api)
+
+    geometry = client.get(f"/routes/{route_id}/geometry", params={"format": "columnar"})
+    assert geometry.json()["route_geometry"] == {"lat": [37.78, 37.79], "lon": [-122.4, -122.41]}
+    assert client.get(f"/routes/{route_id}/map").text == "<html>map</html>"
+    second.path_gen.render_map_html.assert_called_once_with(ROUTE["route_coords"])
@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from walking_on_sunshine.api.route_pool import PoolSaturatedError, RoutePool
+
+
+def test_submit_returns_result_and_records_stats():
+    pool = RoutePool(max_workers=2, max_queue=1)
+    assert pool.submit(lambda x: x * 2, 21).result(timeout=5) == 42
+
+    stats = pool.stats()
+    assert stats["completed"] == 1
+    assert stats["running"] == 0
+    assert stats["queued"] == 0
+    assert stats["rejected"] == 0
+    pool.shutdown()
+
+
+def test_submit_rejects_when_workers_and_queue_are_full():
+    pool = RoutePool(max_workers=1, max_queue=1, retry_after_s=5)
+    gate = threading.Event()
+
+    running = pool.submit(gate.wait)
+    queued = pool.submit(gate.wait)
+    with pytest.raises(PoolSaturatedError):
+        pool.submit(gate.wait)
+    assert pool.stats()["rejected"] == 1
+
+    gate.set()
+    running.result(timeout=5)
+    queued.result(timeout=5)
+
+    # Slots are released once jobs finish.
+    assert pool.submit(lambda: "ok").result(timeout=5) == "ok"
+    pool.shutdown()
+
+
+def test_cancelled_job_releases_its_slot():
+    pool = RoutePool(max_workers=1, max_queue=1)
+    gate = threading.Event()
+
+    running = pool.submit(gate.wait)
+    queued = pool.submit(gate.wait)
+    assert queued.cancel()
+    assert pool.stats()["queued"] == 0
+
+    extra = pool.submit(lambda: "ok")
+    gate.set()
+    running.result(timeout=5)
+    assert extra.result(timeout=5) == "ok"
+    pool.shutdown()
@@ -1,10 +1,86 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from spotipy import Spotify
+from spotipy.cache_handler import MemoryCacheHandler
 from spotipy.oauth2 import SpotifyClientCredentials
 
+from walking_on_sunshine.common.cache.backend import CacheBackend
+from walking_on_sunshine.common.cache.popularity import PopularityTracker
+from walking_on_sunshine.common.cache.prefix_cache import PrefixCache
+from walking_on_sunshine.common.cache.single_flight import SingleFlight
+from walking_on_sunshine.common.cache.ttl_cache import TTLCache, normalize_key
+from walking_on_sunshine.common.http.config import HttpConfig
+from walking_on_sunshine.common.http.session import build_session, session_stats, timeout
+from walking_on_sunshine.common.logging.logger import get_logger
+from walking_on_sunshine.common.logging.spans import span
+from walking_on_sunshine.common.metrics.upstream import upstream_call
+
+logger = get_logger(__name__)
+
+# Maximum number of ids Spotify accepts on the multi-album endpoint
+_ALBUMS_BATCH_SIZE = 20
+
 
 class AlbumLength:
-    def __init__(self, client_id: str | None, client_secret: str | None):
-        self.sp = Spotify(auth_manager=SpotifyClientCredentials(client_id, client_secret))
+    def __init__(
+        self,
+        client_id: str | None,
+        client_secret: str | None,
+        details_cache: CacheBackend | None = None,
+        name_cache: CacheBackend | None = None,
+        search_cache: PrefixCache | None = None,
+        api_url: str | None = None,
+        token_url: str | None = None,
+        http: HttpConfig | None = None,
+        fresh_ttl_s: float | None = None,
+        refresh_top_n: int = 0,
+        refresh_ahead: float = 0.8,
+        refresh_interval_s: float = 300,
+        refresh_retry_s: float = 60,
+        refresh_workers: int = 2,
+    ):
+        http = http or HttpConfig()
+        # One keep-alive session for token and API calls, shared by every request thread
+        self.session = build_session(http)
+        # Tokens stay in memory: spotipy's default ./.cache file would hand one process's token (e.g. a load-test
+        # stand-in's) to any other started in the same directory
+        auth_manager = SpotifyClientCredentials(
+            client_id,
+            client_secret,
+            cache_handler=MemoryCacheHandler(),
+            requests_session=self.session,
+            requests_timeout=timeout(http),
+        )
+        if token_url:
+            auth_manager.OAUTH_TOKEN_URL = token_url
+        self.sp = Spotify(auth_manager=auth_manager, requests_session=self.session, requests_timeout=timeout(http))
+        if api_url:
+            self.sp.prefix = api_url.rstrip("/") + "/"
+        # album id -> {"details": details dict, "fetched_at": epoch seconds}, and normalized album name -> album id
+        self.details_cache = details_cache if details_cache is not None else TTLCache()
+        self.name_cache = name_cache if name_cache is not None else TTLCache()
+        self.search_cache = search_cache if search_cache is not None else PrefixCache()
+        # Concurrent cache misses for the same search or album share one Spotify call
+        self.flight = SingleFlight()
+        # Details older than fresh_ttl_s are served stale while a background refresh runs, until the details
+        # cache's own TTL drops them. The refresh_top_n most requested albums are refreshed once they are
+        # refresh_ahead of the way to going stale. None refreshes only on a miss.
+        self.fresh_ttl_s = fresh_ttl_s
+        self.refresh_top_n = refresh_top_n
+        self.refresh_ahead = refresh_ahead
+        self.refresh_interval_s = refresh_interval_s
+        self.refresh_retry_s = refresh_retry_s
+        self.popularity: PopularityTracker[str] = PopularityTracker()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="album-refresh")
+        self._refresh_lock = threading.Lock()
+        self._refreshing: set[str] = set()
+        self._refresh_failed_at: dict[str, float] = {}
+        self._hot_scanned_at = time.monotonic()
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
 
     def _time_format(self, duration: int) -> str:
         """
@@ -26,32 +102,207 @@ class AlbumLength:
         Return album id of first spotify search result
         """
         search_query = "album:" + album_name
-        album_search = self.sp.search(search_query, type="album", limit=1)
+        with span("album_search"), upstream_call("spotify", "search"):
+            album_search = self.sp.search(search_query, type="album", limit=1)
         albums_in_search = album_search["albums"]
         first_result = albums_in_search["items"][0]
         return first_result["id"]
 
-    def _get_tracks(self, album_id: str) -> list[dict]:
+    def search_albums(self, query: str) -> list[dict]:
         """
-        Return list of tracks for a given album id
+        Return autocomplete results for a partial album name, from the prefix cache when possible
         """
-        album_tracks = self.sp.album_tracks(album_id)
+        results = self.search_cache.get(query)
+        if results is not None:
+            return results
+
+        results = self.flight.do(("search", normalize_key(query)), self._fetch_search_results, query)
+        return results[: self.search_cache.limit]
+
+    def _fetch_search_results(self, query: str) -> list[dict]:
+        with span("album_search", query_len=len(query)), upstream_call("spotify", "search"):
+            albums = self.sp.search(f"album:{query}", type="album", limit=self.search_cache.fetch_limit)
+        albums = albums["albums"]["items"]
+        results = [
+            {
+                "id": album["id"],
+                "name": album["name"],
+                "artist": album["artists"][0]["name"],
+                "image": album["images"][0]["url"] if album["images"] else None,
+            }
+            for album in albums
+        ]
+        self.search_cache.set(query, results)
+        return results
+
+    def _get_tracks(self, album_id: str, first_page: dict | None = None) -> list[dict]:
+        """
+        Return list of tracks for a given album id.
+        When the first page is already known (it is embedded in album objects) only the remaining pages are fetched.
+        """
+        if first_page is not None:
+            album_tracks = first_page
+        else:
+            with span("track_page", album_id=album_id), upstream_call("spotify", "album_tracks"):
+                album_tracks = self.sp.album_tracks(album_id)
         tracks = []
         tracks.extend(album_tracks["items"])
 
         while album_tracks["next"]:
-            album_tracks = self.sp.next(album_tracks)
+            with span("track_page", album_id=album_id), upstream_call("spotify", "album_tracks"):
+                album_tracks = self.sp.next(album_tracks)
 
             tracks.extend(album_tracks["items"])
 
         return tracks
 
-    def get_album_details(self, album_name: str, album_id: str | None = None) -> dict:
+    def resolve_album_id(self, album_name: str) -> str:
+        """
+        Return album id for a name, memoizing the search result by normalized name
+        """
+        name_key = normalize_key(album_name)
+        album_id = self.name_cache.get(name_key)
+        if album_id is None:
+            album_id = self.flight.do(("album_id", name_key), self._search_query, album_name=album_name)
+            self.name_cache.set(name_key, album_id)
+        return album_id
+
+    def get_album_details(self, album_name: str, album_id: str | None = None, interactive: bool = True) -> dict:
+        """
+        Details for one album. Only interactive lookups count towards the popularity that picks albums to
+        refresh ahead; bulk jobs pass interactive=False.
+        """
         if not album_id:
-            album_id = self._search_query(album_name=album_name)
-        album = self.sp.album(album_id)
+            album_id = self.resolve_album_id(album_name)
+
+        if interactive:
+            self.popularity.hit(album_id)
+        details = self._cached_details(album_id)
+        if details is None:
+            details = self.flight.do(("album", album_id), self._fetch_album_details, album_name, album_id)
+            self._store_details(album_id, details)
+        self._maybe_refresh_hot()
+        return dict(details)
+
+    def get_many_album_details(self, album_ids: list[str]) -> dict[str, dict]:
+        """
+        Return details for many album ids, keyed by id.
+        Uncached albums are fetched with Spotify's multi-album endpoint, 20 ids per request,
+        plus one request per extra track page. Ids Spotify does not know are left out.
+        """
+        details_by_id = {}
+        missing = []
+        for album_id in dict.fromkeys(album_ids):
+            details = self._cached_details(album_id)
+            if details is None:
+                missing.append(album_id)
+            else:
+                details_by_id[album_id] = dict(details)
+
+        for i in range(0, len(missing), _ALBUMS_BATCH_SIZE):
+            chunk = missing[i : i + _ALBUMS_BATCH_SIZE]
+            with span("album_fetch", batch=len(chunk)), upstream_call("spotify", "albums"):
+                albums = self.sp.albums(chunk)["albums"]
+            for album_id, album in zip(chunk, albums, strict=False):
+                if not album:
+                    continue
+                details = self._album_details(album, album_id, album.get("name", ""))
+                self._store_details(album_id, details)
+                details_by_id[album_id] = dict(details)
+
+        self._maybe_refresh_hot()
+        return details_by_id
 
-        tracks = self._get_tracks(album_id=album_id)
+    def _store_details(self, album_id: str, details: dict):
+        self.details_cache.set(album_id, {"details": details, "fetched_at": time.time()})
+
+    def _cached_details(self, album_id: str) -> dict | None:
+        """
+        Return cached details for an album, scheduling a background refresh when they are past fresh_ttl_s.
+        """
+        entry = self.details_cache.get(album_id)
+        if entry is None:
+            return None
+        if self.fresh_ttl_s is not None and time.time() - entry["fetched_at"] >= self.fresh_ttl_s:
+            with self._refresh_lock:
+                self.stale_hits += 1
+            self._schedule_refresh(album_id, entry["details"].get("name", ""))
+        return entry["details"]
+
+    def _schedule_refresh(self, album_id: str, album_name: str) -> bool:
+        """
+        Queue a background refresh unless one is already queued, or the last one failed within refresh_retry_s.
+        """
+        now = time.monotonic()
+        with self._refresh_lock:
+            if album_id in self._refreshing:
+                return False
+            failed_at = self._refresh_failed_at.get(album_id)
+            if failed_at is not None and now - failed_at < self.refresh_retry_s:
+                return False
+            self._refreshing.add(album_id)
+        # Not submitted with the request's context: the refresh is not part of the request's timing
+        self._refresh_executor.submit(self._refresh, album_id, album_name)
+        return True
+
+    def _refresh(self, album_id: str, album_name: str):
+        try:
+            details = self.flight.do(("album", album_id), self._fetch_album_details, album_name, album_id)
+        except Exception as e:
+            now = time.monotonic()
+            with self._refresh_lock:
+                self.refresh_errors += 1
+                # Failures older than refresh_retry_s no longer hold anything back
+                self._refresh_failed_at = {
+                    key: failed_at
+                    for key, failed_at in self._refresh_failed_at.items()
+                    if now - failed_at < self.refresh_retry_s
+                }
+                self._refresh_failed_at[album_id] = now
+            logger.warning("Album refresh failed, serving stale details", album_id=album_id, error=str(e))
+        else:
+            self._store_details(album_id, details)
+            with self._refresh_lock:
+                self.refreshes += 1
+                self._refresh_failed_at.pop(album_id, None)
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(album_id)
+
+    def _maybe_refresh_hot(self):
+        if self.fresh_ttl_s is None or self.refresh_top_n <= 0:
+            return
+        now = time.monotonic()
+        with self._refresh_lock:
+            if now - self._hot_scanned_at < self.refresh_interval_s:
+                return
+            self._hot_scanned_at = now
+        self._refresh_executor.submit(self.refresh_hot)
+
+    def refresh_hot(self) -> int:
+        """
+        Refresh the most requested albums that are refresh_ahead of the way to going stale, so they never do.
+        Returns the number of refreshes queued.
+        """
+        if self.fresh_ttl_s is None:
+            return 0
+        threshold = self.fresh_ttl_s * self.refresh_ahead
+        now = time.time()
+        queued = 0
+        for album_id in self.popularity.top(self.refresh_top_n):
+            entry = self.details_cache.peek(album_id)
+            if entry is not None and now - entry["fetched_at"] >= threshold:
+                queued += self._schedule_refresh(album_id, entry["details"].get("name", ""))
+        return queued
+
+    def _fetch_album_details(self, album_name: str, album_id: str) -> dict:
+        with span("album_fetch", album_id=album_id), upstream_call("spotify", "album"):
+            album = self.sp.album(album_id)
+        return self._album_details(album, album_id, album_name)
+
+    def _album_details(self, album: dict, album_id: str, album_name: str) -> dict:
+        # Album objects embed the first page of tracks, so short albums need no further requests.
+        tracks = self._get_tracks(album_id=album_id, first_page=album.get("tracks"))
         total_ms = sum(item.get("duration_ms", 0) for item in tracks)
 
         release_date = album.get("release_date") or ""
@@ -77,3 +328,20 @@ class AlbumLength:
 
     def get_album_length(self, album_name: str) -> int:
         return self.get_album_details(album_name)["total_ms"]
+
+    def http_stats(self) -> dict:
+        return session_stats(self.session)
+
+    def single_flight_stats(self) -> dict:
+        return self.flight.stats()
+
+    def refresh_stats(self) -> dict:
+        with self._refresh_lock:
+            return {"stale_hits": self.stale_hits, "refreshes": self.refreshes, "refresh_errors": self.refresh_errors}
+
+    def cache_stats(self) -> dict:
+        return {
+            "album_details": {**self.details_cache.stats(), **self.refresh_stats()},
+            "album_names": self.name_cache.stats(),
+            "album_search": self.search_cache.stats(),
+        }
@@ -1,35 +1,166 @@
+import hashlib
 import os
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 
 from walking_on_sunshine.app.album_length import AlbumLength
-from walking_on_sunshine.app.config import Config
-from walking_on_sunshine.app.path_gen import PathGen
+from walking_on_sunshine.app.config import CacheConfig, Config, RefreshConfig
+from walking_on_sunshine.app.hedging import Hedger
+from walking_on_sunshine.app.local_router import LocalRouter
+from walking_on_sunshine.app.path_gen import PathGen, derive_seed
+from walking_on_sunshine.common.cache.backend import CacheBackend
+from walking_on_sunshine.common.cache.prefix_cache import PrefixCache
+from walking_on_sunshine.common.cache.sqlite_cache import SQLiteCache
+from walking_on_sunshine.common.cache.ttl_cache import TTLCache
 from walking_on_sunshine.common.logging.logger import get_logger
+from walking_on_sunshine.common.logging.spans import submit_with_context
 
 logger = get_logger(__name__)
 
+# Result fields handed to on_stage with the "route" and "map" stages
+_ROUTE_STAGE_KEYS = (
+    "route_id",
+    "route_distance_km",
+    "length_error",
+    "route_preview",
+    "preview_coords",
+    "route_coords",
+    "seed",
+)
+_MAP_STAGE_KEYS = ("route_id", "map_url", "map_embed_html")
+
 
 class App:
-    def __init__(self, config: Config):
-        self.config = config
-        self.album_length = AlbumLength(os.getenv("SPOTIFY_CLIENT_ID"), os.getenv("SPOTIFY_CLIENT_SECRET"))
-        self.path_gen = PathGen(os.getenv("OPENROUTE_API_KEY"))
+    def __init__(self, config: Config | None):
+        self.config = config or Config()
+        refresh = self.config.album_refresh
+        # With refresh enabled album_cache.ttl_s is how long details stay fresh; the cache keeps them max_stale_s longer
+        fresh_ttl_s = self.config.album_cache.ttl_s if refresh.enabled else None
+        self.album_length = AlbumLength(
+            os.getenv("SPOTIFY_CLIENT_ID"),
+            os.getenv("SPOTIFY_CLIENT_SECRET"),
+            details_cache=self._build_cache(
+                "album_details", self._stale_cache_config(self.config.album_cache, refresh)
+            ),
+            name_cache=self._build_cache("album_names", self.config.album_name_cache),
+            search_cache=PrefixCache(
+                self.config.album_search_cache.max_size,
+                self.config.album_search_cache.ttl_s,
+                fetch_limit=self.config.album_search_fetch_limit,
+            ),
+            api_url=self.config.spotify_api_url,
+            token_url=self.config.spotify_token_url,
+            http=self.config.spotify_http,
+            fresh_ttl_s=fresh_ttl_s,
+            refresh_top_n=refresh.top_n,
+            refresh_ahead=refresh.refresh_ahead,
+            refresh_interval_s=refresh.interval_s,
+            refresh_retry_s=refresh.retry_after_s,
+            refresh_workers=refresh.workers,
+        )
+        self.path_gen = PathGen(
+            os.getenv("OPENROUTE_API_KEY"),
+            geocode_cache=self._build_cache("geocode", self.config.geocode_cache),
+            reverse_cache=self._build_cache("reverse_geocode", self.config.reverse_geocode_cache),
+            reverse_precision=self.config.reverse_geocode_precision,
+            route_cache=self._build_cache("route", self.config.route_cache),
+            route_precision=self.config.route_start_precision,
+            distance_bucket_m=self.config.route_distance_bucket_m,
+            maps_waypoints=self.config.maps_waypoints,
+            preview_points=self.config.preview_points,
+            route_candidates=self.config.route_candidates,
+            candidate_deadline_s=self.config.route_candidate_deadline_s,
+            length_tolerance=self.config.route_length_tolerance,
+            hedger=self._build_hedger(),
+            local_router=self._build_local_router(),
+            base_url=self.config.ors_base_url,
+            http=self.config.ors_http,
+        )
+        # Shared like the other caches, so any worker can serve /routes/{id}/map and /geometry for a route id;
+        # maps are rendered from the stored geometry and kept per process
+        self.route_store = self._build_cache("route_store", self.config.route_store)
+        self.map_cache = TTLCache(self.config.map_cache.max_size, self.config.map_cache.ttl_s)
+        # Runs the geocode stage of each request while the calling thread does the Spotify stage.
+        self._stage_executor = ThreadPoolExecutor(max_workers=self.config.stage_workers, thread_name_prefix="stage")
+
+    def _build_cache(self, namespace: str, cache_config: CacheConfig) -> CacheBackend:
+        if self.config.cache_backend == "sqlite":
+            return SQLiteCache(self.config.cache_path, namespace, cache_config.max_size, cache_config.ttl_s)
+        return TTLCache(cache_config.max_size, cache_config.ttl_s)
+
+    @staticmethod
+    def _stale_cache_config(cache_config: CacheConfig, refresh: RefreshConfig) -> CacheConfig:
+        if not refresh.enabled or cache_config.ttl_s is None:
+            return cache_config
+        return cache_config.model_copy(update={"ttl_s": cache_config.ttl_s + refresh.max_stale_s})
+
+    def _build_hedger(self) -> Hedger | None:
+        hedge_cfg = self.config.directions_hedge
+        if not hedge_cfg.enabled:
+            return None
+        return Hedger(
+            percentile=hedge_cfg.percentile,
+            min_delay_s=hedge_cfg.min_delay_s,
+            default_delay_s=hedge_cfg.default_delay_s,
+            max_hedge_rate=hedge_cfg.max_hedge_rate,
+        )
+
+    def _build_local_router(self) -> LocalRouter | None:
+        if self.config.routing_backend != "local":
+            return None
+        if not self.config.local_graph_path:
+            logger.warning("routing_backend is local but local_graph_path is not set, using ORS")
+            return None
+        return LocalRouter.from_geojson(self.config.local_graph_path)
 
-    def run(self, album_name: str, start_address: str, album_id: str | None = None):
+    def route_seed(
+        self, album_id: str, start_address: str, seed: int | None = None, reroll: bool = False
+    ) -> int | None:
+        """
+        Pick the round-trip seed: an explicit seed wins, reroll asks for fresh randomness,
+        and in deterministic mode the seed is derived from the album and start location.
+        """
+        if seed is not None:
+            return seed
+        if reroll or self.config.route_seed_mode != "deterministic":
+            return None
+        return derive_seed(album_id, start_address)
+
+    def run(
+        self,
+        album_name: str,
+        start_address: str,
+        album_id: str | None = None,
+        seed: int | None = None,
+        reroll: bool = False,
+        embed_map: bool = False,
+        on_stage: Callable[[str, dict], None] | None = None,
+        interactive: bool = True,
+    ):
+        """
+        Generate a route for an album from a start address.
+        on_stage, when given, receives each part of the result as soon as it is known: "album" after the Spotify
+        stage, "start" after geocoding, "route" and "maps" after routing, then "map". The inline map is then
+        rendered last, after everything else has been handed over.
+        Bulk jobs pass interactive=False so their album lookups do not skew which albums are refreshed ahead.
+        """
+        emit = on_stage or (lambda stage, payload: None)
         try:
-            album_details = self.album_length.get_album_details(album_name, album_id=album_id)
+            # Geocoding the start does not depend on the album, so overlap it with the Spotify calls
+            # and only join the two before the directions call, which needs the album duration.
+            start_future = submit_with_context(self._stage_executor, self.path_gen.resolve_start, start_address)
+            album_details = self.album_length.get_album_details(album_name, album_id=album_id, interactive=interactive)
+            route_seed = self.route_seed(album_details["id"], start_address, seed, reroll)
 
             length_ms = album_details["total_ms"]
             length_label = self.album_length._time_format(length_ms)
             length_minutes = round(length_ms / 60_000, 2)
 
-            maps_url, normalized_address, preview_coords, map_embed_html = self.path_gen.generate_path(
-                start_address, length_ms
-            )
-
             walking_speed_kmh = 2.5
             distance_km = (length_ms / 3_600_000) * walking_speed_kmh
 
-            return {
+            album = {
                 "album_name": album_details.get("name", album_name),
                 "artist": album_details.get("artist"),
                 "album_id": album_details.get("id", album_id),
@@ -39,11 +170,75 @@ class App:
                 "release_year": album_details.get("release_year"),
                 "album_image_url": album_details.get("image_url"),
                 "distance_km": round(distance_km, 2),
-                "maps_url": maps_url,
-                "start_address": normalized_address,
-                "route_preview": preview_coords,
-                "map_embed_html": map_embed_html,
             }
+            emit("album", album)
+
+            start = start_future.result()
+            emit("start", {"start_address": start["address"]})
+
+            inline_map = embed_map and on_stage is None
+            route = self.path_gen.build_route(start, length_ms, seed=route_seed, embed_map=inline_map)
+            route_id = uuid.uuid4().hex
+            self.route_store.set(route_id, route["route_coords"])
+
+            result = {
+                **album,
+                "route_distance_km": round(route["route_length_m"] / 1000, 2),
+                "length_error": round(route["length_error"], 4),
+                "maps_url": route["maps_url"],
+                "start_address": start["address"],
+                "route_preview": route["route_preview"],
+                "preview_coords": route["sampled_coords"],
+                "route_coords": route["route_coords"],
+                "route_id": route_id,
+                "map_url": f"/routes/{route_id}/map",
+                "map_embed_html": route["map_embed_html"],
+                "seed": route_seed,
+            }
+            emit("route", {key: result[key] for key in _ROUTE_STAGE_KEYS})
+            emit("maps", {"maps_url": result["maps_url"]})
+
+            if embed_map and not inline_map:
+                result["map_embed_html"] = self.path_gen._build_folium_map(route["route_coords"])
+            emit("map", {key: result[key] for key in _MAP_STAGE_KEYS})
+            return result
         except Exception as e:
             logger.error(f"Error processing request: {str(e)}")
             raise e
+
+    def render_route_map(self, route_id: str) -> tuple[str, str] | None:
+        """
+        Return (html, etag) for a generated route, rendering the Folium map on first access.
+        None when the route id is unknown or has expired.
+        """
+        rendered = self.map_cache.get(route_id)
+        if rendered is not None:
+            return rendered
+
+        route_coords = self.route_store.get(route_id)
+        if route_coords is None:
+            return None
+        html = self.path_gen.render_map_html(route_coords)
+        if html is None:
+            return None
+
+        rendered = (html, '"' + hashlib.sha1(html.encode("utf-8"), usedforsecurity=False).hexdigest() + '"')
+        self.map_cache.set(route_id, rendered)
+        return rendered
+
+    def http_stats(self) -> dict:
+        return {"spotify": self.album_length.http_stats(), "ors": self.path_gen.http_stats()}
+
+    def single_flight_stats(self) -> dict:
+        return {"spotify": self.album_length.single_flight_stats(), "ors": self.path_gen.single_flight_stats()}
+
+    def hedge_stats(self) -> dict | None:
+        return self.path_gen.hedger.stats() if self.path_gen.hedger is not None else None
+
+    def cache_stats(self) -> dict:
+        return {
+            **self.album_length.cache_stats(),
+            **self.path_gen.cache_stats(),
+            "route_store": self.route_store.stats(),
+            "map": self.map_cache.stats(),
+        }
@@ -1,5 +1,36 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
+from walking_on_sunshine.common.http.config import HttpConfig
+
+
+class CacheConfig(BaseModel):
+    max_size: int = 1024
+    ttl_s: float | None = None
+
+
+class RefreshConfig(BaseModel):
+    enabled: bool = True
+    # How long past album_cache.ttl_s details may still be served while Spotify is refreshed or failing
+    max_stale_s: float = 24 * 3600
+    # The top_n most requested albums are refreshed once refresh_ahead of the way to going stale, checked at
+    # most every interval_s
+    top_n: int = 100
+    refresh_ahead: float = 0.8
+    interval_s: float = 300
+    # A failed refresh is not retried for this long; the stale details keep being served
+    retry_after_s: float = 60
+    workers: int = 2
+
+
+class HedgeConfig(BaseModel):
+    enabled: bool = False
+    percentile: float = 95
+    min_delay_s: float = 0.3
+    default_delay_s: float = 2.0
+    max_hedge_rate: float = 0.1
+
 
 class Config(BaseModel):
     bar: str | None = None
@@ -7,3 +38,42 @@ class Config(BaseModel):
     SPOTIFY_CLIENT_SECRET: str | None = None
     GOOGLE_MAPS_API_KEY: str | None = None
     OPENROUTE_API_KEY: str | None = None
+    # Upstream endpoint overrides, e.g. to point at the load-test stand-ins; None keeps the public APIs
+    spotify_api_url: str | None = None
+    spotify_token_url: str | None = None
+    ors_base_url: str | None = None
+    # Connection pool, timeouts and retry policy per upstream; directions can take a while to compute
+    spotify_http: HttpConfig = HttpConfig()
+    ors_http: HttpConfig = HttpConfig(read_timeout_s=30.0)
+    # "sqlite" keeps the album, album name, geocode, reverse geocode and route caches and the route store in
+    # cache_path, shared by every worker on the host and kept across restarts; search results and rendered maps
+    # always stay in process
+    cache_backend: Literal["memory", "sqlite"] = "memory"
+    cache_path: str = "wos_cache.sqlite3"
+    album_cache: CacheConfig = CacheConfig(max_size=1024, ttl_s=7 * 24 * 3600)
+    album_refresh: RefreshConfig = RefreshConfig()
+    album_name_cache: CacheConfig = CacheConfig(max_size=4096, ttl_s=24 * 3600)
+    album_search_cache: CacheConfig = CacheConfig(max_size=2048, ttl_s=3600)
+    album_search_fetch_limit: int = 50
+    geocode_cache: CacheConfig = CacheConfig(max_size=4096, ttl_s=7 * 24 * 3600)
+    reverse_geocode_cache: CacheConfig = CacheConfig(max_size=4096, ttl_s=7 * 24 * 3600)
+    reverse_geocode_precision: int = 3
+    # "deterministic" derives the round-trip seed from album id + start location so repeat requests hit route_cache
+    route_seed_mode: Literal["random", "deterministic"] = "random"
+    route_cache: CacheConfig = CacheConfig(max_size=2048, ttl_s=24 * 3600)
+    route_start_precision: int = 4
+    route_distance_bucket_m: float = 50
+    stage_workers: int = 8
+    maps_waypoints: int = 23
+    preview_points: int = 25
+    # >1 requests that many round-trip seeds concurrently and keeps the loop closest to the album length
+    route_candidates: int = 1
+    route_candidate_deadline_s: float = 8.0
+    route_length_tolerance: float = 0.1
+    directions_hedge: HedgeConfig = HedgeConfig()
+    # "local" routes round trips over the GeoJSON walking graph at local_graph_path, falling back to ORS
+    routing_backend: Literal["ors", "local"] = "ors"
+    local_graph_path: str | None = None
+    # route id -> full route geometry, and route id -> rendered map HTML for /routes/{id}/map
+    route_store: CacheConfig = CacheConfig(max_size=2048, ttl_s=6 * 3600)
+    map_cache: CacheConfig = CacheConfig(max_size=256, ttl_s=6 * 3600)
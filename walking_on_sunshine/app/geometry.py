@@ -0,0 +1,142 @@
+import heapq
+import math
+from typing import Literal
+
+import numpy as np
+
+CoordFormat = Literal["objects", "polyline", "columnar"]
+
+EARTH_RADIUS_M = 6_371_008.8
+
+
+def encode_polyline(coords: list[list[float]], precision: int = 5) -> str:
+    """
+    Encode [lon, lat] pairs with Google's encoded polyline algorithm.
+    Precision 5 is what Google Maps expects, 6 is what OSRM/Valhalla use.
+    """
+    if not coords:
+        return ""
+    scaled = np.rint(np.asarray(coords, dtype=np.float64)[:, ::-1] * 10**precision).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    # Zig-zag encode so small negative deltas stay short.
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1).tolist()
+
+    chunks = []
+    for value in values:
+        while value >= 0x20:
+            chunks.append(chr((0x20 | (value & 0x1F)) + 63))
+            value >>= 5
+        chunks.append(chr(value + 63))
+    return "".join(chunks)
+
+
+def decode_polyline(encoded: str, precision: int = 5) -> list[list[float]]:
+    """
+    Inverse of encode_polyline, returning [lon, lat] pairs.
+    """
+    values = []
+    value = shift = 0
+    for char in encoded:
+        byte = ord(char) - 63
+        value |= (byte & 0x1F) << shift
+        shift += 5
+        if byte < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+
+    latlons = np.cumsum(np.asarray(values, dtype=np.int64).reshape(-1, 2), axis=0) / 10**precision
+    return latlons[:, ::-1].tolist()
+
+
+def path_length_m(coords) -> float:
+    """
+    Length in metres of a path of [lon, lat] pairs (a list or an (n, 2) array), summing haversine distances.
+    """
+    points = np.radians(np.asarray(coords, dtype=np.float64))
+    if len(points) < 2:
+        return 0.0
+    lon, lat = points[:, 0], points[:, 1]
+    dlon = np.diff(lon)
+    dlat = np.diff(lat)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(dlon / 2) ** 2
+    return float(2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a)).sum())
+
+
+def format_coords(coords: list[list[float]], coord_format: CoordFormat = "objects", precision: int = 5):
+    """
+    Serialize [lon, lat] pairs for the wire:
+    "objects" is the original list of {"lat", "lon"} dicts at full precision,
+    "polyline" is an encoded polyline string and "columnar" is parallel lat/lon arrays rounded to `precision`.
+    """
+    if coord_format == "polyline":
+        return encode_polyline(coords, precision)
+    if coord_format == "columnar":
+        if not coords:
+            return {"lat": [], "lon": []}
+        rounded = np.round(np.asarray(coords, dtype=np.float64), precision)
+        return {"lat": rounded[:, 1].tolist(), "lon": rounded[:, 0].tolist()}
+    return [{"lat": coord[1], "lon": coord[0]} for coord in coords]
+
+
+def simplify_route(coords, max_points: int) -> list[list[float]]:
+    """
+    Reduce [lon, lat] pairs (a list or an (n, 2) array) to at most `max_points` while keeping the shape.
+
+    Ramer-Douglas-Peucker driven by a point budget instead of a tolerance: the point furthest from the current
+    simplified line is added until the budget is spent, so corners survive and straight stretches collapse.
+    Both ends are always kept. Distances use an equirectangular projection, which is plenty for ranking.
+    Pass an array when the caller already has one; converting a long list costs more than the simplification.
+    """
+    points = np.asarray(coords, dtype=np.float64)
+    n = len(points)
+    if n <= max(max_points, 2):
+        return points.tolist()
+
+    x = points[:, 0] * math.cos(math.radians(points[0, 1]))
+    y = np.ascontiguousarray(points[:, 1])
+    # Scratch buffers reused by every split, so each one allocates nothing proportional to its length
+    cross = np.empty(n)
+    scratch = np.empty(n)
+    heap: list[tuple[float, int, int, int]] = []
+
+    def push_furthest(first: int, last: int):
+        if last - first < 2:
+            return
+        x0, y0, x1, y1 = float(x[first]), float(y[first]), float(x[last]), float(y[last])
+        dx, dy = x1 - x0, y1 - y0
+        m = last - first - 1
+        inner_x, inner_y = x[first + 1 : last], y[first + 1 : last]
+        out, tmp = cross[:m], scratch[:m]
+        chord = math.hypot(dx, dy)
+        if chord == 0.0:
+            # Closed loops start and end on the same point, so rank by squared distance from it.
+            np.subtract(inner_x, x0, out=out)
+            np.multiply(out, out, out=out)
+            np.subtract(inner_y, y0, out=tmp)
+            np.multiply(tmp, tmp, out=tmp)
+            np.add(out, tmp, out=out)
+            furthest = int(out.argmax())
+            distance = math.sqrt(float(out[furthest]))
+        else:
+            # |dx * (y - y0) - dy * (x - x0)| is extremal where dx * y - dy * x is furthest from its value at
+            # the chord, so one max and one min replace the subtractions and the abs.
+            np.multiply(inner_y, dx, out=out)
+            np.multiply(inner_x, dy, out=tmp)
+            np.subtract(out, tmp, out=out)
+            level = dx * y0 - dy * x0
+            high, low = int(out.argmax()), int(out.argmin())
+            above, below = float(out[high]) - level, level - float(out[low])
+            furthest, distance = (high, above) if above >= below else (low, below)
+            distance /= chord
+        heapq.heappush(heap, (-distance, first, last, first + 1 + furthest))
+
+    keep = [0, n - 1]
+    push_furthest(0, n - 1)
+    while heap and len(keep) < max_points:
+        _, first, last, split = heapq.heappop(heap)
+        keep.append(split)
+        push_furthest(first, split)
+        push_furthest(split, last)
+
+    keep.sort()
+    return points[keep].tolist()
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
+
+import numpy as np
+
+from walking_on_sunshine.common.logging.spans import submit_with_context
+
+
+class Hedger:
+    """
+    Hedged requests for slow-tail upstream calls.
+
+    The primary call gets `percentile` of recent latencies to finish. If it is still running after that,
+    an identical backup call is fired and whichever succeeds first wins; the loser is cancelled if it has
+    not started, otherwise its result is ignored. Backups are capped at `max_hedge_rate` of all calls.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95,
+        min_delay_s: float = 0.3,
+        default_delay_s: float = 2.0,
+        max_hedge_rate: float = 0.1,
+        window: int = 200,
+        min_samples: int = 20,
+        max_workers: int = 16,
+    ):
+        self.percentile = percentile
+        self.min_delay_s = min_delay_s
+        self.default_delay_s = default_delay_s
+        self.max_hedge_rate = max_hedge_rate
+        self.min_samples = min_samples
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    def delay_s(self) -> float:
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.default_delay_s
+            samples = np.fromiter(self._latencies, dtype=np.float64)
+        return max(self.min_delay_s, float(np.percentile(samples, self.percentile)))
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            self.calls += 1
+
+        primary = self._submit(fn, args, kwargs)
+        try:
+            return primary.result(timeout=self.delay_s())
+        except TimeoutError:
+            pass
+
+        if not self._reserve_hedge():
+            return primary.result()
+
+        backup = self._submit(fn, args, kwargs)
+        pending = {primary, backup}
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is not None:
+                    continue
+                if future is backup:
+                    with self._lock:
+                        self.hedges_won += 1
+                for loser in pending:
+                    loser.cancel()
+                return future.result()
+        assert error is not None
+        raise error
+
+    def _submit(self, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Future:
+        started = time.monotonic()
+        future = submit_with_context(self._executor, fn, *args, **kwargs)
+        future.add_done_callback(lambda f: self._record(f, time.monotonic() - started))
+        return future
+
+    def _record(self, future: Future, latency_s: float):
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            self._latencies.append(latency_s)
+
+    def _reserve_hedge(self) -> bool:
+        with self._lock:
+            # Allow a single hedge up front so the cap does not block the very first slow call.
+            if self.hedges_fired + 1 > self.max_hedge_rate * self.calls + 1:
+                return False
+            self.hedges_fired += 1
+            return True
+
+    def stats(self) -> dict:
+        delay_s = self.delay_s()
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedges_fired": self.hedges_fired,
+                "hedges_won": self.hedges_won,
+                "hedge_delay_ms": round(delay_s * 1000, 1),
+            }
@@ -0,0 +1,229 @@
+import heapq
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+
+from walking_on_sunshine.app.geometry import EARTH_RADIUS_M, path_length_m
+
+# Ways pedestrians cannot use, mirroring the ORS foot-walking profile plus our fords/ferries avoidance
+_EXCLUDED_HIGHWAYS = {"motorway", "motorway_link", "trunk", "trunk_link", "construction", "proposed", "ferry"}
+_GREEN_HIGHWAYS = {"path", "footway", "track", "bridleway", "pedestrian"}
+# Share of an edge's cost removed at full greenness; ORS' green weighting of 1 is similarly a strong preference
+_GREEN_BONUS = 0.3
+# Walking networks are longer than straight lines; used to size the via-point circle
+_DETOUR_FACTOR = 1.3
+
+
+class LocalRoutingError(Exception):
+    """Raised when the local graph cannot produce a route, so callers can fall back to ORS."""
+
+
+def _is_walkable(props: dict) -> bool:
+    if props.get("ford") in ("yes", True) or props.get("route") == "ferry":
+        return False
+    if props.get("foot") == "no" or props.get("access") in ("no", "private"):
+        return False
+    return props.get("highway") not in _EXCLUDED_HIGHWAYS
+
+
+def _greenness(props: dict) -> float:
+    if "green" in props:
+        return min(1.0, max(0.0, float(props["green"])))
+    if props.get("highway") in _GREEN_HIGHWAYS or props.get("leisure") == "park":
+        return 1.0
+    return 0.0
+
+
+def _haversine_m(lon1, lat1, lon2, lat2):
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+class WalkingGraph:
+    """
+    Pedestrian street graph in compressed sparse row form: the neighbours of node i are
+    indices[indptr[i]:indptr[i + 1]], with matching entries in length_m (metres) and cost (weighted metres).
+    """
+
+    def __init__(self, lon: np.ndarray, lat: np.ndarray, indptr: np.ndarray, indices: np.ndarray, length_m, cost):
+        self.lon = lon
+        self.lat = lat
+        self.indptr = indptr
+        self.indices = indices
+        self.length_m = length_m
+        self.cost = cost
+        self.min_cost_ratio = float((cost / np.maximum(length_m, 1e-9)).min()) if len(cost) else 1.0
+        # Python lists are much faster than NumPy scalars inside the search loop.
+        self._indptr = indptr.tolist()
+        self._indices = indices.tolist()
+        self._cost = cost.tolist()
+        self._lon = lon.tolist()
+        self._lat = lat.tolist()
+        self._cos_lat = math.cos(math.radians(float(lat.mean()))) if len(lat) else 1.0
+
+    def __len__(self) -> int:
+        return len(self.lon)
+
+    @classmethod
+    def from_geojson(cls, source: str | Path | dict) -> "WalkingGraph":
+        """
+        Build a graph from a GeoJSON FeatureCollection of OSM ways (LineString/MultiLineString features with
+        OSM tags as properties), e.g. exported from a PBF extract with osmium or ogr2ogr. Ways sharing a
+        coordinate are connected there; fords, ferries and non-walkable ways are dropped.
+        """
+        data = json.loads(Path(source).read_text()) if isinstance(source, (str, Path)) else source
+
+        node_ids: dict[tuple[float, float], int] = {}
+        src: list[int] = []
+        dst: list[int] = []
+        green: list[float] = []
+        for feature in data.get("features", []):
+            props = feature.get("properties") or {}
+            if not _is_walkable(props):
+                continue
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") == "LineString":
+                lines = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiLineString":
+                lines = geometry["coordinates"]
+            else:
+                continue
+            way_green = _greenness(props)
+            for line in lines:
+                ids = [node_ids.setdefault((round(c[0], 7), round(c[1], 7)), len(node_ids)) for c in line]
+                for a, b in zip(ids, ids[1:], strict=False):
+                    if a != b:
+                        src.extend((a, b))
+                        dst.extend((b, a))
+                        green.extend((way_green, way_green))
+
+        coords = np.array(list(node_ids), dtype=np.float64).reshape(-1, 2)
+        lon, lat = coords[:, 0].copy(), coords[:, 1].copy()
+        src_arr = np.asarray(src, dtype=np.int64)
+        dst_arr = np.asarray(dst, dtype=np.int64)
+        order = np.argsort(src_arr, kind="stable")
+        src_arr, dst_arr = src_arr[order], dst_arr[order]
+        length_m = _haversine_m(lon[src_arr], lat[src_arr], lon[dst_arr], lat[dst_arr])
+        cost = length_m * (1 - _GREEN_BONUS * np.asarray(green, dtype=np.float64)[order])
+        indptr = np.zeros(len(lon) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src_arr, minlength=len(lon)), out=indptr[1:])
+        return cls(lon, lat, indptr, dst_arr, length_m, cost)
+
+    def nearest_node(self, lon: float, lat: float) -> tuple[int, float]:
+        """
+        Return (node index, distance in metres) of the node closest to a coordinate.
+        """
+        if not len(self.lon):
+            raise LocalRoutingError("The local graph has no nodes")
+        dx = (self.lon - lon) * self._cos_lat
+        dy = self.lat - lat
+        node = int(np.argmin(dx * dx + dy * dy))
+        return node, float(_haversine_m(lon, lat, self.lon[node], self.lat[node]))
+
+    def shortest_path(self, source: int, target: int) -> list[int]:
+        """
+        A* over the weighted costs with a haversine heuristic scaled by the cheapest cost/length ratio,
+        which keeps it admissible under green weighting.
+        """
+        if source == target:
+            return [source]
+        indptr, indices, cost, lon, lat = self._indptr, self._indices, self._cost, self._lon, self._lat
+        target_lon, target_lat = lon[target], lat[target]
+        scale = self.min_cost_ratio * EARTH_RADIUS_M * math.pi / 180
+        cos_lat = self._cos_lat
+
+        def heuristic(node: int) -> float:
+            # Equirectangular distance, slightly under haversine at city scale
+            return scale * math.hypot((lon[node] - target_lon) * cos_lat, lat[node] - target_lat) * 0.999
+
+        best = {source: 0.0}
+        previous: dict[int, int] = {}
+        frontier = [(heuristic(source), 0.0, source)]
+        while frontier:
+            _, so_far, node = heapq.heappop(frontier)
+            if node == target:
+                path = [node]
+                while node in previous:
+                    node = previous[node]
+                    path.append(node)
+                return path[::-1]
+            if so_far > best.get(node, math.inf):
+                continue
+            for edge in range(indptr[node], indptr[node + 1]):
+                neighbour = indices[edge]
+                candidate = so_far + cost[edge]
+                if candidate < best.get(neighbour, math.inf):
+                    best[neighbour] = candidate
+                    previous[neighbour] = node
+                    heapq.heappush(frontier, (candidate + heuristic(neighbour), candidate, neighbour))
+        raise LocalRoutingError(f"No walking path between nodes {source} and {target}")
+
+
+class LocalRouter:
+    """
+    Offline round-trip generator over a WalkingGraph.
+
+    Via-points are spread around a circle that passes through the start, in a seeded random direction, snapped
+    to the graph and joined with A*. The circle is resized and the loop rebuilt a few times until its length
+    is within `tolerance` of the target.
+    """
+
+    def __init__(self, graph: WalkingGraph, via_points: int = 4, max_snap_m: float = 500, tolerance: float = 0.15):
+        self.graph = graph
+        self.via_points = via_points
+        self.max_snap_m = max_snap_m
+        self.tolerance = tolerance
+
+    @classmethod
+    def from_geojson(cls, source: str | Path | dict, **kwargs) -> "LocalRouter":
+        return cls(WalkingGraph.from_geojson(source), **kwargs)
+
+    def round_trip(self, lon: float, lat: float, distance_m: float, seed: int) -> list[list[float]]:
+        start, snap_m = self.graph.nearest_node(lon, lat)
+        if snap_m > self.max_snap_m:
+            raise LocalRoutingError(f"Start is {snap_m:.0f} m from the local graph")
+
+        rng = np.random.default_rng(seed)
+        bearing = rng.uniform(0, 2 * math.pi)
+        jitter = rng.uniform(-0.25, 0.25, self.via_points) * (2 * math.pi / (self.via_points + 1))
+        radius_m = distance_m / (2 * math.pi * _DETOUR_FACTOR)
+
+        best_path, best_error = None, math.inf
+        for _ in range(4):
+            path = self._loop(start, bearing, jitter, radius_m)
+            length = path_length_m(np.column_stack((self.graph.lon[path], self.graph.lat[path])))
+            error = abs(length - distance_m) / distance_m
+            if error < best_error:
+                best_path, best_error = path, error
+            if error <= self.tolerance or length == 0:
+                break
+            radius_m *= distance_m / length
+
+        assert best_path is not None
+        return np.column_stack((self.graph.lon[best_path], self.graph.lat[best_path])).tolist()
+
+    def _loop(self, start: int, bearing: float, jitter: np.ndarray, radius_m: float) -> list[int]:
+        graph = self.graph
+        start_lon, start_lat = graph.lon[start], graph.lat[start]
+        m_per_deg_lat = EARTH_RADIUS_M * math.pi / 180
+        m_per_deg_lon = m_per_deg_lat * math.cos(math.radians(start_lat))
+        # Circle centre sits one radius away from the start, so the start lies on the circle.
+        centre_x, centre_y = radius_m * math.sin(bearing), radius_m * math.cos(bearing)
+
+        stops = [start]
+        for i in range(self.via_points):
+            angle = bearing + math.pi + 2 * math.pi * (i + 1) / (self.via_points + 1) + jitter[i]
+            x = centre_x + radius_m * math.sin(angle)
+            y = centre_y + radius_m * math.cos(angle)
+            node, _ = graph.nearest_node(start_lon + x / m_per_deg_lon, start_lat + y / m_per_deg_lat)
+            if node != stops[-1]:
+                stops.append(node)
+        stops.append(start)
+
+        path = [start]
+        for source, target in zip(stops, stops[1:], strict=False):
+            path.extend(graph.shortest_path(source, target)[1:])
+        return path
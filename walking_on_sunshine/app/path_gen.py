@@ -1,13 +1,106 @@
 import base64
+import hashlib
+import json
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from random import randint
 
 import folium
+import numpy as np
 import openrouteservice
 
+from walking_on_sunshine.app.geometry import path_length_m, simplify_route
+from walking_on_sunshine.app.hedging import Hedger
+from walking_on_sunshine.app.local_router import LocalRouter, LocalRoutingError
+from walking_on_sunshine.common.cache.backend import CacheBackend
+from walking_on_sunshine.common.cache.single_flight import SingleFlight
+from walking_on_sunshine.common.cache.ttl_cache import TTLCache, normalize_key
+from walking_on_sunshine.common.http.config import HttpConfig
+from walking_on_sunshine.common.http.session import build_session, session_stats, timeout
+from walking_on_sunshine.common.logging.logger import get_logger
+from walking_on_sunshine.common.logging.spans import span, submit_with_context
+from walking_on_sunshine.common.metrics.upstream import upstream_call
+
+logger = get_logger(__name__)
+
+_ROUTE_OPTIONS = {
+    "avoid_features": ["fords", "ferries"],
+    "profile_params": {"weightings": {"green": 1, "quiet": 0}},
+}
+_ROUTE_OPTIONS_KEY = json.dumps(_ROUTE_OPTIONS, sort_keys=True)
+# Spreads candidate seeds across ORS's 1..10000 range
+_CANDIDATE_SEED_STRIDE = 2503
+
+
+def derive_seed(*parts: str) -> int:
+    """
+    Stable round-trip seed in ORS's 1..10000 range derived from e.g. album id and start location.
+    """
+    digest = hashlib.sha256("|".join(normalize_key(part) for part in parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % 10000 + 1
+
+
+def _quantize(lat: float, lon: float, precision: int) -> tuple[float, float]:
+    """
+    Snap a coordinate to a grid cell of `precision` decimal places (3 is roughly a city block).
+    """
+    return round(lat, precision), round(lon, precision)
+
 
 class PathGen:
-    def __init__(self, key: str | None):
-        self.client = openrouteservice.Client(key=key)
+    def __init__(
+        self,
+        key: str | None,
+        geocode_cache: CacheBackend | None = None,
+        reverse_cache: CacheBackend | None = None,
+        reverse_precision: int = 3,
+        route_cache: CacheBackend | None = None,
+        route_precision: int = 4,
+        distance_bucket_m: float = 50,
+        maps_waypoints: int = 23,
+        preview_points: int = 25,
+        route_candidates: int = 1,
+        candidate_deadline_s: float = 8.0,
+        length_tolerance: float = 0.1,
+        hedger: Hedger | None = None,
+        local_router: LocalRouter | None = None,
+        base_url: str | None = None,
+        http: HttpConfig | None = None,
+    ):
+        http = http or HttpConfig()
+        client_kwargs = {"base_url": base_url.rstrip("/")} if base_url else {}
+        # Retries (429 included) are handled by the session, so the client's own retry loop stays off
+        self.client = openrouteservice.Client(
+            key=key, timeout=timeout(http), retry_over_query_limit=False, **client_kwargs
+        )
+        self.session = build_session(http)
+        # openrouteservice has no session parameter; swap in the pooled one
+        self.client._session = self.session
+        # normalized address -> [[lon, lat]], and quantized (lat, lon) -> address label
+        self.geocode_cache = geocode_cache if geocode_cache is not None else TTLCache()
+        self.reverse_cache = reverse_cache if reverse_cache is not None else TTLCache()
+        self.reverse_precision = reverse_precision
+        # (start cell, distance bucket, points, seed, candidates, options, backend) -> route coordinates
+        self.route_cache = route_cache if route_cache is not None else TTLCache()
+        self.route_precision = route_precision
+        # Concurrent cache misses for the same address, cell or seeded route share one ORS call
+        self.flight = SingleFlight()
+        self.distance_bucket_m = distance_bucket_m
+        # Point budgets for the simplified geometry: Google Maps links allow 23 waypoints between start and end.
+        self.maps_waypoints = maps_waypoints
+        self.preview_points = preview_points
+        # Multi-seed loop selection, see _best_round_trip
+        self.route_candidates = route_candidates
+        self.candidate_deadline_s = candidate_deadline_s
+        self.length_tolerance = length_tolerance
+        # Optional tail-latency hedging for directions calls
+        self.hedger = hedger
+        # Offline routing over a local OSM graph; ORS stays the fallback
+        self.local_router = local_router
+        self._candidate_executor = ThreadPoolExecutor(
+            max_workers=max(1, route_candidates) * 4, thread_name_prefix="route-candidate"
+        )
 
     def _parse_coordinate_string(self, location: str) -> tuple[float, float] | None:
         if not location:
@@ -24,60 +117,161 @@ class PathGen:
             return None
         return lat, lon
 
-    def _get_coords_from_addr(self, location: str, distance: float) -> list:
-        coordinates = self._addr_to_coords(location)[0]  # Get the first coordinate pair
-
-        route = self.client.directions(
-            coordinates=[coordinates],  # Use as starting point for round trip
-            profile="foot-walking",
-            format="geojson",
-            instructions=True,
-            validate=False,
-            options={
-                "avoid_features": ["fords", "ferries"],
-                "profile_params": {"weightings": {"green": 1, "quiet": 0}},
-                "round_trip": {"length": distance, "points": 20, "seed": randint(1, 10000)},
-            },
+    def _get_coords_from_list(self, location: list[list[float]], distance: float, seed: int | None = None) -> list:
+        return self._round_trip(location, distance, points=100, seed=seed)
+
+    def _round_trip(self, coordinates: list[list[float]], distance: float, points: int, seed: int | None) -> list:
+        """
+        Return a round trip of roughly `distance` metres starting at coordinates[0].
+        Seeded requests are deterministic on the ORS side, so they are cached by start cell and distance bucket;
+        unseeded requests get a fresh random seed and always go to ORS.
+        """
+        if seed is None:
+            return self._best_round_trip(coordinates, distance, points, randint(1, 10000))[0]
+
+        distance = max(1, round(distance / self.distance_bucket_m)) * self.distance_bucket_m
+        lon, lat = coordinates[0][0], coordinates[0][1]
+        backend = "local" if self.local_router is not None else "ors"
+        route_key = (
+            _quantize(lat, lon, self.route_precision),
+            distance,
+            points,
+            seed,
+            self.route_candidates,
+            _ROUTE_OPTIONS_KEY,
+            # The local router and ORS build different loops for the same seed
+            backend,
         )
+        cached = self.route_cache.get(route_key)
+        if cached is not None:
+            return [list(coord) for coord in cached]
 
-        coord_list = list(route["features"][0]["geometry"]["coordinates"])
-        return coord_list
-
-    def _get_coords_from_list(self, location: list[list[float]], distance: float) -> list:
-        route = self.client.directions(
-            coordinates=location,
-            profile="foot-walking",
-            format="geojson",
-            instructions=True,
-            validate=False,
-            options={
-                "avoid_features": ["fords", "ferries"],
-                "profile_params": {"weightings": {"green": 1, "quiet": 0}},
-                "round_trip": {"length": distance, "points": 100, "seed": randint(1, 10000)},
-            },
+        coord_list, routed_by = self.flight.do(
+            ("route", route_key), self._best_round_trip, coordinates, distance, points, seed
         )
+        # An ORS fallback for a start the local graph cannot route is not what this key promises
+        if routed_by == backend:
+            self.route_cache.set(route_key, coord_list)
+        return [list(coord) for coord in coord_list]
+
+    def _best_round_trip(
+        self, coordinates: list[list[float]], distance: float, points: int, seed: int
+    ) -> tuple[list, str]:
+        """
+        ORS treats the round-trip length as a hint, so with route_candidates > 1 several seeds are requested
+        concurrently and the loop whose measured length is closest to `distance` wins. Stops early once a
+        candidate is within route_length_tolerance and stops waiting at the deadline; if no candidate is back by
+        then, raises TimeoutError. Returns the coordinates and the backend that routed them.
+        """
+        if self.route_candidates <= 1:
+            return self._directions(coordinates, distance, points, seed)
+
+        seeds = [(seed - 1 + i * _CANDIDATE_SEED_STRIDE) % 10000 + 1 for i in range(self.route_candidates)]
+        futures = [
+            submit_with_context(self._candidate_executor, self._directions, coordinates, distance, points, s)
+            for s in seeds
+        ]
+        best_coords, best_backend, best_error = None, "ors", math.inf
+        last_error: Exception | None = None
+        pending = set(futures)
+        deadline = time.monotonic() + self.candidate_deadline_s
+        try:
+            while pending:
+                done, pending = wait(
+                    pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for future in done:
+                    try:
+                        coords, backend = future.result()
+                    except Exception as e:
+                        last_error = e
+                        continue
+                    error = abs(path_length_m(coords) - distance) / distance
+                    if error < best_error:
+                        best_coords, best_backend, best_error = coords, backend, error
+                if best_error <= self.length_tolerance:
+                    break
+        finally:
+            for future in pending:
+                future.cancel()
+
+        if best_coords is None:
+            if pending:
+                raise TimeoutError(f"No route candidate returned within {self.candidate_deadline_s}s")
+            raise last_error or RuntimeError("No route candidates returned")
+        return best_coords, best_backend
+
+    def _directions(self, coordinates: list[list[float]], distance: float, points: int, seed: int) -> tuple[list, str]:
+        """
+        Route one round trip, returning the coordinates and the backend ("local" or "ors") that produced them.
+        """
+        if self.local_router is not None:
+            try:
+                with span("directions", seed=seed, distance_m=round(distance), backend="local"):
+                    coords = self.local_router.round_trip(coordinates[0][0], coordinates[0][1], distance, seed)
+                return coords, "local"
+            except LocalRoutingError as e:
+                logger.warning("Local routing failed, falling back to ORS", error=str(e))
+        if self.hedger is not None:
+            return self.hedger.call(self._request_directions, coordinates, distance, points, seed), "ors"
+        return self._request_directions(coordinates, distance, points, seed), "ors"
+
+    def _request_directions(self, coordinates: list[list[float]], distance: float, points: int, seed: int) -> list:
+        with span("directions", seed=seed, distance_m=round(distance)), upstream_call("ors", "directions"):
+            route = self.client.directions(
+                coordinates=coordinates,  # Use as starting point for round trip
+                profile="foot-walking",
+                format="geojson",
+                instructions=True,
+                validate=False,
+                options={
+                    **_ROUTE_OPTIONS,
+                    "round_trip": {"length": distance, "points": points, "seed": seed},
+                },
+            )
 
         coord_list = list(route["features"][0]["geometry"]["coordinates"])
         return coord_list
 
     def _addr_to_coords(self, addr: str):
-        geocode = self.client.pelias_search(
-            text=addr,
-            validate=False,
-        )
+        addr_key = normalize_key(addr)
+        cached = self.geocode_cache.get(addr_key)
+        if cached is not None:
+            return [list(coord) for coord in cached]
+
+        coordinates = self.flight.do(("geocode", addr_key), self._geocode, addr)
+        self.geocode_cache.set(addr_key, coordinates)
+        return [list(coord) for coord in coordinates]
+
+    def _geocode(self, addr: str) -> list[list[float]]:
+        with span("geocode"), upstream_call("ors", "pelias_search"):
+            geocode = self.client.pelias_search(
+                text=addr,
+                validate=False,
+            )
 
-        coordinates = [
+        return [
             list(geocode["features"][0]["geometry"]["coordinates"]),
         ]
 
-        return coordinates
-
     def _coords_to_addr(self, lat: float, lon: float) -> str | None:
+        cell = _quantize(lat, lon, self.reverse_precision)
+        label = self.reverse_cache.get(cell)
+        if label is None:
+            label = self.flight.do(("reverse_geocode", cell), self._reverse_geocode, lat, lon)
+            if label:
+                self.reverse_cache.set(cell, label)
+        return label
+
+    def _reverse_geocode(self, lat: float, lon: float) -> str | None:
         reverse = getattr(self.client, "pelias_reverse", None)
         if reverse is None:
             return None
         try:
-            result = reverse(point=[lon, lat], size=1, validate=False)
+            with span("reverse_geocode"), upstream_call("ors", "pelias_reverse"):
+                result = reverse(point=[lon, lat], size=1, validate=False)
         except Exception:
             return None
 
@@ -88,8 +282,8 @@ class PathGen:
         props = features[0].get("properties", {})
         return props.get("label") or props.get("name")
 
-    def _get_maps_url(self, route_coords: list):
-        downsampled_coords = self._downsample_coords(route_coords)
+    def _get_maps_url(self, route_coords):
+        downsampled_coords = self._downsample_coords(route_coords, max_waypoints=self.maps_waypoints)
 
         waypoints = []
 
@@ -110,16 +304,18 @@ class PathGen:
         return url
 
     def _downsample_coords(self, route_coords, max_waypoints=23):
-        if len(route_coords) > max_waypoints + 2:
-            step = len(route_coords) // (max_waypoints + 1)
-            sampled_coords = route_coords[::step]
-            if route_coords[-1] not in sampled_coords:
-                sampled_coords[-1] = route_coords[-1]
-            route_coords = sampled_coords
-
-        return route_coords
+        return simplify_route(route_coords, max_waypoints + 2)
 
     def _build_folium_map(self, coords: list[list[float]]) -> str | None:
+        html = self.render_map_html(coords)
+        if html is None:
+            return None
+        return "data:text/html;base64," + base64.b64encode(html.encode("utf-8")).decode("ascii")
+
+    def render_map_html(self, coords: list[list[float]]) -> str | None:
+        """
+        Render the route as a standalone Folium HTML document, or None if there is nothing to draw.
+        """
         try:
             latlngs = [
                 (lat, lon) for lon, lat in coords if isinstance(lat, (float, int)) and isinstance(lon, (float, int))
@@ -130,43 +326,92 @@ class PathGen:
             mid_index = len(latlngs) // 2
             midpoint = latlngs[mid_index]
 
-            fmap = folium.Map(location=midpoint, zoom_start=13, control_scale=True, tiles="cartodbpositron")
-            folium.PolyLine(latlngs, weight=6, opacity=0.85, color="#4f46e5").add_to(fmap)
-            folium.CircleMarker(latlngs[0], radius=6, color="#fff", weight=2, fill=True, fill_color="#4f46e5").add_to(
-                fmap
-            )
-            folium.CircleMarker(latlngs[-1], radius=6, color="#fff", weight=2, fill=True, fill_color="#4338ca").add_to(
-                fmap
-            )
+            with span("map_render", points=len(latlngs)):
+                fmap = folium.Map(location=midpoint, zoom_start=13, control_scale=True, tiles="cartodbpositron")
+                folium.PolyLine(latlngs, weight=6, opacity=0.85, color="#4f46e5").add_to(fmap)
+                folium.CircleMarker(
+                    latlngs[0], radius=6, color="#fff", weight=2, fill=True, fill_color="#4f46e5"
+                ).add_to(fmap)
+                folium.CircleMarker(
+                    latlngs[-1], radius=6, color="#fff", weight=2, fill=True, fill_color="#4338ca"
+                ).add_to(fmap)
 
-            fmap.fit_bounds(latlngs, padding=(30, 30))
+                fmap.fit_bounds(latlngs, padding=(30, 30))
 
-            html = fmap.get_root().render()
-            return "data:text/html;base64," + base64.b64encode(html.encode("utf-8")).decode("ascii")
+                return fmap.get_root().render()
         except Exception:
             return None
 
-    def generate_path(self, location: str, album_length: int) -> tuple[str, str, list[dict[str, float]], str | None]:
-        walking_speed_kmh = 2.5
-        distance_km = (album_length / 3_600_000) * walking_speed_kmh
-        distance_m = distance_km * 1000
-
-        resolved_location = location
+    def resolve_start(self, location: str) -> dict:
+        """
+        Geocode stage: turn free text or a "lat,lon" string into a display address and a [lon, lat] start point.
+        Independent of the album, so callers can run it alongside the Spotify lookup.
+        """
         coord_pair = self._parse_coordinate_string(location)
         if coord_pair:
             lat, lon = coord_pair
-            addr = self._coords_to_addr(lat, lon)
-            if addr:
-                resolved_location = addr
-                route_coords = self._get_coords_from_addr(resolved_location, distance_m)
-            else:
-                route_coords = self._get_coords_from_list([[lon, lat]], distance_m)
-        else:
-            route_coords = self._get_coords_from_addr(resolved_location, distance_m)
-
-        sampled_coords = self._downsample_coords(route_coords)
-
-        preview_coords = [{"lat": coord[1], "lon": coord[0]} for coord in sampled_coords]
-        map_embed = self._build_folium_map(route_coords)
+            # Route from the coordinates we already have; the label is only for display. A labelled start gets
+            # the same 20-point loop as an address start, a bare coordinate the finer 100-point one.
+            label = self._coords_to_addr(lat, lon)
+            return {
+                "address": label or location,
+                "coordinates": [lon, lat],
+                "points": 20 if label else 100,
+            }
+
+        return {
+            "address": location,
+            "coordinates": self._addr_to_coords(location)[0],  # Get the first coordinate pair
+            "points": 20,
+        }
+
+    def build_route(self, start: dict, album_length: int, seed: int | None = None, embed_map: bool = False) -> dict:
+        """
+        Routing stage: generate the round trip for a resolved start and derive the preview and maps link.
+        The inline Folium embed is only rendered when asked for; the API serves the map from its own endpoint.
+        """
+        walking_speed_kmh = 2.5
+        distance_km = (album_length / 3_600_000) * walking_speed_kmh
+        distance_m = distance_km * 1000
 
-        return self._get_maps_url(sampled_coords), resolved_location, preview_coords, map_embed
+        route_coords = self._round_trip([start["coordinates"]], distance_m, points=start["points"], seed=seed)
+        with span("simplify", points=len(route_coords)):
+            # Convert once; both simplifications below work on the same array.
+            route_array = np.asarray(route_coords, dtype=np.float64)
+            sampled_coords, route_preview = self._build_preview(route_array)
+            route_length_m = path_length_m(route_array)
+            maps_url = self._get_maps_url(route_array)
+
+        return {
+            "route_coords": route_coords,
+            "route_length_m": route_length_m,
+            "length_error": (route_length_m - distance_m) / distance_m if distance_m else 0.0,
+            "sampled_coords": sampled_coords,
+            "maps_url": maps_url,
+            "route_preview": route_preview,
+            "map_embed_html": self._build_folium_map(route_coords) if embed_map else None,
+        }
+
+    def _build_preview(self, route_coords) -> tuple[list[list[float]], list[dict[str, float]]]:
+        sampled_coords = simplify_route(route_coords, self.preview_points)
+        return sampled_coords, [{"lat": coord[1], "lon": coord[0]} for coord in sampled_coords]
+
+    def generate_path(
+        self, location: str, album_length: int, seed: int | None = None, embed_map: bool = True
+    ) -> tuple[str, str, list[dict[str, float]], str | None]:
+        start = self.resolve_start(location)
+        route = self.build_route(start, album_length, seed=seed, embed_map=embed_map)
+        return route["maps_url"], start["address"], route["route_preview"], route["map_embed_html"]
+
+    def http_stats(self) -> dict:
+        return session_stats(self.session)
+
+    def single_flight_stats(self) -> dict:
+        return self.flight.stats()
+
+    def cache_stats(self) -> dict:
+        return {
+            "geocode": self.geocode_cache.stats(),
+            "reverse_geocode": self.reverse_cache.stats(),
+            "route": self.route_cache.stats(),
+        }
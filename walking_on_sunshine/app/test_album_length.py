@@ -0,0 +1,229 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from walking_on_sunshine.app.album_length import AlbumLength
+
+
+@pytest.fixture
+def mock_sp():
+    with patch("walking_on_sunshine.app.album_length.Spotify") as MockSpotify:
+        sp = MagicMock()
+        MockSpotify.return_value = sp
+        sp.search.return_value = {"albums": {"items": [{"id": "album_1"}]}}
+        sp.album.return_value = {
+            "name": "Abbey Road",
+            "artists": [{"name": "The Beatles"}],
+            "total_tracks": 2,
+            "release_date": "1969-09-26",
+            "images": [{"url": "https://img/1"}],
+        }
+        sp.album_tracks.return_value = {"items": [{"duration_ms": 1000}, {"duration_ms": 2000}], "next": None}
+        yield sp
+
+
+def test_get_album_details_builds_details(mock_sp):
+    al = AlbumLength("id", "secret")
+    details = al.get_album_details("Abbey Road")
+
+    assert details["id"] == "album_1"
+    assert details["artist"] == "The Beatles"
+    assert details["total_ms"] == 3000
+    assert details["release_year"] == "1969"
+    assert details["image_url"] == "https://img/1"
+
+
+def test_get_album_details_serves_repeat_requests_from_cache(mock_sp):
+    al = AlbumLength("id", "secret")
+    first = al.get_album_details("Abbey Road")
+    second = al.get_album_details("  abbey   ROAD ")
+    by_id = al.get_album_details("ignored", album_id="album_1")
+
+    assert first == second == by_id
+    mock_sp.search.assert_called_once()
+    mock_sp.album.assert_called_once()
+    mock_sp.album_tracks.assert_called_once()
+
+    stats = al.cache_stats()
+    assert stats["album_names"]["hits"] == 1
+    assert stats["album_names"]["misses"] == 1
+    assert stats["album_details"]["hits"] == 2
+    assert stats["album_details"]["misses"] == 1
+
+
+def test_get_album_details_returns_copies(mock_sp):
+    al = AlbumLength("id", "secret")
+    al.get_album_details("Abbey Road")["name"] = "mutated"
+
+    assert al.get_album_details("Abbey Road")["name"] == "Abbey Road"
+
+
+def test_search_albums_reuses_cached_prefix(mock_sp):
+    mock_sp.search.return_value = {
+        "albums": {
+            "items": [
+                {"id": "a1", "name": "Abbey Road", "artists": [{"name": "The Beatles"}], "images": []},
+                {"id": "a2", "name": "ABBA Gold", "artists": [{"name": "ABBA"}], "images": [{"url": "u"}]},
+            ]
+        }
+    }
+    al = AlbumLength("id", "secret")
+
+    first = al.search_albums("abb")
+    narrowed = al.search_albums("abbey")
+
+    assert [album["id"] for album in first] == ["a1", "a2"]
+    assert narrowed == [{"id": "a1", "name": "Abbey Road", "artist": "The Beatles", "image": None}]
+    mock_sp.search.assert_called_once_with("album:abb", type="album", limit=50)
+
+
+def test_get_album_details_reuses_embedded_track_page(mock_sp):
+    mock_sp.album.return_value = {
+        "name": "Abbey Road",
+        "tracks": {"items": [{"duration_ms": 1000}], "next": "page_2"},
+    }
+    mock_sp.next.return_value = {"items": [{"duration_ms": 500}], "next": None}
+    al = AlbumLength("id", "secret")
+
+    details = al.get_album_details("Abbey Road", album_id="album_1")
+
+    assert details["total_ms"] == 1500
+    mock_sp.album_tracks.assert_not_called()
+    mock_sp.next.assert_called_once()
+
+
+def test_get_many_album_details_batches_uncached_ids(mock_sp):
+    ids = [f"album_{i}" for i in range(45)]
+
+    def albums(chunk):
+        return {
+            "albums": [
+                {"name": album_id, "tracks": {"items": [{"duration_ms": 100}], "next": None}} for album_id in chunk
+            ]
+        }
+
+    mock_sp.albums.side_effect = albums
+    al = AlbumLength("id", "secret")
+    al.get_album_details("cached", album_id="album_0")
+
+    details = al.get_many_album_details([*ids, "album_1"])
+
+    assert list(details) == ids
+    assert details["album_44"]["total_ms"] == 100
+    assert [len(call.args[0]) for call in mock_sp.albums.call_args_list] == [20, 20, 4]
+    assert al.get_album_details("ignored", album_id="album_44")["name"] == "album_44"
+    assert mock_sp.albums.call_count == 3
+
+
+def test_get_many_album_details_skips_unknown_ids(mock_sp):
+    mock_sp.albums.return_value = {"albums": [None]}
+    al = AlbumLength("id", "secret")
+
+    assert al.get_many_album_details(["missing"]) == {}
+
+
+def test_concurrent_album_misses_share_one_upstream_fetch(mock_sp):
+    release = threading.Event()
+
+    def slow_album(album_id):
+        release.wait(timeout=5)
+        return {"name": "Abbey Road", "tracks": {"items": [{"duration_ms": 1000}], "next": None}}
+
+    mock_sp.search.return_value = {"albums": {"items": [{"id": "a1", "name": "Abbey Road"}]}}
+    mock_sp.album.side_effect = slow_album
+    al = AlbumLength("id", "secret")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(al.get_album_details, "Abbey Road") for _ in range(3)]
+        for _ in range(500):
+            if al.single_flight_stats()["coalesced_by_kind"].get("album") == 2:
+                break
+            threading.Event().wait(0.01)
+        release.set()
+        results = [f.result(timeout=5) for f in futures]
+
+    assert all(result["name"] == "Abbey Road" for result in results)
+    mock_sp.album.assert_called_once_with("a1")
+
+
+def _wait_for_refreshes(al):
+    al._refresh_executor.shutdown(wait=True)
+
+
+@patch("walking_on_sunshine.app.album_length.time.time")
+def test_stale_details_are_served_while_refreshed_in_background(mock_time, mock_sp):
+    mock_time.return_value = 1000.0
+    al = AlbumLength("id", "secret", fresh_ttl_s=10)
+    al.get_album_details("Abbey Road", album_id="album_1")
+
+    mock_time.return_value = 1011.0
+    mock_sp.album.return_value = {**mock_sp.album.return_value, "name": "Abbey Road (Remastered)"}
+    stale = al.get_album_details("Abbey Road", album_id="album_1")
+    _wait_for_refreshes(al)
+
+    assert stale["name"] == "Abbey Road"
+    assert al.get_album_details("Abbey Road", album_id="album_1")["name"] == "Abbey Road (Remastered)"
+    assert al.refresh_stats() == {"stale_hits": 1, "refreshes": 1, "refresh_errors": 0}
+
+
+@patch("walking_on_sunshine.app.album_length.time.time")
+def test_failed_refresh_keeps_serving_stale_details(mock_time, mock_sp):
+    mock_time.return_value = 1000.0
+    al = AlbumLength("id", "secret", fresh_ttl_s=10, refresh_retry_s=60)
+    al.get_album_details("Abbey Road", album_id="album_1")
+
+    mock_time.return_value = 1011.0
+    mock_sp.album.side_effect = ConnectionError("spotify down")
+    al.get_album_details("Abbey Road", album_id="album_1")
+    _wait_for_refreshes(al)
+    # Within refresh_retry_s the failed refresh is not queued again
+    stale = al.get_album_details("Abbey Road", album_id="album_1")
+
+    assert stale["name"] == "Abbey Road"
+    assert mock_sp.album.call_count == 2
+    assert al.refresh_stats()["refresh_errors"] == 1
+
+
+@patch("walking_on_sunshine.app.album_length.time.time")
+def test_refresh_hot_refreshes_popular_albums_before_they_go_stale(mock_time, mock_sp):
+    mock_time.return_value = 1000.0
+    al = AlbumLength("id", "secret", fresh_ttl_s=100, refresh_top_n=1, refresh_ahead=0.8)
+    for _ in range(3):
+        al.get_album_details("Abbey Road", album_id="hot")
+    al.get_album_details("Let It Be", album_id="cold")
+    mock_sp.album.reset_mock()
+
+    mock_time.return_value = 1070.0
+    assert al.refresh_hot() == 0
+
+    mock_time.return_value = 1085.0
+    assert al.refresh_hot() == 1
+    _wait_for_refreshes(al)
+
+    mock_sp.album.assert_called_once_with("hot")
+    assert al.refresh_stats()["stale_hits"] == 0
+
+
+def test_only_interactive_lookups_count_towards_popularity(mock_sp):
+    mock_sp.albums.return_value = {"albums": [{**mock_sp.album.return_value, "tracks": {"items": [], "next": None}}]}
+    al = AlbumLength("id", "secret")
+
+    al.get_many_album_details(["warmed"])
+    al.get_album_details("Let It Be", album_id="bulk", interactive=False)
+    al.get_album_details("Abbey Road", album_id="requested")
+
+    assert al.popularity.top(10) == ["requested"]
+
+
+def test_failed_refresh_prunes_expired_failures(mock_sp):
+    al = AlbumLength("id", "secret", fresh_ttl_s=10, refresh_retry_s=60)
+    now = time.monotonic()
+    al._refresh_failed_at = {"expired": now - 120, "recent": now - 30}
+    mock_sp.album.side_effect = ConnectionError("spotify down")
+
+    al._refresh("album_1", "Abbey Road")
+
+    assert set(al._refresh_failed_at) == {"recent", "album_1"}
@@ -0,0 +1,134 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from walking_on_sunshine.app.app import App
+from walking_on_sunshine.app.config import Config
+from walking_on_sunshine.common.cache.prefix_cache import PrefixCache
+from walking_on_sunshine.common.cache.sqlite_cache import SQLiteCache
+
+
+@pytest.fixture
+def app():
+    with (
+        patch("walking_on_sunshine.app.app.AlbumLength") as MockAlbumLength,
+        patch("walking_on_sunshine.app.app.PathGen") as MockPathGen,
+    ):
+        MockAlbumLength.return_value = MagicMock()
+        MockPathGen.return_value = MagicMock()
+        app = App(Config())
+        app.album_length._time_format.return_value = "30:00"
+        app.path_gen.build_route.return_value = {
+            "route_coords": [[-122.4, 37.78], [-122.41, 37.79]],
+            "sampled_coords": [[-122.4, 37.78]],
+            "route_length_m": 1300.0,
+            "length_error": 0.04,
+            "maps_url": "https://www.google.com/maps/dir/",
+            "route_preview": [{"lat": 37.78, "lon": -122.4}],
+            "map_embed_html": None,
+        }
+        yield app
+
+
+def test_run_overlaps_album_lookup_and_geocoding(app):
+    geocode_started = threading.Event()
+
+    def resolve_start(location):
+        geocode_started.set()
+        return {"address": "1 Market St", "coordinates": [-122.4, 37.78], "points": 20}
+
+    def get_album_details(album_name, album_id=None, interactive=True):
+        # Only completes if the geocode stage is running at the same time.
+        assert geocode_started.wait(timeout=5)
+        return {"id": "album_1", "name": album_name, "total_ms": 30 * 60 * 1000}
+
+    app.path_gen.resolve_start.side_effect = resolve_start
+    app.album_length.get_album_details.side_effect = get_album_details
+
+    result = app.run("Abbey Road", "1 Market St")
+
+    assert result["start_address"] == "1 Market St"
+    assert result["distance_km"] == 1.25
+    app.path_gen.build_route.assert_called_once_with(
+        {"address": "1 Market St", "coordinates": [-122.4, 37.78], "points": 20},
+        30 * 60 * 1000,
+        seed=None,
+        embed_map=False,
+    )
+
+
+def test_run_derives_seed_in_deterministic_mode(app):
+    app.config = Config(route_seed_mode="deterministic")
+    app.path_gen.resolve_start.return_value = {"address": "x", "coordinates": [0.0, 0.0], "points": 20}
+    app.album_length.get_album_details.return_value = {"id": "album_1", "total_ms": 60_000}
+
+    seeded = app.run("Abbey Road", "1 Market St")
+    rerolled = app.run("Abbey Road", "1 Market St", reroll=True)
+    explicit = app.run("Abbey Road", "1 Market St", seed=42)
+
+    assert seeded["seed"] is not None
+    assert seeded["seed"] == app.run("Abbey Road", "1 Market St")["seed"]
+    assert rerolled["seed"] is None
+    assert explicit["seed"] == 42
+
+
+def test_run_registers_route_for_lazy_map_rendering(app):
+    app.path_gen.resolve_start.return_value = {"address": "x", "coordinates": [0.0, 0.0], "points": 20}
+    app.album_length.get_album_details.return_value = {"id": "album_1", "total_ms": 60_000}
+    app.path_gen.render_map_html.return_value = "<html>map</html>"
+
+    result = app.run("Abbey Road", "1 Market St")
+
+    assert result["map_url"] == f"/routes/{result['route_id']}/map"
+    assert result["map_embed_html"] is None
+    app.path_gen.render_map_html.assert_not_called()
+
+    html, etag = app.render_route_map(result["route_id"])
+    assert html == "<html>map</html>"
+    assert etag.startswith('"')
+    assert app.render_route_map(result["route_id"]) == (html, etag)
+    app.path_gen.render_map_html.assert_called_once_with([[-122.4, 37.78], [-122.41, 37.79]])
+    assert app.render_route_map("unknown") is None
+
+
+def test_sqlite_cache_backend_shares_one_file(tmp_path):
+    cache_path = str(tmp_path / "cache.sqlite3")
+    with (
+        patch("walking_on_sunshine.app.app.AlbumLength") as MockAlbumLength,
+        patch("walking_on_sunshine.app.app.PathGen") as MockPathGen,
+    ):
+        App(Config(cache_backend="sqlite", cache_path=cache_path))
+
+    details_cache = MockAlbumLength.call_args.kwargs["details_cache"]
+    route_cache = MockPathGen.call_args.kwargs["route_cache"]
+    assert isinstance(details_cache, SQLiteCache)
+    assert (details_cache.path, details_cache.namespace) == (cache_path, "album_details")
+    assert (route_cache.path, route_cache.namespace) == (cache_path, "route")
+    assert isinstance(MockAlbumLength.call_args.kwargs["search_cache"], PrefixCache)
+
+
+def test_album_cache_keeps_details_for_max_staleness_past_fresh_ttl():
+    config = Config(album_cache={"max_size": 10, "ttl_s": 3600}, album_refresh={"max_stale_s": 600})
+    with (
+        patch("walking_on_sunshine.app.app.AlbumLength") as MockAlbumLength,
+        patch("walking_on_sunshine.app.app.PathGen"),
+    ):
+        App(config)
+
+    kwargs = MockAlbumLength.call_args.kwargs
+    assert kwargs["fresh_ttl_s"] == 3600
+    assert kwargs["details_cache"].ttl_s == 4200
+
+
+def test_run_reports_each_stage_and_renders_the_inline_map_last(app):
+    app.path_gen.resolve_start.return_value = {"address": "1 Market St", "coordinates": [0.0, 0.0], "points": 20}
+    app.album_length.get_album_details.return_value = {"id": "album_1", "name": "Abbey Road", "total_ms": 60_000}
+    app.path_gen._build_folium_map.return_value = "data:text/html;base64,bWFw"
+    stages = []
+
+    result = app.run("Abbey Road", "1 Market St", embed_map=True, on_stage=lambda stage, payload: stages.append(stage))
+
+    assert stages == ["album", "start", "route", "maps", "map"]
+    assert app.path_gen.build_route.call_args.kwargs["embed_map"] is False
+    assert result["map_embed_html"] == "data:text/html;base64,bWFw"
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from walking_on_sunshine.app.geometry import (
+    decode_polyline,
+    encode_polyline,
+    format_coords,
+    path_length_m,
+    simplify_route,
+)
+
+
+def test_encode_polyline_matches_reference_example():
+    # Example from Google's polyline algorithm documentation, as [lon, lat] pairs.
+    coords = [[-120.2, 38.5], [-120.95, 40.7], [-126.453, 43.252]]
+    assert encode_polyline(coords) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+
+
+@pytest.mark.parametrize("precision", [5, 6])
+def test_decode_polyline_round_trips(precision):
+    coords = [[-122.41941, 37.77493], [-122.4, 37.78], [-122.41941, 37.77493]]
+    decoded = decode_polyline(encode_polyline(coords, precision), precision)
+    assert len(decoded) == len(coords)
+    for got, expected in zip(decoded, coords, strict=True):
+        assert got == pytest.approx(expected, abs=10**-precision)
+
+
+def test_format_coords_variants():
+    coords = [[-122.4194123, 37.7749321], [-122.4, 37.78]]
+
+    assert format_coords(coords) == [{"lat": 37.7749321, "lon": -122.4194123}, {"lat": 37.78, "lon": -122.4}]
+    assert format_coords(coords, "columnar", 4) == {"lat": [37.7749, 37.78], "lon": [-122.4194, -122.4]}
+    assert format_coords(coords, "polyline") == encode_polyline(coords)
+    assert format_coords([], "columnar") == {"lat": [], "lon": []}
+    assert format_coords([], "polyline") == ""
+
+
+def test_simplify_route_keeps_corners_and_drops_straight_runs():
+    leg_east = [[-122.4 + i * 0.0001, 37.78] for i in range(100)]
+    leg_north = [[-122.4 + 100 * 0.0001, 37.78 + i * 0.0001] for i in range(100)]
+    route = leg_east + leg_north
+
+    out = simplify_route(route, 3)
+
+    assert out == [route[0], leg_north[0], route[-1]]
+
+
+def test_simplify_route_handles_closed_loops():
+    t = np.linspace(0, 2 * np.pi, 1000)
+    loop = np.column_stack((-122.4 + 0.01 * np.cos(t), 37.78 + 0.01 * np.sin(t)))
+    loop[-1] = loop[0]
+
+    out = simplify_route(loop, 25)
+
+    assert len(out) == 25
+    assert out[0] == out[-1] == loop[0].tolist()
+    # The furthest point from the start of a circle is the opposite side.
+    assert [-122.41, 37.78] in [[round(lon, 3), round(lat, 3)] for lon, lat in out]
+
+
+def test_simplify_route_returns_short_routes_unchanged():
+    route = [[-122.4, 37.78], [-122.41, 37.79]]
+    assert simplify_route(route, 25) == route
+
+
+def test_path_length_m_matches_known_distance():
+    # One degree of latitude is about 111.2 km.
+    assert path_length_m([[0.0, 0.0], [0.0, 1.0]]) == pytest.approx(111_195, rel=1e-3)
+    assert path_length_m([[0.0, 0.0], [0.0, 1.0], [0.0, 0.0]]) == pytest.approx(222_390, rel=1e-3)
+    assert path_length_m([[0.0, 0.0]]) == 0.0
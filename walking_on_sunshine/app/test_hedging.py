@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from walking_on_sunshine.app.hedging import Hedger
+
+
+def test_call_returns_fast_primary_without_hedging():
+    hedger = Hedger(default_delay_s=1.0)
+
+    assert hedger.call(lambda x: x + 1, 1) == 2
+    assert hedger.stats()["hedges_fired"] == 0
+
+
+def test_call_fires_backup_when_primary_is_slow():
+    hedger = Hedger(default_delay_s=0.05)
+    release_primary = threading.Event()
+    calls = []
+
+    def upstream():
+        calls.append(None)
+        if len(calls) == 1:
+            release_primary.wait(timeout=5)
+            return "primary"
+        return "backup"
+
+    assert hedger.call(upstream) == "backup"
+    release_primary.set()
+
+    stats = hedger.stats()
+    assert stats["hedges_fired"] == 1
+    assert stats["hedges_won"] == 1
+
+
+def test_call_falls_back_to_the_other_call_on_error():
+    hedger = Hedger(default_delay_s=0.05)
+    calls = []
+
+    def upstream():
+        calls.append(None)
+        if len(calls) == 1:
+            threading.Event().wait(0.2)
+            return "primary"
+        raise RuntimeError("backup failed")
+
+    assert hedger.call(upstream) == "primary"
+    assert hedger.stats()["hedges_won"] == 0
+
+
+def test_call_raises_when_primary_fails_fast():
+    hedger = Hedger()
+
+    def upstream():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        hedger.call(upstream)
+
+
+def test_hedge_rate_is_capped():
+    hedger = Hedger(default_delay_s=0.01, max_hedge_rate=0.0)
+    gate = threading.Event()
+
+    def slow():
+        gate.wait(0.05)
+        return "ok"
+
+    assert hedger.call(slow) == "ok"
+    assert hedger.call(slow) == "ok"
+    assert hedger.stats()["hedges_fired"] == 1
+
+
+def test_delay_tracks_latency_percentile():
+    hedger = Hedger(min_samples=5, min_delay_s=0.0, percentile=50)
+    assert hedger.delay_s() == hedger.default_delay_s
+
+    hedger._latencies.extend([0.1, 0.2, 0.3, 0.4, 0.5])
+    assert hedger.delay_s() == pytest.approx(0.3)
@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from walking_on_sunshine.app.geometry import path_length_m
+from walking_on_sunshine.app.local_router import LocalRouter, LocalRoutingError, WalkingGraph
+
+SMALL_CITY = Path(__file__).parent / "testdata" / "small_city.geojson"
+
+# Grid of 15 x 15 intersections, 0.001 deg apart east-west and 0.0009 deg north-south, with a river between
+# rows 7 and 8 that only columns 2 and 12 bridge. A ford, a ferry and a freeway also cross it but are not walkable.
+LON0, LAT0, DLON, DLAT = -122.42, 37.77, 0.001, 0.0009
+
+
+def _node(graph, i, j):
+    node, snap_m = graph.nearest_node(LON0 + i * DLON, LAT0 + j * DLAT)
+    assert snap_m < 1
+    return node
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return WalkingGraph.from_geojson(SMALL_CITY)
+
+
+def test_from_geojson_builds_csr_without_unwalkable_ways(graph):
+    assert len(graph) == 15 * 15
+    assert graph.indptr[-1] == len(graph.indices) == len(graph.cost)
+    # Rows: 15 x 14 segments, columns: 13 x 13 + 2 x 14, park paths: 6, each stored in both directions.
+    assert len(graph.indices) == 2 * (15 * 14 + 13 * 13 + 2 * 14 + 6)
+
+
+def test_shortest_path_avoids_ford_and_ferry(graph):
+    south, north = _node(graph, 7, 7), _node(graph, 7, 8)
+
+    path = graph.shortest_path(south, north)
+
+    lons = graph.lon[path]
+    # Has to detour over the bridge on column 2 or 12 instead of the ford right there.
+    assert np.isclose(lons, LON0 + 2 * DLON).any() or np.isclose(lons, LON0 + 12 * DLON).any()
+    assert path[0] == south and path[-1] == north
+
+
+def _line(coords, highway):
+    return {
+        "type": "Feature",
+        "properties": {"highway": highway},
+        "geometry": {"type": "LineString", "coordinates": coords},
+    }
+
+
+@pytest.mark.parametrize(("detour_lat", "takes_footway"), [(0.0006, True), (0.0012, False)])
+def test_shortest_path_prefers_green_paths_within_the_bonus(detour_lat, takes_footway):
+    # A straight street from west to east and a footway bowing north between the same ends. The footway is
+    # ~17% longer at 0.0006 deg, inside the 30% green bonus, and ~56% longer at 0.0012 deg, outside it.
+    graph = WalkingGraph.from_geojson(
+        {
+            "type": "FeatureCollection",
+            "features": [
+                _line([[0.0, 0.0], [0.002, 0.0]], "residential"),
+                _line([[0.0, 0.0], [0.001, detour_lat], [0.002, 0.0]], "footway"),
+            ],
+        }
+    )
+    west, _ = graph.nearest_node(0.0, 0.0)
+    east, _ = graph.nearest_node(0.002, 0.0)
+
+    path = graph.shortest_path(west, east)
+
+    assert len(path) == (3 if takes_footway else 2)
+    assert path[0] == west and path[-1] == east
+
+
+def test_nearest_node_on_an_empty_graph_raises_local_routing_error():
+    graph = WalkingGraph.from_geojson({"type": "FeatureCollection", "features": []})
+
+    with pytest.raises(LocalRoutingError):
+        graph.nearest_node(0.0, 0.0)
+
+
+@pytest.mark.parametrize("distance_m", [1500, 2500, 4000])
+def test_round_trip_is_closed_loop_near_target_length(graph, distance_m):
+    router = LocalRouter(graph)
+
+    loop = router.round_trip(-122.413, 37.773, distance_m, seed=3)
+
+    assert loop[0] == loop[-1]
+    assert path_length_m(loop) == pytest.approx(distance_m, rel=0.3)
+    assert router.round_trip(-122.413, 37.773, distance_m, seed=3) == loop
+
+
+def test_round_trip_rejects_starts_off_the_graph(graph):
+    with pytest.raises(LocalRoutingError):
+        LocalRouter(graph).round_trip(-121.0, 37.0, 2000, seed=1)
@@ -1,9 +1,13 @@
 import math
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from walking_on_sunshine.app.path_gen import PathGen
+from walking_on_sunshine.app.local_router import LocalRoutingError
+from walking_on_sunshine.app.path_gen import PathGen, derive_seed
+from walking_on_sunshine.common.cache.ttl_cache import TTLCache
 
 
 @pytest.fixture
@@ -37,6 +41,27 @@ def test_get_coords_from_list_basic(mock_client):
     mock_client.directions.assert_called_once()
 
 
+def test_addr_to_coords_caches_by_normalized_address(mock_client):
+    mock_client.pelias_search.return_value = {"features": [{"geometry": {"coordinates": [-122.4194, 37.7749]}}]}
+    pg = PathGen(key="dummy")
+
+    assert pg._addr_to_coords("San Francisco, CA") == [[-122.4194, 37.7749]]
+    assert pg._addr_to_coords("  san francisco,   ca") == [[-122.4194, 37.7749]]
+    mock_client.pelias_search.assert_called_once()
+
+
+def test_coords_to_addr_shares_entry_within_grid_cell(mock_client):
+    mock_client.pelias_reverse.return_value = {"features": [{"properties": {"label": "1 Market St"}}]}
+    pg = PathGen(key="dummy", reverse_precision=3)
+
+    assert pg._coords_to_addr(37.77491, -122.41941) == "1 Market St"
+    assert pg._coords_to_addr(37.77489, -122.41938) == "1 Market St"
+    mock_client.pelias_reverse.assert_called_once()
+
+    pg._coords_to_addr(37.7762, -122.4194)
+    assert mock_client.pelias_reverse.call_count == 2
+
+
 @pytest.mark.parametrize("count,max_waypoints", [(2, 23), (10, 23), (50, 23)])
 def test_downsample_coords_keeps_ends_and_limits_size(count, max_waypoints):
     route = [[-122.0 + i * 0.001, 37.0 + i * 0.001] for i in range(count)]
@@ -67,7 +92,8 @@ def test_get_maps_url_lat_lon_formatting():
 
 @patch("walking_on_sunshine.app.path_gen.PathGen._build_folium_map")
 @patch("walking_on_sunshine.app.path_gen.PathGen._get_maps_url")
-@patch("walking_on_sunshine.app.path_gen.PathGen._get_coords_from_addr")
+@patch("walking_on_sunshine.app.path_gen.PathGen._round_trip")
+@patch("walking_on_sunshine.app.path_gen.PathGen._addr_to_coords")
 @pytest.mark.parametrize(
     "album_ms,expected_m",
     [
@@ -76,9 +102,10 @@ def test_get_maps_url_lat_lon_formatting():
     ],
 )
 def test_generate_path_distance_conversion(
-    mock_get_coords_from_addr, mock_get_maps_url, mock_map, album_ms, expected_m
+    mock_addr_to_coords, mock_round_trip, mock_get_maps_url, mock_map, album_ms, expected_m
 ):
-    mock_get_coords_from_addr.return_value = [[-122.4, 37.78], [-122.41, 37.79]]
+    mock_addr_to_coords.return_value = [[-122.4, 37.78]]
+    mock_round_trip.return_value = [[-122.4, 37.78], [-122.41, 37.79]]
     mock_get_maps_url.return_value = "https://www.google.com/maps/dir/37.78,-122.4/37.79,-122.41/"
     mock_map.return_value = "data:text/html;base64,abc"
 
@@ -92,16 +119,18 @@ def test_generate_path_distance_conversion(
         {"lat": 37.79, "lon": -122.41},
     ]
     assert map_html == "data:text/html;base64,abc"
-    args, _ = mock_get_coords_from_addr.call_args
-    assert args[0] == "Somewhere"
+    mock_addr_to_coords.assert_called_once_with("Somewhere")
+    args, kwargs = mock_round_trip.call_args
+    assert args[0] == [[-122.4, 37.78]]
     assert math.isclose(args[1], expected_m, rel_tol=1e-9)
+    assert kwargs == {"points": 20, "seed": None}
 
 
 @patch("walking_on_sunshine.app.path_gen.PathGen._build_folium_map")
 @patch("walking_on_sunshine.app.path_gen.PathGen._get_maps_url")
-@patch("walking_on_sunshine.app.path_gen.PathGen._get_coords_from_addr")
+@patch("walking_on_sunshine.app.path_gen.PathGen._round_trip")
 def test_generate_path_with_coordinate_string_uses_reverse_geocode(
-    mock_get_coords_from_addr, mock_get_maps_url, mock_map, mock_client
+    mock_round_trip, mock_get_maps_url, mock_map, mock_client
 ):
     mock_client.pelias_reverse.return_value = {
         "features": [
@@ -112,7 +141,7 @@ def test_generate_path_with_coordinate_string_uses_reverse_geocode(
             }
         ]
     }
-    mock_get_coords_from_addr.return_value = [[-122.4, 37.78], [-122.41, 37.79]]
+    mock_round_trip.return_value = [[-122.4, 37.78], [-122.41, 37.79]]
     mock_get_maps_url.return_value = "https://www.google.com/maps/dir/37.78,-122.4/37.79,-122.41/"
     mock_map.return_value = "data:text/html;base64,abc"
 
@@ -126,19 +155,19 @@ def test_generate_path_with_coordinate_string_uses_reverse_geocode(
     ]
     assert map_html == "data:text/html;base64,abc"
     mock_client.pelias_reverse.assert_called_once()
-    mock_get_coords_from_addr.assert_called_once()
-    args, _ = mock_get_coords_from_addr.call_args
-    assert args[0] == "1 Market St, San Francisco, CA"
+    # The label is display-only; routing starts from the original coordinates without a second geocode.
+    mock_client.pelias_search.assert_not_called()
+    mock_round_trip.assert_called_once_with([[-122.41, 37.78]], pytest.approx(1250.0), points=20, seed=None)
 
 
 @patch("walking_on_sunshine.app.path_gen.PathGen._build_folium_map")
 @patch("walking_on_sunshine.app.path_gen.PathGen._get_maps_url")
-@patch("walking_on_sunshine.app.path_gen.PathGen._get_coords_from_list")
+@patch("walking_on_sunshine.app.path_gen.PathGen._round_trip")
 def test_generate_path_with_coordinate_string_falls_back_without_reverse(
-    mock_get_coords_from_list, mock_get_maps_url, mock_map, mock_client
+    mock_round_trip, mock_get_maps_url, mock_map, mock_client
 ):
     mock_client.pelias_reverse.return_value = {}
-    mock_get_coords_from_list.return_value = [[-122.4, 37.78], [-122.41, 37.79]]
+    mock_round_trip.return_value = [[-122.4, 37.78], [-122.41, 37.79]]
     mock_get_maps_url.return_value = "https://www.google.com/maps/dir/37.78,-122.4/37.79,-122.41/"
     mock_map.return_value = "data:text/html;base64,abc"
 
@@ -151,4 +180,131 @@ def test_generate_path_with_coordinate_string_falls_back_without_reverse(
         {"lat": 37.79, "lon": -122.41},
     ]
     assert map_html == "data:text/html;base64,abc"
-    mock_get_coords_from_list.assert_called_once_with([[-122.41, 37.78]], pytest.approx(1250.0))
+    mock_round_trip.assert_called_once_with([[-122.41, 37.78]], pytest.approx(1250.0), points=100, seed=None)
+
+
+def test_round_trip_caches_seeded_routes(mock_client):
+    route_coords = [[-122.4, 37.78], [-122.405, 37.785], [-122.4, 37.78]]
+    mock_client.directions.return_value = _geojson(route_coords)
+    pg = PathGen(key="dummy")
+
+    first = pg._get_coords_from_list([[-122.40001, 37.78001]], 1240.0, seed=7)
+    second = pg._get_coords_from_list([[-122.40002, 37.78002]], 1260.0, seed=7)
+
+    assert first == second == route_coords
+    mock_client.directions.assert_called_once()
+    options = mock_client.directions.call_args.kwargs["options"]
+    assert options["round_trip"] == {"length": 1250, "points": 100, "seed": 7}
+
+
+def test_round_trip_without_seed_always_calls_directions(mock_client):
+    mock_client.directions.return_value = _geojson([[-122.4, 37.78], [-122.41, 37.79]])
+    pg = PathGen(key="dummy")
+
+    pg._get_coords_from_list([[-122.4, 37.78]], 1250.0)
+    pg._get_coords_from_list([[-122.4, 37.78]], 1250.0)
+
+    assert mock_client.directions.call_count == 2
+    assert pg.route_cache.stats()["size"] == 0
+
+
+def test_derive_seed_is_stable_and_in_range():
+    seed = derive_seed("album_1", "1 Market St")
+
+    assert seed == derive_seed("album_1", "  1 market st ")
+    assert 1 <= seed <= 10000
+    assert seed != derive_seed("album_2", "1 Market St")
+
+
+def _straight_route(length_deg):
+    return _geojson([[0.0, 0.0], [0.0, length_deg], [0.0, 0.0]])
+
+
+def test_round_trip_picks_candidate_closest_to_target_length(mock_client):
+    # 0.0045 deg of latitude is ~500 m, so each loop below is ~1000 m, ~2000 m and ~1300 m long.
+    lengths = {1: 0.0045, 2504: 0.009, 5007: 0.00585}
+    mock_client.directions.side_effect = lambda **kwargs: _straight_route(
+        lengths[kwargs["options"]["round_trip"]["seed"]]
+    )
+    pg = PathGen(key="dummy", route_candidates=3, length_tolerance=0.0)
+
+    out = pg._get_coords_from_list([[0.0, 0.0]], 1250.0, seed=1)
+
+    assert out == [[0.0, 0.0], [0.0, 0.00585], [0.0, 0.0]]
+    assert mock_client.directions.call_count == 3
+
+
+def test_round_trip_candidates_tolerate_partial_failures(mock_client):
+    def directions(**kwargs):
+        if kwargs["options"]["round_trip"]["seed"] == 1:
+            raise RuntimeError("ORS timeout")
+        return _straight_route(0.0045)
+
+    mock_client.directions.side_effect = directions
+    pg = PathGen(key="dummy", route_candidates=2)
+
+    assert pg._get_coords_from_list([[0.0, 0.0]], 1000.0, seed=1) == [[0.0, 0.0], [0.0, 0.0045], [0.0, 0.0]]
+
+
+def test_round_trip_candidates_raise_when_all_fail(mock_client):
+    mock_client.directions.side_effect = RuntimeError("ORS down")
+    pg = PathGen(key="dummy", route_candidates=2)
+
+    with pytest.raises(RuntimeError, match="ORS down"):
+        pg._get_coords_from_list([[0.0, 0.0]], 1000.0, seed=1)
+
+
+def test_round_trip_candidates_time_out_when_none_return_by_the_deadline(mock_client):
+    release = threading.Event()
+
+    def directions(**kwargs):
+        release.wait(5)
+        return _straight_route(0.0045)
+
+    mock_client.directions.side_effect = directions
+    pg = PathGen(key="dummy", route_candidates=2, candidate_deadline_s=0.05)
+
+    started = time.monotonic()
+    try:
+        with pytest.raises(TimeoutError, match="within 0.05s"):
+            pg._get_coords_from_list([[0.0, 0.0]], 1000.0, seed=1)
+    finally:
+        release.set()
+    assert time.monotonic() - started < 1
+
+
+def test_directions_uses_local_router_and_falls_back_to_ors(mock_client):
+    mock_client.directions.return_value = _geojson([[0.0, 0.0], [0.0, 0.01], [0.0, 0.0]])
+    local_router = MagicMock()
+    local_router.round_trip.return_value = [[1.0, 1.0], [1.0, 1.01], [1.0, 1.0]]
+    pg = PathGen(key="dummy", local_router=local_router)
+
+    assert pg._get_coords_from_list([[1.0, 1.0]], 1000.0, seed=1) == [[1.0, 1.0], [1.0, 1.01], [1.0, 1.0]]
+    mock_client.directions.assert_not_called()
+
+    local_router.round_trip.side_effect = LocalRoutingError("off the map")
+    assert pg._get_coords_from_list([[0.0, 0.0]], 1000.0, seed=1) == [[0.0, 0.0], [0.0, 0.01], [0.0, 0.0]]
+    mock_client.directions.assert_called_once()
+
+
+def test_route_cache_keys_local_and_ors_routes_apart(mock_client):
+    mock_client.directions.return_value = _geojson([[0.0, 0.0], [0.0, 0.01], [0.0, 0.0]])
+    local_router = MagicMock()
+    local_router.round_trip.return_value = [[0.0, 0.0], [0.01, 0.0], [0.0, 0.0]]
+    route_cache = TTLCache()
+    local = PathGen(key="dummy", route_cache=route_cache, local_router=local_router)
+    ors = PathGen(key="dummy", route_cache=route_cache)
+
+    assert local._get_coords_from_list([[0.0, 0.0]], 1000.0, seed=1) == [[0.0, 0.0], [0.01, 0.0], [0.0, 0.0]]
+    assert ors._get_coords_from_list([[0.0, 0.0]], 1000.0, seed=1) == [[0.0, 0.0], [0.0, 0.01], [0.0, 0.0]]
+    assert len(route_cache) == 2
+
+
+def test_ors_fallback_routes_are_not_cached_under_the_local_key(mock_client):
+    mock_client.directions.return_value = _geojson([[0.0, 0.0], [0.0, 0.01], [0.0, 0.0]])
+    local_router = MagicMock()
+    local_router.round_trip.side_effect = LocalRoutingError("off the map")
+    pg = PathGen(key="dummy", local_router=local_router)
+
+    assert pg._get_coords_from_list([[0.0, 0.0]], 1000.0, seed=1) == [[0.0, 0.0], [0.0, 0.01], [0.0, 0.0]]
+    assert len(pg.route_cache) == 0
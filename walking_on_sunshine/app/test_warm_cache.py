@@ -0,0 +1,89 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from walking_on_sunshine.app.config import Config
+from walking_on_sunshine.app.warm_cache import parse_album_ref, warm_caches
+
+ABBEY_ROAD_ID = "0ETFjACtuP2ADo6LFhL6HN"
+
+
+@pytest.fixture
+def app():
+    app = MagicMock()
+    app.config = Config(route_seed_mode="deterministic")
+    app.album_length.resolve_album_id.side_effect = lambda name: {"Let It Be": "let_it_be"}[name]
+    app.album_length.get_many_album_details.side_effect = lambda ids: {
+        album_id: {"id": album_id, "total_ms": 1_800_000} for album_id in ids
+    }
+    app.path_gen.resolve_start.side_effect = lambda location: {"address": location, "coordinates": [13.4, 52.5]}
+    app.route_seed.side_effect = lambda album_id, start: hash((album_id, start)) % 10000
+    app.http_stats.side_effect = [{"spotify": {"requests": 5}, "ors": {"requests": 1}}] + [
+        {"spotify": {"requests": 7}, "ors": {"requests": 5}}
+    ]
+    return app
+
+
+@pytest.mark.parametrize(
+    "ref, expected",
+    [
+        (ABBEY_ROAD_ID, (ABBEY_ROAD_ID, None)),
+        (f"spotify:album:{ABBEY_ROAD_ID}", (ABBEY_ROAD_ID, None)),
+        ("  Abbey Road ", (None, "Abbey Road")),
+    ],
+)
+def test_parse_album_ref(ref, expected):
+    assert parse_album_ref(ref) == expected
+
+
+def test_warm_caches_fills_albums_starts_and_routes(app):
+    progress = []
+    report = warm_caches(
+        app,
+        [ABBEY_ROAD_ID, "Let It Be", "Let It Be"],
+        ["Berlin", "52.52,13.40"],
+        progress=lambda stage, done, total: progress.append((stage, done, total)),
+    )
+
+    app.album_length.resolve_album_id.assert_called_once_with("Let It Be")
+    app.album_length.get_many_album_details.assert_called_once_with((ABBEY_ROAD_ID, "let_it_be"))
+    assert app.path_gen.build_route.call_count == 4
+    app.path_gen.build_route.assert_any_call(
+        {"address": "Berlin", "coordinates": [13.4, 52.5]}, 1_800_000, seed=hash(("let_it_be", "Berlin")) % 10000
+    )
+    assert report["albums"] == {"requested": 2, "warmed": 2, "failed": 0, "batches": 1}
+    assert report["routes"] == {"requested": 4, "warmed": 4, "failed": 0}
+    assert report["upstream_requests"] == {"spotify": 2, "ors": 4}
+    assert ("routes", 4, 4) in progress
+
+
+def test_warm_caches_batches_album_fetches(app):
+    ids = [f"{i:022d}" for i in range(45)]
+    report = warm_caches(app, ids, [])
+
+    assert app.album_length.get_many_album_details.call_count == 3
+    assert report["albums"]["batches"] == 3
+    assert report["routes"]["requested"] == 0
+
+
+def test_warm_caches_reports_failures_and_carries_on(app):
+    app.path_gen.resolve_start.side_effect = lambda location: (_ for _ in ()).throw(ValueError("no match"))
+
+    report = warm_caches(app, [ABBEY_ROAD_ID], ["Atlantis"])
+
+    assert report["starts"] == {
+        "requested": 1,
+        "warmed": 0,
+        "failed": 1,
+        "failures": [{"item": "Atlantis", "error": "no match"}],
+    }
+    assert report["albums"]["warmed"] == 1
+
+
+def test_warm_caches_skips_routes_unless_seeds_are_deterministic(app):
+    app.config = Config(route_seed_mode="random")
+
+    report = warm_caches(app, [ABBEY_ROAD_ID], ["Berlin"])
+
+    assert "skipped" in report["routes"]
+    app.path_gen.build_route.assert_not_called()
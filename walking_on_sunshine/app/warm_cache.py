@@ -0,0 +1,129 @@
+import re
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any
+
+from walking_on_sunshine.app.app import App
+from walking_on_sunshine.common.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# A bare 22 character Spotify id, or a spotify:album: URI
+_ALBUM_ID = re.compile(r"^(?:spotify:album:)?([0-9A-Za-z]{22})$")
+# Spotify's multi-album endpoint takes at most 20 ids
+_ALBUMS_BATCH_SIZE = 20
+# Failures kept in the report per stage; the rest are only counted
+_MAX_REPORTED_FAILURES = 10
+
+ProgressCallback = Callable[[str, int, int], None]
+
+
+def parse_album_ref(ref: str) -> tuple[str | None, str | None]:
+    """
+    Split an album reference into (album id, None) for Spotify ids and URIs, or (None, name) for anything else.
+    """
+    ref = ref.strip()
+    match = _ALBUM_ID.match(ref)
+    if match:
+        return match.group(1), None
+    return None, ref
+
+
+def _run_stage(
+    pool: ThreadPoolExecutor,
+    stage: str,
+    fn: Callable[[Any], Any],
+    items: list,
+    progress: ProgressCallback | None,
+) -> tuple[dict, dict[str, Any]]:
+    """
+    Run fn over items on the pool. Returns results and a stage report; failures are logged and counted.
+    """
+    results = {}
+    failures = []
+    futures = {pool.submit(fn, item): item for item in items}
+    for done, future in enumerate(as_completed(futures), start=1):
+        item = futures[future]
+        try:
+            results[item] = future.result()
+        except Exception as e:
+            logger.warning("Cache warm-up item failed", stage=stage, item=str(item), error=str(e))
+            failures.append({"item": str(item), "error": str(e)})
+        if progress:
+            progress(stage, done, len(items))
+    report: dict[str, Any] = {"requested": len(items), "warmed": len(results), "failed": len(failures)}
+    if failures:
+        report["failures"] = failures[:_MAX_REPORTED_FAILURES]
+    return results, report
+
+
+def _upstream_requests(app: App) -> dict[str, int]:
+    return {name: stats["requests"] for name, stats in app.http_stats().items()}
+
+
+def warm_caches(
+    app: App,
+    album_refs: Iterable[str],
+    start_locations: Iterable[str],
+    concurrency: int = 4,
+    progress: ProgressCallback | None = None,
+) -> dict[str, Any]:
+    """
+    Fill the album, geocode and route caches the way live requests would.
+
+    Album names are resolved to ids, then details are fetched 20 albums per Spotify call. Start locations are
+    geocoded, and in deterministic seed mode every album is routed from every start with the seed a request
+    would derive, so those requests hit route_cache. Returns a report with per-stage counts and the HTTP
+    requests each upstream received.
+    """
+    album_refs = list(dict.fromkeys(ref.strip() for ref in album_refs if ref.strip()))
+    start_locations = list(dict.fromkeys(start.strip() for start in start_locations if start.strip()))
+    requests_before = _upstream_requests(app)
+    started = time.perf_counter()
+    report: dict[str, Any] = {}
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="warm") as pool:
+        album_ids = []
+        names = []
+        for ref in album_refs:
+            album_id, name = parse_album_ref(ref)
+            if album_id:
+                album_ids.append(album_id)
+            else:
+                names.append(name)
+        resolved, report["album_names"] = _run_stage(
+            pool, "album_names", app.album_length.resolve_album_id, names, progress
+        )
+        album_ids = list(dict.fromkeys(album_ids + list(resolved.values())))
+
+        batches = [tuple(album_ids[i : i + _ALBUMS_BATCH_SIZE]) for i in range(0, len(album_ids), _ALBUMS_BATCH_SIZE)]
+        fetched, _ = _run_stage(pool, "albums", app.album_length.get_many_album_details, batches, progress)
+        albums = {album_id: details for batch in fetched.values() for album_id, details in batch.items()}
+        report["albums"] = {
+            "requested": len(album_ids),
+            "warmed": len(albums),
+            "failed": len(album_ids) - len(albums),
+            "batches": len(batches),
+        }
+
+        starts, report["starts"] = _run_stage(pool, "starts", app.path_gen.resolve_start, start_locations, progress)
+
+        if app.config.route_seed_mode != "deterministic":
+            report["routes"] = {"skipped": "route_seed_mode is not deterministic, so routes are not cached"}
+        else:
+
+            def build(pair: tuple[str, str]) -> dict:
+                album_id, start_location = pair
+                seed = app.route_seed(album_id, start_location)
+                return app.path_gen.build_route(starts[start_location], albums[album_id]["total_ms"], seed=seed)
+
+            pairs = [(album_id, start) for album_id in albums for start in starts]
+            _, report["routes"] = _run_stage(pool, "routes", build, pairs, progress)
+
+    requests_after = _upstream_requests(app)
+    report["upstream_requests"] = {
+        name: requests_after.get(name, 0) - requests_before.get(name, 0) for name in requests_after
+    }
+    report["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return report
@@ -0,0 +1,57 @@
+import csv
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+FIELDS = ("album_name", "album_id", "start_address")
+
+INPUT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+def detect_format(path: Path) -> str:
+    try:
+        return INPUT_FORMATS[path.suffix.lower()]
+    except KeyError:
+        raise ValueError(f"Cannot tell the input format of {path}; pass csv or jsonl explicitly") from None
+
+
+def _clean(record: dict) -> dict:
+    return {field: str(record.get(field) or "").strip() for field in FIELDS}
+
+
+def validate_row(row: dict) -> str | None:
+    if not row["album_name"] and not row["album_id"]:
+        return "album_name or album_id is required"
+    if not row["start_address"]:
+        return "start_address is required"
+    return None
+
+
+def read_rows(path: Path, input_format: str) -> Iterator[tuple[int, dict, str | None]]:
+    """
+    Yield (row number, row, error) one row at a time, so memory does not grow with the file.
+    Rows are numbered from 1 over CSV records or non-blank JSONL lines, which keeps numbers stable across resumes.
+    A row that cannot be used comes with an error instead of stopping the batch.
+    """
+    with path.open(newline="", encoding="utf-8") as f:
+        if input_format == "csv":
+            for row_no, record in enumerate(csv.DictReader(f), start=1):
+                row = _clean(record)
+                yield row_no, row, validate_row(row)
+            return
+
+        row_no = 0
+        for line in f:
+            if not line.strip():
+                continue
+            row_no += 1
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_no, _clean({}), f"invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield row_no, _clean({}), "expected a JSON object"
+                continue
+            row = _clean(record)
+            yield row_no, row, validate_row(row)
@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from walking_on_sunshine.app.app import App
+from walking_on_sunshine.batch.rate_limit import RateLimiter
+from walking_on_sunshine.batch.writers import ResultLog, route_geojson, route_gpx
+
+# Per-request fields that mean nothing outside the API process that served them
+_DROPPED_FIELDS = ("route_id", "map_url", "map_embed_html")
+# Geometry fields moved into the GPX/GeoJSON file when writing files
+_GEOMETRY_FIELDS = ("route_coords", "preview_coords", "route_preview")
+# Failures kept in the summary; every failure is in the result log
+_MAX_REPORTED_FAILURES = 10
+
+ProgressCallback = Callable[[dict], None]
+
+
+class BatchRunner:
+    """
+    Runs App.run over a stream of rows on a bounded thread pool and records each row as it finishes.
+
+    At most 2 x concurrency rows are read ahead of the workers, so memory stays flat however long the input is.
+    Rows start no faster than the rate limiter allows; throttled upstream responses are retried by the shared
+    HTTP sessions. With file_format "gpx" or "geojson" each route is written to output_dir and the result log
+    records the file name instead of the geometry.
+    """
+
+    def __init__(
+        self,
+        app: App,
+        result_log: ResultLog,
+        concurrency: int = 4,
+        rate_limiter: RateLimiter | None = None,
+        file_format: str = "jsonl",
+        output_dir: Path | None = None,
+        progress: ProgressCallback | None = None,
+    ):
+        if file_format != "jsonl" and output_dir is None:
+            raise ValueError(f"output_dir is required for file_format {file_format!r}")
+        self.app = app
+        self.result_log = result_log
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter or RateLimiter(0)
+        self.file_format = file_format
+        self.output_dir = output_dir
+        self.progress = progress
+        self._lock = threading.Lock()
+        self.ok = 0
+        self.failed = 0
+        self.skipped = 0
+        self.failures: list[dict] = []
+
+    def _record(self, row_no: int, row: dict, error: str | None = None, result: dict | None = None):
+        record = {"row": row_no, "status": "error" if error else "ok", **row}
+        if error:
+            record["error"] = error
+        else:
+            record["result"] = result
+        self.result_log.write(record)
+        with self._lock:
+            if error:
+                self.failed += 1
+                if len(self.failures) < _MAX_REPORTED_FAILURES:
+                    self.failures.append({"row": row_no, "error": error})
+            else:
+                self.ok += 1
+            counts = self.counts()
+        if self.progress:
+            self.progress(counts)
+
+    def _write_file(self, row_no: int, row: dict, result: dict) -> str:
+        assert self.output_dir is not None
+        name = f"row-{row_no:06d}.{self.file_format}"
+        path = self.output_dir / name
+        if self.file_format == "gpx":
+            title = f"{result.get('album_name') or row['album_name']} from {row['start_address']}"
+            path.write_text(route_gpx(title, result["route_coords"]), encoding="utf-8")
+        else:
+            properties = {key: value for key, value in result.items() if key not in _GEOMETRY_FIELDS}
+            path.write_text(json.dumps(route_geojson(properties, result["route_coords"])), encoding="utf-8")
+        return name
+
+    def _process(self, row_no: int, row: dict):
+        try:
+            result = self.app.run(
+                row["album_name"], row["start_address"], album_id=row["album_id"] or None, interactive=False
+            )
+            result = {key: value for key, value in result.items() if key not in _DROPPED_FIELDS}
+            if self.file_format != "jsonl":
+                result["file"] = self._write_file(row_no, row, result)
+                result = {key: value for key, value in result.items() if key not in _GEOMETRY_FIELDS}
+        except Exception as e:
+            self._record(row_no, row, error=str(e) or type(e).__name__)
+            return
+        self._record(row_no, row, result=result)
+
+    def counts(self) -> dict:
+        return {"ok": self.ok, "failed": self.failed, "skipped": self.skipped}
+
+    def run(self, rows: Iterable[tuple[int, dict, str | None]]) -> dict:
+        """
+        Process every row not already done in the result log; returns counts, timing and the first failures.
+        """
+        started = time.perf_counter()
+        read_ahead = threading.BoundedSemaphore(self.concurrency * 2)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch") as pool:
+            for row_no, row, error in rows:
+                if row_no in self.result_log.done:
+                    with self._lock:
+                        self.skipped += 1
+                    continue
+                if error:
+                    self._record(row_no, row, error=error)
+                    continue
+                read_ahead.acquire()
+                self.rate_limiter.acquire()
+                future = pool.submit(self._process, row_no, row)
+                future.add_done_callback(lambda _: read_ahead.release())
+
+        elapsed_s = time.perf_counter() - started
+        processed = self.ok + self.failed
+        return {
+            **self.counts(),
+            "elapsed_s": round(elapsed_s, 3),
+            "rows_per_s": round(processed / elapsed_s, 2) if elapsed_s > 0 else 0.0,
+            "failures": list(self.failures),
+        }
@@ -0,0 +1,142 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from walking_on_sunshine.batch.rate_limit import RateLimiter
+from walking_on_sunshine.batch.runner import BatchRunner
+from walking_on_sunshine.batch.writers import ResultLog
+
+
+def _rows(n: int, start: int = 1):
+    for row_no in range(start, start + n):
+        yield row_no, {"album_name": f"Album {row_no}", "album_id": "", "start_address": "Berlin"}, None
+
+
+def _result(album_name: str, start_address: str, album_id=None, interactive=True):
+    return {
+        "album_name": album_name,
+        "route_coords": [[13.4, 52.5], [13.41, 52.51]],
+        "preview_coords": [[13.4, 52.5]],
+        "route_preview": [{"lat": 52.5, "lon": 13.4}],
+        "route_id": "abc",
+        "map_url": "/routes/abc/map",
+        "map_embed_html": None,
+    }
+
+
+@pytest.fixture
+def app():
+    app = MagicMock()
+    app.run.side_effect = _result
+    return app
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_run_writes_one_record_per_row(tmp_path, app):
+    log_path = tmp_path / "results.jsonl"
+    with ResultLog(log_path) as log:
+        summary = BatchRunner(app, log, concurrency=3).run(_rows(10))
+
+    records = sorted(_records(log_path), key=lambda record: record["row"])
+    assert summary["ok"] == 10
+    assert [record["row"] for record in records] == list(range(1, 11))
+    assert records[0]["result"]["route_coords"] == [[13.4, 52.5], [13.41, 52.51]]
+    assert "route_id" not in records[0]["result"]
+    assert app.run.call_args.kwargs["interactive"] is False
+
+
+def test_run_records_failures_and_keeps_going(tmp_path, app):
+    def flaky(album_name, start_address, album_id=None, interactive=True):
+        if album_name == "Album 2":
+            raise IndexError("list index out of range")
+        return _result(album_name, start_address)
+
+    app.run.side_effect = flaky
+    rows = [
+        *_rows(2),
+        (3, {"album_name": "", "album_id": "", "start_address": "x"}, "album_name or album_id is required"),
+    ]
+    with ResultLog(tmp_path / "results.jsonl") as log:
+        summary = BatchRunner(app, log).run(rows)
+
+    assert (summary["ok"], summary["failed"]) == (1, 2)
+    assert {failure["row"] for failure in summary["failures"]} == {2, 3}
+
+
+def test_resume_skips_rows_already_done(tmp_path, app):
+    log_path = tmp_path / "results.jsonl"
+    with ResultLog(log_path) as log:
+        log.write({"row": 1, "status": "ok"})
+        log.write({"row": 2, "status": "error", "error": "timeout"})
+
+    with ResultLog(log_path, resume=True) as log:
+        summary = BatchRunner(app, log).run(_rows(3))
+
+    assert (summary["ok"], summary["skipped"]) == (2, 1)
+    assert sorted(call.args[0] for call in app.run.call_args_list) == ["Album 2", "Album 3"]
+
+
+def test_run_keeps_a_bounded_number_of_rows_in_flight(tmp_path, app):
+    release = threading.Event()
+    read = []
+
+    def rows():
+        for row in _rows(50):
+            read.append(row[0])
+            yield row
+
+    def blocked(album_name, start_address, album_id=None, interactive=True):
+        release.wait(timeout=5)
+        return _result(album_name, start_address)
+
+    app.run.side_effect = blocked
+    with ResultLog(tmp_path / "results.jsonl") as log:
+        runner = BatchRunner(app, log, concurrency=2)
+        thread = threading.Thread(target=runner.run, args=(rows(),))
+        thread.start()
+        time.sleep(0.1)
+        in_flight_read = len(read)
+        release.set()
+        thread.join(timeout=5)
+
+    assert in_flight_read <= 5
+    assert runner.ok == 50
+
+
+def test_run_writes_gpx_files_and_records_the_file_name(tmp_path, app):
+    with ResultLog(tmp_path / "results.jsonl") as log:
+        BatchRunner(app, log, file_format="gpx", output_dir=tmp_path).run(_rows(1))
+
+    record = _records(tmp_path / "results.jsonl")[0]
+    assert record["result"]["file"] == "row-000001.gpx"
+    assert "route_coords" not in record["result"]
+    assert "<trkpt" in (tmp_path / "row-000001.gpx").read_text()
+
+
+def test_run_writes_geojson_features(tmp_path, app):
+    with ResultLog(tmp_path / "results.jsonl") as log:
+        BatchRunner(app, log, file_format="geojson", output_dir=tmp_path).run(_rows(1))
+
+    feature = json.loads((tmp_path / "row-000001.geojson").read_text())
+    assert feature["geometry"]["type"] == "LineString"
+    assert feature["properties"]["album_name"] == "Album 1"
+
+
+def test_rate_limiter_spaces_acquisitions():
+    limiter = RateLimiter(rate_per_s=50, burst=1)
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+
+    assert time.monotonic() - started >= 0.09
+
+
+def test_file_formats_require_an_output_dir(tmp_path, app):
+    with ResultLog(tmp_path / "results.jsonl") as log, pytest.raises(ValueError, match="output_dir"):
+        BatchRunner(app, log, file_format="gpx")
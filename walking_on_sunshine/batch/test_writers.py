@@ -0,0 +1,67 @@
+import json
+import xml.etree.ElementTree as ET
+
+from walking_on_sunshine.batch.rows import read_rows
+from walking_on_sunshine.batch.writers import ResultLog, completed_rows, route_geojson, route_gpx
+
+
+def test_read_rows_streams_csv(tmp_path):
+    path = tmp_path / "rows.csv"
+    path.write_text('album_name,album_id,start_address\nAbbey Road,,Berlin\n,a1,\nLet It Be,," 52.5,13.4 "\n')
+
+    rows = list(read_rows(path, "csv"))
+
+    assert rows[0] == (1, {"album_name": "Abbey Road", "album_id": "", "start_address": "Berlin"}, None)
+    assert rows[1][2] == "start_address is required"
+    assert rows[2][1]["start_address"] == "52.5,13.4"
+
+
+def test_read_rows_reports_bad_jsonl_lines_without_stopping(tmp_path):
+    path = tmp_path / "rows.jsonl"
+    path.write_text('{"album_id": "a1", "start_address": "Berlin"}\n\nnot json\n[1]\n{"start_address": "Paris"}\n')
+
+    rows = list(read_rows(path, "jsonl"))
+
+    assert [row_no for row_no, _, _ in rows] == [1, 2, 3, 4]
+    assert rows[0][2] is None
+    assert rows[1][2].startswith("invalid JSON")
+    assert rows[2][2] == "expected a JSON object"
+    assert rows[3][2] == "album_name or album_id is required"
+
+
+def test_route_gpx_is_valid_xml_with_lat_lon_points():
+    gpx = route_gpx("Abbey Road & friends", [[13.4, 52.5], [13.41, 52.51]])
+
+    root = ET.fromstring(gpx)
+    ns = {"gpx": "http://www.topografix.com/GPX/1/1"}
+    points = root.findall(".//gpx:trkpt", ns)
+    assert root.find(".//gpx:name", ns).text == "Abbey Road & friends"
+    assert [(p.get("lat"), p.get("lon")) for p in points] == [("52.5", "13.4"), ("52.51", "13.41")]
+
+
+def test_route_geojson_is_a_linestring_feature():
+    feature = route_geojson({"album_name": "Abbey Road"}, [[13.4, 52.5], [13.41, 52.51]])
+
+    assert feature["geometry"] == {"type": "LineString", "coordinates": [[13.4, 52.5], [13.41, 52.51]]}
+    assert feature["properties"] == {"album_name": "Abbey Road"}
+
+
+def test_completed_rows_skips_failures_and_a_truncated_last_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text(
+        '{"row": 1, "status": "ok"}\n{"row": 2, "status": "error", "error": "boom"}\n{"row": 3, "status": "o'
+    )
+
+    assert completed_rows(path) == {1}
+    assert path.read_text().endswith('"boom"}\n')
+
+
+def test_result_log_appends_when_resuming(tmp_path):
+    path = tmp_path / "results.jsonl"
+    with ResultLog(path) as log:
+        log.write({"row": 1, "status": "ok"})
+    with ResultLog(path, resume=True) as log:
+        assert log.done == {1}
+        log.write({"row": 2, "status": "ok"})
+
+    assert [json.loads(line)["row"] for line in path.read_text().splitlines()] == [1, 2]
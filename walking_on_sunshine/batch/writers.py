@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+
+def route_gpx(name: str, route_coords: list[list[float]]) -> str:
+    """
+    GPX 1.1 track for a [lon, lat] route.
+    """
+    points = "\n".join(f'      <trkpt lat="{lat}" lon="{lon}"/>' for lon, lat, *_ in route_coords)
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<gpx version="1.1" creator="walking_on_sunshine" xmlns="http://www.topografix.com/GPX/1/1">\n'
+        "  <trk>\n"
+        f"    <name>{escape(name)}</name>\n"
+        "    <trkseg>\n"
+        f"{points}\n"
+        "    </trkseg>\n"
+        "  </trk>\n"
+        "</gpx>\n"
+    )
+
+
+def route_geojson(properties: dict, route_coords: list[list[float]]) -> dict:
+    return {
+        "type": "Feature",
+        "properties": properties,
+        "geometry": {"type": "LineString", "coordinates": route_coords},
+    }
+
+
+def _truncate_partial_line(path: Path):
+    """
+    Drop a record cut short by a crash, so appended records start on their own line.
+    """
+    with path.open("rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline != -1:
+                f.truncate(start + newline + 1)
+                return
+            end = start
+        f.truncate(0)
+
+
+def completed_rows(path: Path) -> set[int]:
+    """
+    Row numbers with an "ok" record in a result log. Failed rows are left out so a resume retries them.
+    """
+    done: set[int] = set()
+    if not path.is_file():
+        return done
+    _truncate_partial_line(path)
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok":
+                done.add(record["row"])
+    return done
+
+
+class ResultLog:
+    """
+    Append-only JSONL with one record per processed row, flushed as each row finishes.
+    It doubles as the checkpoint: resuming skips rows already recorded as ok, and for a retried row the last
+    record wins.
+    """
+
+    def __init__(self, path: Path, resume: bool = False):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.done = completed_rows(path) if resume else set()
+        self._file = path.open("a" if resume else "w", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "ResultLog":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
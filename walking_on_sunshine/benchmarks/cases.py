@@ -0,0 +1,128 @@
+import math
+import random
+
+import numpy as np
+
+from walking_on_sunshine.app.album_length import AlbumLength
+from walking_on_sunshine.app.geometry import simplify_route
+from walking_on_sunshine.app.path_gen import PathGen
+
+ROUTE_SIZES = [100, 1_000, 10_000, 100_000]
+TRACK_COUNTS = [10, 50, 200, 500]
+# simplify_route runs twice per request on the full ORS geometry; it has to stay well under a millisecond
+SIMPLIFY_SIZES = [10_000, 50_000]
+SIMPLIFY_MAX_MS = 1.0
+
+# Spotify pages album tracks 50 at a time
+_TRACK_PAGE_SIZE = 50
+
+
+def synthetic_route(n_points: int, seed: int = 0) -> list[list[float]]:
+    """
+    Return a closed, slightly wobbly loop of [lon, lat] pairs around San Francisco, shaped like an ORS round trip.
+    """
+    rng = random.Random(seed)
+    lon0, lat0, radius = -122.42, 37.77, 0.01
+    coords = []
+    for i in range(n_points - 1):
+        angle = 2 * math.pi * i / (n_points - 1)
+        r = radius * (1 + 0.15 * math.sin(7 * angle)) + rng.uniform(-1e-5, 1e-5)
+        coords.append([lon0 + r * math.cos(angle), lat0 + r * math.sin(angle)])
+    coords.append(list(coords[0]))
+    return coords
+
+
+class _PagedSpotify:
+    """
+    Stand-in for the Spotify client that serves pre-built track pages, so only our pagination code is timed.
+    """
+
+    def __init__(self, pages: list[dict]):
+        self._pages = pages
+
+    def next(self, page: dict) -> dict:
+        return self._pages[page["page"] + 1]
+
+
+def synthetic_album(n_tracks: int) -> tuple[dict, _PagedSpotify]:
+    """
+    Return an album object with its first track page embedded, plus a client that serves the remaining pages.
+    """
+    pages = []
+    for page_no, offset in enumerate(range(0, n_tracks, _TRACK_PAGE_SIZE)):
+        items = [
+            {"name": f"Track {i + 1}", "duration_ms": 180_000 + i * 1_000}
+            for i in range(offset, min(offset + _TRACK_PAGE_SIZE, n_tracks))
+        ]
+        last = offset + _TRACK_PAGE_SIZE >= n_tracks
+        pages.append({"items": items, "next": None if last else f"page-{page_no + 1}", "page": page_no})
+
+    album = {
+        "name": "Benchmark Album",
+        "total_tracks": n_tracks,
+        "release_date": "1985-05-13",
+        "images": [{"url": "https://example.com/cover.jpg"}],
+        "artists": [{"name": "Katrina and the Waves"}],
+        "tracks": pages[0],
+    }
+    return album, _PagedSpotify(pages)
+
+
+def build_cases(
+    route_sizes: list[int] = ROUTE_SIZES,
+    track_counts: list[int] = TRACK_COUNTS,
+    simplify_sizes: list[int] = SIMPLIFY_SIZES,
+) -> list[dict]:
+    """
+    Return the benchmark cases as dicts of name, size and a zero-argument callable, plus max_ms for cases with
+    an absolute time budget. Inputs are built up front so only the code under test is timed; route geometry is
+    passed as an array, the way build_route hands it on after converting once.
+    """
+    path_gen = PathGen(key="benchmark")
+    album_length = AlbumLength(client_id="benchmark", client_secret="benchmark")
+
+    cases = []
+    for size in route_sizes:
+        route_list = synthetic_route(size)
+        route = np.asarray(route_list)
+        cases += [
+            {"name": "downsample_coords", "size": size, "fn": lambda route=route: path_gen._downsample_coords(route)},
+            {"name": "get_maps_url", "size": size, "fn": lambda route=route: path_gen._get_maps_url(route)},
+            {
+                "name": "build_folium_map",
+                "size": size,
+                "fn": lambda route_list=route_list: path_gen._build_folium_map(route_list),
+            },
+            {"name": "build_preview", "size": size, "fn": lambda route=route: path_gen._build_preview(route)},
+        ]
+
+    for size in simplify_sizes:
+        route = np.asarray(synthetic_route(size))
+        cases.append(
+            {
+                "name": "simplify_route",
+                "size": size,
+                "fn": lambda route=route: simplify_route(route, path_gen.preview_points),
+                "max_ms": SIMPLIFY_MAX_MS,
+            }
+        )
+
+    locations = ["37.7749, -122.4194", "  -33.86,151.21 ", "not, coords", "Golden Gate Park"]
+    cases.append(
+        {
+            "name": "parse_coordinate_string",
+            "size": len(locations),
+            "fn": lambda: [path_gen._parse_coordinate_string(location) for location in locations],
+        }
+    )
+
+    for n_tracks in track_counts:
+        album, client = synthetic_album(n_tracks)
+
+        def album_details(album=album, client=client):
+            album_length.sp = client
+            return album_length._album_details(album, "benchmark-album", "Benchmark Album")
+
+        cases.append({"name": "album_pagination", "size": n_tracks, "fn": album_details})
+
+    return cases
@@ -0,0 +1,98 @@
+import json
+import platform
+import statistics
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+def case_key(name: str, size: int) -> str:
+    return f"{name}[{size}]"
+
+
+def time_case(fn: Callable[[], object], min_repeats: int = 5, budget_s: float = 0.5) -> list[float]:
+    """
+    Call `fn` repeatedly and return per-call wall times in milliseconds.
+    Runs at least `min_repeats` times and keeps going until `budget_s` is spent, so fast cases get more samples.
+    """
+    fn()  # warm-up: imports, lazy caches, first allocations
+    samples: list[float] = []
+    deadline = time.perf_counter() + budget_s
+    while len(samples) < min_repeats or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run_cases(cases: list[dict], min_repeats: int = 5, budget_s: float = 0.5) -> dict:
+    """
+    Time every case and return a JSON-ready report keyed by "name[size]".
+    """
+    results = {}
+    for case in cases:
+        samples = sorted(time_case(case["fn"], min_repeats=min_repeats, budget_s=budget_s))
+        results[case_key(case["name"], case["size"])] = {
+            "name": case["name"],
+            "size": case["size"],
+            "repeats": len(samples),
+            "median_ms": statistics.median(samples),
+            "min_ms": samples[0],
+            "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        }
+        if "max_ms" in case:
+            results[case_key(case["name"], case["size"])]["max_ms"] = case["max_ms"]
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(
+    current: dict, baseline: dict, threshold: float = 0.25, min_delta_ms: float = 0.05, metric: str = "median_ms"
+) -> list[dict]:
+    """
+    Return the cases whose `metric` got slower than the baseline by more than `threshold` (0.25 = 25%).
+    Differences under `min_delta_ms` are ignored so sub-millisecond cases do not fail on timer noise.
+    On a noisy machine "min_ms" is the steadier metric.
+    Cases missing from either report are skipped.
+    """
+    regressions = []
+    for key, result in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        delta_ms = result[metric] - base[metric]
+        if delta_ms > min_delta_ms and result[metric] > base[metric] * (1 + threshold):
+            regressions.append(
+                {
+                    "case": key,
+                    "baseline_ms": base[metric],
+                    "current_ms": result[metric],
+                    "change": delta_ms / base[metric],
+                }
+            )
+    return regressions
+
+
+def over_budget(report: dict, metric: str = "median_ms") -> list[dict]:
+    """
+    Return the cases whose `metric` exceeds their absolute max_ms budget, whatever the baseline says.
+    """
+    return [
+        {"case": key, "max_ms": result["max_ms"], "current_ms": result[metric]}
+        for key, result in report["results"].items()
+        if "max_ms" in result and result[metric] > result["max_ms"]
+    ]
+
+
+def save_report(report: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def load_report(path: Path) -> dict:
+    return json.loads(path.read_text())
@@ -0,0 +1,55 @@
+from walking_on_sunshine.benchmarks.cases import build_cases, synthetic_album, synthetic_route
+from walking_on_sunshine.benchmarks.runner import compare, load_report, over_budget, run_cases, save_report
+
+
+def _report(**medians):
+    return {"results": {key: {"median_ms": median, "min_ms": median} for key, median in medians.items()}}
+
+
+def test_compare_flags_only_real_regressions():
+    baseline = _report(slow=10.0, fine=10.0, noisy=0.01, new=None)
+    current = _report(slow=13.0, fine=11.0, noisy=0.03, added=5.0)
+
+    regressions = compare(current, baseline, threshold=0.25)
+
+    assert [r["case"] for r in regressions] == ["slow"]
+    assert regressions[0]["change"] == 0.3
+    assert compare(current, baseline, threshold=0.5, metric="min_ms") == []
+
+
+def test_over_budget_flags_cases_past_their_max_ms():
+    report = _report(fast=0.4, slow=1.2, unbounded=50.0)
+    report["results"]["fast"]["max_ms"] = report["results"]["slow"]["max_ms"] = 1.0
+
+    assert over_budget(report) == [{"case": "slow", "max_ms": 1.0, "current_ms": 1.2}]
+
+
+def test_synthetic_inputs_have_requested_size():
+    route = synthetic_route(1000)
+    assert len(route) == 1000
+    assert route[0] == route[-1]
+
+    album, client = synthetic_album(120)
+    assert len(album["tracks"]["items"]) == 50
+    assert len(client.next(client.next(album["tracks"]))["items"]) == 20
+
+
+def test_run_cases_round_trips_through_json(tmp_path):
+    report = run_cases(
+        build_cases(route_sizes=[100], track_counts=[120], simplify_sizes=[1000]), min_repeats=2, budget_s=0
+    )
+
+    assert set(report["results"]) == {
+        "downsample_coords[100]",
+        "get_maps_url[100]",
+        "build_folium_map[100]",
+        "build_preview[100]",
+        "simplify_route[1000]",
+        "parse_coordinate_string[4]",
+        "album_pagination[120]",
+    }
+    assert all(result["repeats"] >= 2 for result in report["results"].values())
+    assert report["results"]["simplify_route[1000]"]["max_ms"] == 1.0
+
+    save_report(report, tmp_path / "bench.json")
+    assert load_report(tmp_path / "bench.json") == report
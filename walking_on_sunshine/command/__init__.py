@@ -4,3 +4,7 @@ from walking_on_sunshine.command.hello_cmd import hello
 from walking_on_sunshine.command.get_album_length_cmd import get_album_length
 from walking_on_sunshine.command.start_cmd import start
 from walking_on_sunshine.command.serve_cmd import serve
+from walking_on_sunshine.command.bench_cmd import bench
+from walking_on_sunshine.command.load_test_cmd import load_test
+from walking_on_sunshine.command.warm_cache_cmd import warm_cache
+from walking_on_sunshine.command.batch_generate_cmd import batch_generate
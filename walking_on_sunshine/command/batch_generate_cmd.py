@@ -0,0 +1,83 @@
+import sys
+from pathlib import Path
+
+import click
+
+from walking_on_sunshine.app.app import App
+from walking_on_sunshine.batch.rate_limit import RateLimiter
+from walking_on_sunshine.batch.rows import detect_format, read_rows
+from walking_on_sunshine.batch.runner import BatchRunner
+from walking_on_sunshine.batch.writers import ResultLog
+from walking_on_sunshine.command.root import root_cmd
+
+
+@root_cmd.command()
+@click.pass_context
+@click.argument("input_path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--input-format", type=click.Choice(["csv", "jsonl"]), help="Defaults to the file extension.")
+@click.option(
+    "--output",
+    type=click.Path(path_type=Path),
+    required=True,
+    help="Result JSONL file, or a directory for gpx/geojson (with results.jsonl inside).",
+)
+@click.option("--format", "file_format", type=click.Choice(["jsonl", "gpx", "geojson"]), default="jsonl")
+@click.option("--concurrency", default=4, show_default=True, help="Rows processed at once.")
+@click.option("--rate", default=0.0, show_default=True, help="Maximum rows started per second, 0 for no limit.")
+@click.option("--resume", is_flag=True, help="Skip rows already recorded as ok in the result log and retry the rest.")
+@click.option("--progress-every", default=100, show_default=True, help="Print progress every N rows.")
+def batch_generate(
+    ctx: click.Context,
+    input_path: Path,
+    input_format: str | None,
+    output: Path,
+    file_format: str,
+    concurrency: int,
+    rate: float,
+    resume: bool,
+    progress_every: int,
+):
+    """
+    Generate a route for every (album_name or album_id, start_address) row of a CSV or JSONL file.
+    Rows are streamed and each result is written as soon as it finishes; exits non-zero when any row failed.
+    """
+    try:
+        input_format = input_format or detect_format(input_path)
+    except ValueError as e:
+        raise click.UsageError(str(e)) from None
+
+    if file_format == "jsonl":
+        log_path, output_dir = output, None
+    else:
+        output.mkdir(parents=True, exist_ok=True)
+        log_path, output_dir = output / "results.jsonl", output
+
+    def progress(counts: dict):
+        processed = counts["ok"] + counts["failed"]
+        if processed % progress_every == 0:
+            click.echo(f"{processed} rows: {counts['ok']} ok, {counts['failed']} failed")
+
+    app = App(ctx.obj["root_cfg"].app)
+    with ResultLog(log_path, resume=resume) as result_log:
+        if resume:
+            click.echo(f"Resuming: {len(result_log.done)} rows already done")
+        runner = BatchRunner(
+            app,
+            result_log,
+            concurrency=concurrency,
+            rate_limiter=RateLimiter(rate, burst=concurrency),
+            file_format=file_format,
+            output_dir=output_dir,
+            progress=progress,
+        )
+        summary = runner.run(read_rows(input_path, input_format))
+
+    click.echo(
+        f"{summary['ok']} ok, {summary['failed']} failed, {summary['skipped']} skipped in {summary['elapsed_s']:.1f}s "
+        f"({summary['rows_per_s']:.1f} rows/s); results in {log_path}"
+    )
+    for failure in summary["failures"]:
+        click.echo(f"row {failure['row']}: {failure['error']}", err=True)
+    if summary["failed"]:
+        click.echo(f"Rerun with --resume to retry the {summary['failed']} failed rows.", err=True)
+        sys.exit(1)
@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+import click
+
+from walking_on_sunshine.benchmarks.cases import ROUTE_SIZES, TRACK_COUNTS, build_cases
+from walking_on_sunshine.benchmarks.runner import compare, load_report, over_budget, run_cases, save_report
+from walking_on_sunshine.command.root import root_cmd
+
+
+@root_cmd.command()
+@click.option("--output", type=click.Path(path_type=Path), default=Path(".benchmarks/latest.json"), show_default=True)
+@click.option(
+    "--baseline", type=click.Path(path_type=Path), default=Path(".benchmarks/baseline.json"), show_default=True
+)
+@click.option("--save-baseline", is_flag=True, help="Write this run as the new baseline instead of comparing.")
+@click.option("--threshold", default=0.25, show_default=True, help="Allowed slowdown of the median, 0.25 = 25%.")
+@click.option("--metric", type=click.Choice(["median_ms", "min_ms", "p95_ms"]), default="median_ms", show_default=True)
+@click.option("--budget", default=0.5, show_default=True, help="Seconds spent timing each case.")
+@click.option("--quick", is_flag=True, help="Skip the largest inputs.")
+def bench(output: Path, baseline: Path, save_baseline: bool, threshold: float, metric: str, budget: float, quick: bool):
+    """
+    Time the route and album hot paths over synthetic inputs and compare against a saved baseline.
+    Exits non-zero when a case regresses past the threshold or goes over its absolute time budget.
+    """
+    route_sizes = ROUTE_SIZES[:-1] if quick else ROUTE_SIZES
+    track_counts = TRACK_COUNTS[:-1] if quick else TRACK_COUNTS
+    report = run_cases(build_cases(route_sizes, track_counts), budget_s=budget)
+
+    for key, result in report["results"].items():
+        click.echo(f"{key:<32} median {result['median_ms']:>10.3f} ms  min {result['min_ms']:>10.3f} ms")
+
+    save_report(report, output)
+    # Absolute budgets hold whatever the baseline says
+    slow = over_budget(report, metric=metric)
+    for case in slow:
+        click.echo(f"OVER BUDGET {case['case']}: {case['current_ms']:.3f} ms > {case['max_ms']:.3f} ms")
+
+    regressions = []
+    if save_baseline:
+        save_report(report, baseline)
+        click.echo(f"Baseline saved to {baseline}")
+    elif not baseline.is_file():
+        click.echo(f"No baseline at {baseline}; run with --save-baseline to create one.")
+    else:
+        regressions = compare(report, load_report(baseline), threshold=threshold, metric=metric)
+        for regression in regressions:
+            click.echo(
+                f"REGRESSION {regression['case']}: {regression['baseline_ms']:.3f} ms -> "
+                f"{regression['current_ms']:.3f} ms (+{regression['change']:.0%})"
+            )
+        if not regressions:
+            click.echo("No regressions against baseline.")
+    if regressions or slow:
+        sys.exit(1)
@@ -2,11 +2,13 @@ from pydantic_settings import BaseSettings
 
 from walking_on_sunshine.api.config import Config as ApiConfig
 from walking_on_sunshine.app.config import Config as AppConfig
+from walking_on_sunshine.loadtest.config import Config as LoadTestConfig
 
 
 class RootConfig(BaseSettings):
     app: AppConfig | None = None
     api: ApiConfig | None = None
+    loadtest: LoadTestConfig | None = None
 
     class Config:
         env_prefix = "WOS_"
@@ -5,7 +5,9 @@ import spotipy
 from spotipy import Spotify
 from spotipy.oauth2 import SpotifyClientCredentials
 
+from walking_on_sunshine.app.config import Config as AppConfig
 from walking_on_sunshine.command.root import root_cmd
+from walking_on_sunshine.common.http.session import build_session, timeout
 
 
 def _time_format(duration: int) -> str:
@@ -52,8 +54,9 @@ def _get_tracks(spotify_obj: Spotify, album_id: str) -> list[dict]:
 
 
 @root_cmd.command()
+@click.pass_context
 @click.option("--album_name", prompt="Please enter your album name")
-def get_album_length(album_name: str):
+def get_album_length(ctx: click.Context, album_name: str):
     """
     CLI command to fetch and display the total length of a Spotify album.
     Prompts the user for an album name, searches Spotify, and prints each track name and the total album duration.
@@ -62,8 +65,18 @@ def get_album_length(album_name: str):
     client_id = os.getenv("SPOTIFY_CLIENT_ID")
     client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
 
+    # Same pooled session, timeouts and retry policy as the app
+    http = (ctx.obj["root_cfg"].app or AppConfig()).spotify_http
+    session = build_session(http)
+
     # Authenticate with Spotify using client credentials
-    sp = spotipy.Spotify(auth_manager=SpotifyClientCredentials(client_id, client_secret))
+    sp = spotipy.Spotify(
+        auth_manager=SpotifyClientCredentials(
+            client_id, client_secret, requests_session=session, requests_timeout=timeout(http)
+        ),
+        requests_session=session,
+        requests_timeout=timeout(http),
+    )
 
     album_id = _search_query(sp, album_name=album_name)
 
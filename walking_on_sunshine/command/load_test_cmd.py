@@ -0,0 +1,134 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import click
+import requests
+
+import walking_on_sunshine
+from walking_on_sunshine.api.config import Config as ApiConfig
+from walking_on_sunshine.app.config import Config as AppConfig
+from walking_on_sunshine.command.root import root_cmd
+from walking_on_sunshine.loadtest.config import Config as LoadTestConfig
+from walking_on_sunshine.loadtest.driver import run_load
+from walking_on_sunshine.loadtest.standins import create_ors_app, create_spotify_app, serve_in_thread
+
+
+def _wait_until_up(url: str, timeout_s: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code < 500:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise click.ClickException(f"{url} did not come up within {timeout_s:.0f}s")
+
+
+@root_cmd.command()
+@click.pass_context
+@click.option("--concurrency", default=8, show_default=True)
+@click.option("--requests", "total_requests", default=200, show_default=True)
+@click.option("--warmup", default=10, show_default=True, help="Requests sent before measuring.")
+@click.option("--standins-only", is_flag=True, help="Only serve the Spotify and ORS stand-ins until interrupted.")
+@click.option("--output", type=click.Path(path_type=Path), help="Also write the report as JSON.")
+def load_test(
+    ctx: click.Context, concurrency: int, total_requests: int, warmup: int, standins_only: bool, output: Path | None
+):
+    """
+    Load-test /generate_route on a real uvicorn process wired to local Spotify and ORS stand-ins.
+    Stand-in latency and error rates come from the `loadtest` section of config.yml.
+    """
+    root_cfg = ctx.obj["root_cfg"]
+    cfg = root_cfg.loadtest or LoadTestConfig()
+
+    spotify_url = f"http://{cfg.host}:{cfg.spotify_port}"
+    ors_url = f"http://{cfg.host}:{cfg.ors_port}"
+    try:
+        standins = [
+            serve_in_thread(create_spotify_app(cfg.spotify, cfg.seed), cfg.host, cfg.spotify_port),
+            serve_in_thread(create_ors_app(cfg.ors, cfg.seed), cfg.host, cfg.ors_port),
+        ]
+    except RuntimeError as e:
+        raise click.ClickException(str(e)) from None
+    click.echo(f"Spotify stand-in on {spotify_url}, ORS stand-in on {ors_url}")
+
+    app_cfg = (root_cfg.app or AppConfig()).model_copy(
+        update={
+            "spotify_api_url": f"{spotify_url}/v1/",
+            "spotify_token_url": f"{spotify_url}/api/token",
+            "ors_base_url": ors_url,
+        }
+    )
+    if standins_only:
+        click.echo("Point the app at them with:")
+        click.echo(
+            f"  WOS_APP='{app_cfg.model_dump_json(include={'spotify_api_url', 'spotify_token_url', 'ors_base_url'})}'"
+        )
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if app_cfg.local_graph_path:
+        app_cfg = app_cfg.model_copy(update={"local_graph_path": str(Path(app_cfg.local_graph_path).resolve())})
+    # The API runs in a scratch directory so stand-in tokens (spotipy's ./.cache) and stand-in cache entries
+    # never land where a real server would pick them up
+    work_dir = tempfile.TemporaryDirectory(prefix="wos-load-test-")
+    package_root = str(Path(walking_on_sunshine.__file__).resolve().parent.parent)
+    env = os.environ | {
+        "PYTHONPATH": os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")])),
+        "WOS_APP": app_cfg.model_dump_json(),
+        "WOS_API": (root_cfg.api or ApiConfig()).model_dump_json(),
+        "SPOTIFY_CLIENT_ID": "stand-in",
+        "SPOTIFY_CLIENT_SECRET": "stand-in",
+    }
+    api_url = f"http://{cfg.host}:{cfg.api_port}"
+    api_process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "walking_on_sunshine.api.server:app",
+            "--host",
+            cfg.host,
+            "--port",
+            str(cfg.api_port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+        cwd=work_dir.name,
+    )
+    try:
+        _wait_until_up(f"{api_url}/stats")
+        if warmup:
+            run_load(api_url, concurrency, warmup, seed=cfg.seed)
+        report = run_load(api_url, concurrency, total_requests, seed=cfg.seed)
+        report["concurrency"] = concurrency
+        report["server_stats"] = requests.get(f"{api_url}/stats", timeout=5).json()
+    finally:
+        api_process.terminate()
+        api_process.wait(timeout=10)
+        work_dir.cleanup()
+        for server in standins:
+            server.should_exit = True
+
+    click.echo(
+        f"{report['requests']} requests at concurrency {concurrency} in {report['elapsed_s']:.1f}s: "
+        f"{report['throughput_rps']:.1f} req/s, statuses {report['statuses']}"
+    )
+    click.echo(
+        f"latency p50 {report['p50_ms']:.0f} ms, p95 {report['p95_ms']:.0f} ms, p99 {report['p99_ms']:.0f} ms, "
+        f"max {report['max_ms']:.0f} ms"
+    )
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2) + "\n")
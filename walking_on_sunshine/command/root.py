@@ -15,6 +15,7 @@ from walking_on_sunshine.command.config import RootConfig
 @click.pass_context
 def root_cmd(ctx: click.Context, verbose: bool):
     ctx.ensure_object(dict)
+    ctx.obj["verbose"] = verbose
     if verbose:
         structlog.configure(
             wrapper_class=structlog.make_filtering_bound_logger(logging.DEBUG),
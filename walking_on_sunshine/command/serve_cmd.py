@@ -1,17 +1,28 @@
+import logging
+
 import click
 
 from walking_on_sunshine.api.api import API
 from walking_on_sunshine.app.app import App
 from walking_on_sunshine.command.root import root_cmd
+from walking_on_sunshine.common.logging.logger import get_logger, set_log_level
+from walking_on_sunshine.common.logging.processors import set_payload_sample_rate
+
+logger = get_logger(__name__)
 
 
 @root_cmd.command()
 @click.pass_context
 def serve(ctx: click.Context):
-    print("Serving API")
+    logger.info("Serving API")
 
     root_cfg = ctx.obj["root_cfg"]
+    if root_cfg.api is not None:
+        # -v already asked for debug; otherwise the configured level replaces root_cmd's INFO default
+        if not ctx.obj.get("verbose"):
+            set_log_level(logging.getLevelNamesMapping()[root_cfg.api.log_level.upper()])
+        set_payload_sample_rate(root_cfg.api.log_payload_sample_rate)
 
     app = App(root_cfg.app)
-    api = API(app)
+    api = API(app, root_cfg.api)
     api.run()
@@ -0,0 +1,30 @@
+import logging
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from walking_on_sunshine.command.root import root_cmd
+from walking_on_sunshine.command.serve_cmd import serve  # noqa: F401  (registers the command)
+
+
+def _serve(tmp_path, monkeypatch, args, log_level):
+    (tmp_path / "config.yml").write_text(f"api:\n  log_level: {log_level}\n")
+    monkeypatch.chdir(tmp_path)
+    with (
+        patch("walking_on_sunshine.command.serve_cmd.App"),
+        patch("walking_on_sunshine.command.serve_cmd.API"),
+        patch("walking_on_sunshine.command.serve_cmd.set_log_level") as set_level,
+    ):
+        result = CliRunner().invoke(root_cmd, [*args, "serve"])
+    assert result.exit_code == 0, result.output
+    return set_level
+
+
+def test_serve_applies_configured_log_level(tmp_path, monkeypatch):
+    set_level = _serve(tmp_path, monkeypatch, [], "debug")
+    set_level.assert_called_once_with(logging.DEBUG)
+
+
+def test_serve_keeps_verbose_debug(tmp_path, monkeypatch):
+    set_level = _serve(tmp_path, monkeypatch, ["-v"], "warning")
+    set_level.assert_not_called()
@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+
+import click
+
+from walking_on_sunshine.app.app import App
+from walking_on_sunshine.app.config import Config as AppConfig
+from walking_on_sunshine.app.warm_cache import warm_caches
+from walking_on_sunshine.command.root import root_cmd
+
+
+def _read_lines(path: Path | None) -> list[str]:
+    """
+    Non-empty lines of a file, skipping # comments.
+    """
+    if path is None:
+        return []
+    lines = (line.strip() for line in path.read_text().splitlines())
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+@root_cmd.command()
+@click.pass_context
+@click.option("--album", "albums", multiple=True, help="Album name, Spotify album id or spotify:album: URI.")
+@click.option("--albums-file", type=click.Path(exists=True, dir_okay=False, path_type=Path), help="One album per line.")
+@click.option("--start", "starts", multiple=True, help="Start location as users type it, or a 'lat,lon' pair.")
+@click.option("--starts-file", type=click.Path(exists=True, dir_okay=False, path_type=Path), help="One start per line.")
+@click.option("--concurrency", default=4, show_default=True, help="Upstream calls in flight at once.")
+@click.option("--output", type=click.Path(path_type=Path), help="Also write the report as JSON.")
+def warm_cache(
+    ctx: click.Context,
+    albums: tuple[str, ...],
+    albums_file: Path | None,
+    starts: tuple[str, ...],
+    starts_file: Path | None,
+    concurrency: int,
+    output: Path | None,
+):
+    """
+    Fill the album, geocode and route caches ahead of traffic, e.g. at deploy time or nightly.
+    Only useful with `app.cache_backend: sqlite`, which the API workers read from.
+    """
+    album_refs = [*albums, *_read_lines(albums_file)]
+    start_locations = [*starts, *_read_lines(starts_file)]
+    if not album_refs and not start_locations:
+        raise click.UsageError("Give at least one --album/--albums-file or --start/--starts-file.")
+
+    app_cfg = ctx.obj["root_cfg"].app or AppConfig()
+    if app_cfg.cache_backend == "memory":
+        click.echo("cache_backend is memory: warmed entries are dropped when this command exits.", err=True)
+
+    app = App(app_cfg)
+
+    def progress(stage: str, done: int, total: int):
+        if done == total or done % 10 == 0:
+            click.echo(f"{stage}: {done}/{total}")
+
+    report = warm_caches(app, album_refs, start_locations, concurrency=concurrency, progress=progress)
+
+    for stage in ("album_names", "albums", "starts", "routes"):
+        stage_report = report[stage]
+        if "skipped" in stage_report:
+            click.echo(f"{stage}: skipped, {stage_report['skipped']}")
+            continue
+        click.echo(
+            f"{stage}: {stage_report['warmed']}/{stage_report['requested']} warmed, {stage_report['failed']} failed"
+        )
+    upstream = ", ".join(f"{name} {count}" for name, count in report["upstream_requests"].items())
+    click.echo(f"Upstream HTTP requests: {upstream} in {report['elapsed_s']:.1f}s")
+
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2) + "\n")
@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from collections.abc import Hashable
+from typing import Any
+
+
+class CacheBackend(ABC):
+    """
+    Key/value cache interface shared by the in-process and on-disk caches, so callers can take either.
+    A miss returns `default`; entries may be expired or evicted at any time.
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable, default: Any = None) -> Any: ...
+
+    @abstractmethod
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Like get, but leaves the hit/miss counters alone. Used for speculative probes.
+        """
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any): ...
+
+    @abstractmethod
+    def delete(self, key: Hashable): ...
+
+    @abstractmethod
+    def clear(self): ...
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """
+        Counters for /stats and /metrics: size, max_size, hits, misses and evictions.
+        """
@@ -0,0 +1,46 @@
+import heapq
+import threading
+import time
+from collections.abc import Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+
+class PopularityTracker(Generic[K]):
+    """
+    Thread-safe request counts with exponential decay, for picking the hottest keys.
+    Counts halve every `half_life_s`, and only the `max_keys` highest counts are kept.
+    """
+
+    def __init__(self, max_keys: int = 4096, half_life_s: float = 3600):
+        self.max_keys = max_keys
+        self.half_life_s = half_life_s
+        self._counts: dict[K, float] = {}
+        self._lock = threading.Lock()
+        self._decayed_at = time.monotonic()
+
+    def _decay(self, now: float):
+        halvings = (now - self._decayed_at) / self.half_life_s
+        if halvings < 1:
+            return
+        factor = 0.5**halvings
+        self._counts = {key: count * factor for key, count in self._counts.items() if count * factor >= 0.01}
+        self._decayed_at = now
+
+    def hit(self, key: K):
+        with self._lock:
+            self._decay(time.monotonic())
+            self._counts[key] = self._counts.get(key, 0.0) + 1
+            if len(self._counts) > self.max_keys:
+                # Trim back to 90% so this does not run on every new key
+                keep = heapq.nlargest(int(self.max_keys * 0.9), self._counts.items(), key=lambda item: item[1])
+                self._counts = dict(keep)
+
+    def top(self, n: int) -> list[K]:
+        with self._lock:
+            self._decay(time.monotonic())
+            return [key for key, _ in heapq.nlargest(n, self._counts.items(), key=lambda item: item[1])]
+
+    def __len__(self) -> int:
+        return len(self._counts)
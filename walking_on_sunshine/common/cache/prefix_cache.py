@@ -0,0 +1,73 @@
+import threading
+
+from walking_on_sunshine.common.cache.ttl_cache import TTLCache, normalize_key
+
+
+def _matches(name: str, tokens: list[str]) -> bool:
+    words = normalize_key(name).split()
+    return all(any(word.startswith(token) for word in words) for token in tokens)
+
+
+class PrefixCache:
+    """
+    Autocomplete result cache keyed by normalized query.
+
+    Each entry holds up to `fetch_limit` results for a query. A query that is not cached
+    can still be answered from the longest cached prefix of it: the prefix's results are
+    filtered down to items whose name matches every token of the longer query. That is
+    exact when the prefix returned fewer than `fetch_limit` results (the full match set),
+    and when it was truncated we only use it if at least `limit` results survive.
+    """
+
+    def __init__(self, max_size: int = 2048, ttl_s: float | None = 3600, limit: int = 10, fetch_limit: int = 50):
+        self.limit = limit
+        self.fetch_limit = fetch_limit
+        self._entries = TTLCache(max_size, ttl_s)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.narrowed = 0
+        self.misses = 0
+
+    def get(self, query: str) -> list[dict] | None:
+        key = normalize_key(query)
+        results = self._entries.peek(key)
+        if results is not None:
+            self._count("hits")
+            return results[: self.limit]
+
+        tokens = key.split()
+        for end in range(len(key) - 1, 0, -1):
+            prefix_results = self._entries.peek(key[:end])
+            if prefix_results is None:
+                continue
+            narrowed = [item for item in prefix_results if _matches(item.get("name") or "", tokens)]
+            complete = len(prefix_results) < self.fetch_limit
+            if complete or len(narrowed) >= self.limit:
+                if complete:
+                    # Narrowing a full match set is itself a full match set, so it can seed longer queries.
+                    self._entries.set(key, narrowed)
+                self._count("narrowed")
+                return narrowed[: self.limit]
+            # The closest prefix was truncated and too broad, shorter ones will be too.
+            break
+
+        self._count("misses")
+        return None
+
+    def set(self, query: str, results: list[dict]):
+        self._entries.set(normalize_key(query), results)
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict:
+        entry_stats = self._entries.stats()
+        return {
+            "size": entry_stats["size"],
+            "max_size": entry_stats["max_size"],
+            "hits": self.hits,
+            "narrowed": self.narrowed,
+            "misses": self.misses,
+            "evictions": entry_stats["evictions"],
+        }
@@ -0,0 +1,100 @@
+import asyncio
+import contextvars
+import inspect
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from typing import Any
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller for a key runs the call, and callers arriving while it
+    is in flight wait for the same result or error instead of issuing their own. Nothing is kept afterwards;
+    caching stays the job of the caches in front.
+    Keys are tuples whose first item names the kind of call, which the stats are broken down by.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: dict[Hashable, Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self._coalesced_by_kind: dict[str, int] = {}
+
+    def _join(self, key: tuple) -> tuple[Future, bool]:
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                kind = str(key[0])
+                self._coalesced_by_kind[kind] = self._coalesced_by_kind.get(kind, 0) + 1
+                return future, False
+            future = self._in_flight[key] = Future()
+            self.calls += 1
+            return future, True
+
+    def _settle(self, key: tuple, future: Future, result: Any = None, error: BaseException | None = None) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: tuple, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run fn(*args, **kwargs) unless an identical call is in flight, in which case wait for its outcome.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    async def do_async(self, key: tuple, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Async variant sharing in-flight calls with `do`. A plain function runs in the default executor.
+        The call is detached from the awaiting task, so cancelling one waiter does not cancel it for the others.
+        """
+        future, leader = self._join(key)
+        if leader:
+            if inspect.iscoroutinefunction(fn):
+                task = asyncio.ensure_future(fn(*args, **kwargs))
+                task.add_done_callback(lambda t: self._settle_task(key, future, t))
+            else:
+                context = contextvars.copy_context()
+                asyncio.get_running_loop().run_in_executor(
+                    None, context.run, self._run_and_settle, key, future, fn, args, kwargs
+                )
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _run_and_settle(self, key: tuple, future: Future, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            return
+        self._settle(key, future, result)
+
+    def _settle_task(self, key: tuple, future: Future, task: asyncio.Task) -> None:
+        if task.cancelled():
+            self._settle(key, future, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._settle(key, future, error=task.exception())
+        else:
+            self._settle(key, future, task.result())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight),
+                "coalesced_by_kind": dict(self._coalesced_by_kind),
+            }
@@ -0,0 +1,229 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Hashable
+from typing import Any
+
+from walking_on_sunshine.common.cache.backend import CacheBackend
+from walking_on_sunshine.common.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS cache_entries (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value BLOB NOT NULL,
+        expires_at REAL,
+        accessed_at REAL NOT NULL,
+        PRIMARY KEY (namespace, key)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (namespace, accessed_at)",
+)
+
+
+def encode_value(value: Any) -> bytes:
+    """
+    Compact JSON, zlib-compressed. Tuples come back as lists.
+    """
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode(), 6)
+
+
+def decode_value(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob))
+
+
+def encode_key(key: Hashable) -> str:
+    return json.dumps(key, separators=(",", ":"))
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache stored in a SQLite file, so every process on the host shares entries and they survive restarts.
+
+    Several caches can share one file, each under its own namespace. The database runs in WAL mode so readers do
+    not block the writer, and each thread keeps its own connection. Expiry uses wall-clock time since entries
+    outlive the process. Eviction is approximately LRU: last access is written at most once per
+    `touch_interval_s`, and every `evict_every` sets the namespace is trimmed back to max_size, so it can briefly
+    overshoot by that many entries per process. Database errors are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        namespace: str,
+        max_size: int = 1024,
+        ttl_s: float | None = None,
+        evict_every: int = 64,
+        touch_interval_s: float = 60,
+        busy_timeout_s: float = 5.0,
+    ):
+        self.path = path
+        self.namespace = namespace
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+        self.evict_every = evict_every
+        self.touch_interval_s = touch_interval_s
+        self.busy_timeout_s = busy_timeout_s
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sets = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        for statement in _SCHEMA:
+            conn.execute(statement)
+
+    def _conn(self) -> sqlite3.Connection:
+        # Connections are per thread and per process; a forked worker opens its own.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_s, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _error(self, operation: str, error: sqlite3.Error):
+        self._count("errors")
+        logger.warning("Cache backend error", namespace=self.namespace, operation=operation, error=str(error))
+
+    def _lookup(self, key: Hashable) -> Any:
+        conn = self._conn()
+        db_key = encode_key(key)
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, db_key),
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at, accessed_at = row
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, db_key))
+            return None
+        if accessed_at < now - self.touch_interval_s:
+            conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, db_key),
+            )
+        return decode_value(value)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            value = self._lookup(key)
+        except sqlite3.Error as e:
+            self._error("get", e)
+            value = None
+        if value is None:
+            self._count("misses")
+            return default
+        self._count("hits")
+        return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            value = self._lookup(key)
+        except sqlite3.Error as e:
+            self._error("peek", e)
+            value = None
+        return default if value is None else value
+
+    def set(self, key: Hashable, value: Any):
+        if self.max_size <= 0:
+            return
+        now = time.time()
+        expires_at = now + self.ttl_s if self.ttl_s is not None else None
+        try:
+            self._conn().execute(
+                """
+                INSERT INTO cache_entries (namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (namespace, key) DO UPDATE SET
+                    value = excluded.value, expires_at = excluded.expires_at, accessed_at = excluded.accessed_at
+                """,
+                (self.namespace, encode_key(key), encode_value(value), expires_at, now),
+            )
+        except sqlite3.Error as e:
+            self._error("set", e)
+            return
+
+        with self._lock:
+            self._sets += 1
+            due = self._sets % self.evict_every == 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """
+        Drop expired entries, then the least recently used ones beyond max_size.
+        """
+        try:
+            conn = self._conn()
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?", (self.namespace, time.time())
+            )
+            cursor = conn.execute(
+                """
+                DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                    SELECT key FROM cache_entries WHERE namespace = ? ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.namespace, self.namespace, self.max_size),
+            )
+        except sqlite3.Error as e:
+            self._error("evict", e)
+            return
+        if cursor.rowcount > 0:
+            self._count("evictions", cursor.rowcount)
+
+    def delete(self, key: Hashable):
+        try:
+            self._conn().execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, encode_key(key))
+            )
+        except sqlite3.Error as e:
+            self._error("delete", e)
+
+    def clear(self):
+        try:
+            self._conn().execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+        except sqlite3.Error as e:
+            self._error("clear", e)
+
+    def __len__(self) -> int:
+        try:
+            return (
+                self._conn()
+                .execute("SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,))
+                .fetchone()[0]
+            )
+        except sqlite3.Error as e:
+            self._error("count", e)
+            return 0
+
+    def stats(self) -> dict:
+        size = len(self)
+        with self._lock:
+            return {
+                "size": size,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "errors": self.errors,
+            }
@@ -0,0 +1,36 @@
+from unittest.mock import patch
+
+from walking_on_sunshine.common.cache.popularity import PopularityTracker
+
+
+def test_top_orders_keys_by_hit_count():
+    tracker = PopularityTracker()
+    for key in ["a", "b", "b", "c", "c", "c"]:
+        tracker.hit(key)
+
+    assert tracker.top(2) == ["c", "b"]
+
+
+@patch("walking_on_sunshine.common.cache.popularity.time.monotonic")
+def test_old_hits_decay(mock_monotonic):
+    mock_monotonic.return_value = 0.0
+    tracker = PopularityTracker(half_life_s=60)
+    for _ in range(4):
+        tracker.hit("old")
+
+    mock_monotonic.return_value = 180.0
+    for _ in range(2):
+        tracker.hit("new")
+
+    assert tracker.top(2) == ["new", "old"]
+
+
+def test_keeps_at_most_max_keys():
+    tracker = PopularityTracker(max_keys=10)
+    tracker.hit("hot")
+    tracker.hit("hot")
+    for i in range(20):
+        tracker.hit(i)
+
+    assert len(tracker) <= 10
+    assert tracker.top(1) == ["hot"]
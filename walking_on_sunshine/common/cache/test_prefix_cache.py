@@ -0,0 +1,40 @@
+from walking_on_sunshine.common.cache.prefix_cache import PrefixCache
+
+
+def _album(name):
+    return {"id": name, "name": name}
+
+
+def test_get_exact_hit_is_trimmed_to_limit():
+    cache = PrefixCache(limit=2, fetch_limit=5)
+    cache.set("Abbey", [_album("Abbey Road"), _album("Abbey Lane"), _album("Abbey Hill")])
+
+    assert cache.get("  abbey ") == [_album("Abbey Road"), _album("Abbey Lane")]
+    assert cache.stats()["hits"] == 1
+
+
+def test_get_narrows_complete_prefix_results():
+    cache = PrefixCache(limit=10, fetch_limit=50)
+    cache.set("abb", [_album("Abbey Road"), _album("ABBA Gold"), _album("Abbey Lane")])
+
+    assert cache.get("abbey r") == [_album("Abbey Road")]
+    assert cache.get("abbey ro") == [_album("Abbey Road")]
+    stats = cache.stats()
+    assert stats["narrowed"] == 2
+    assert stats["misses"] == 0
+
+
+def test_get_misses_when_truncated_prefix_narrows_below_limit():
+    cache = PrefixCache(limit=2, fetch_limit=3)
+    cache.set("abb", [_album("Abbey Road"), _album("ABBA Gold"), _album("Abbey Lane")])
+
+    assert cache.get("abba") is None
+    assert cache.get("abbey") == [_album("Abbey Road"), _album("Abbey Lane")]
+    # Narrowed from a truncated set, so it must not be stored as a complete entry.
+    assert cache.stats()["size"] == 1
+
+
+def test_get_misses_without_cached_prefix():
+    cache = PrefixCache()
+    assert cache.get("abbey") is None
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from walking_on_sunshine.common.cache.single_flight import SingleFlight
+
+
+def _blocking_call(release: threading.Event, calls: list, result="done"):
+    def fn():
+        calls.append(1)
+        release.wait(timeout=5)
+        return result
+
+    return fn
+
+
+def _wait_for(predicate):
+    for _ in range(500):
+        if predicate():
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("condition not reached")
+
+
+def test_do_coalesces_concurrent_calls_for_the_same_key():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    fn = _blocking_call(release, calls)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flight.do, ("album", "1"), fn) for _ in range(4)]
+        _wait_for(lambda: flight.stats()["coalesced"] == 3)
+        release.set()
+        results = [f.result(timeout=5) for f in futures]
+
+    assert results == ["done"] * 4
+    assert len(calls) == 1
+    assert flight.stats() == {"calls": 1, "coalesced": 3, "in_flight": 0, "coalesced_by_kind": {"album": 3}}
+
+
+def test_do_runs_different_keys_separately():
+    flight = SingleFlight()
+
+    assert flight.do(("album", "1"), lambda: 1) == 1
+    assert flight.do(("album", "2"), lambda: 2) == 2
+    assert flight.stats()["calls"] == 2
+
+
+def test_do_does_not_remember_settled_calls():
+    flight = SingleFlight()
+    calls = []
+
+    flight.do(("album", "1"), calls.append, 1)
+    flight.do(("album", "1"), calls.append, 2)
+
+    assert calls == [1, 2]
+
+
+def test_do_shares_the_leaders_error_with_waiters():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(timeout=5)
+        raise ValueError("upstream down")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(flight.do, ("search", "q"), fail) for _ in range(3)]
+        _wait_for(lambda: flight.stats()["coalesced"] == 2)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError, match="upstream down"):
+                future.result(timeout=5)
+
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_do_async_coalesces_coroutines():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "album"
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async(("album", "1"), fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["album"] * 5
+    assert len(calls) == 1
+    assert flight.stats()["coalesced"] == 4
+
+
+def test_do_async_joins_a_call_led_by_a_thread():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    fn = _blocking_call(release, calls)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(flight.do, ("geocode", "addr"), fn)
+        _wait_for(lambda: flight.stats()["in_flight"] == 1)
+
+        async def main():
+            waiter = asyncio.ensure_future(flight.do_async(("geocode", "addr"), fn))
+            await asyncio.sleep(0)
+            release.set()
+            return await waiter
+
+        assert asyncio.run(main()) == "done"
+        assert leader.result(timeout=5) == "done"
+
+    assert len(calls) == 1
+
+
+def test_do_async_cancelling_one_waiter_leaves_the_call_running_for_others():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "route"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do_async(("route", "k"), fetch))
+        second = asyncio.ensure_future(flight.do_async(("route", "k"), fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "route"
+    assert len(calls) == 1
+
+
+def test_do_async_runs_plain_functions_in_the_executor():
+    flight = SingleFlight()
+    caller = threading.get_ident()
+
+    async def main():
+        return await flight.do_async(("reverse_geocode", (1, 2)), threading.get_ident)
+
+    assert asyncio.run(main()) != caller
+    assert flight.stats()["in_flight"] == 0
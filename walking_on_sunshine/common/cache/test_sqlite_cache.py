@@ -0,0 +1,131 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from walking_on_sunshine.common.cache.sqlite_cache import SQLiteCache, decode_value, encode_value
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+
+def test_get_round_trips_json_values(db_path):
+    cache = SQLiteCache(db_path, "album_details")
+    details = {"id": "a1", "name": "Abbey Road", "artists": ["The Beatles"], "total_ms": 2833000, "image_url": None}
+    cache.set("a1", details)
+
+    assert cache.get("a1") == details
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_tuple_keys_and_values_come_back_as_lists(db_path):
+    cache = SQLiteCache(db_path, "route")
+    cache.set(((52.52, 13.405), 2500, 100, 42), [(13.4, 52.5), (13.41, 52.51)])
+
+    assert cache.get(((52.52, 13.405), 2500, 100, 42)) == [[13.4, 52.5], [13.41, 52.51]]
+
+
+def test_values_are_compressed():
+    value = [[13.4 + i / 1000, 52.5] for i in range(500)]
+    blob = encode_value(value)
+
+    assert len(blob) < len(str(value)) / 2
+    assert decode_value(blob) == value
+
+
+def test_entries_are_shared_between_instances_on_the_same_file(db_path):
+    writer = SQLiteCache(db_path, "geocode")
+    reader = SQLiteCache(db_path, "geocode")
+    other_namespace = SQLiteCache(db_path, "reverse_geocode")
+    writer.set("berlin", [[13.405, 52.52]])
+
+    assert reader.get("berlin") == [[13.405, 52.52]]
+    assert other_namespace.get("berlin") is None
+
+
+def test_entries_survive_reopening(db_path):
+    SQLiteCache(db_path, "album_names").set("abbey road", "a1")
+
+    assert SQLiteCache(db_path, "album_names").get("abbey road") == "a1"
+
+
+@patch("walking_on_sunshine.common.cache.sqlite_cache.time.time")
+def test_get_expires_entries_after_ttl(mock_time, db_path):
+    mock_time.return_value = 1000.0
+    cache = SQLiteCache(db_path, "geocode", ttl_s=10)
+    cache.set("a", 1)
+
+    mock_time.return_value = 1009.0
+    assert cache.get("a") == 1
+    mock_time.return_value = 1011.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+@patch("walking_on_sunshine.common.cache.sqlite_cache.time.time")
+def test_evict_keeps_the_most_recently_used_entries(mock_time, db_path):
+    cache = SQLiteCache(db_path, "route", max_size=2, evict_every=1000, touch_interval_s=0)
+    for i, key in enumerate(["a", "b", "c"]):
+        mock_time.return_value = 1000.0 + i
+        cache.set(key, i)
+    mock_time.return_value = 1010.0
+    cache.get("a")
+
+    cache.evict()
+
+    assert cache.peek("b") is None
+    assert cache.peek("a") == 0
+    assert cache.peek("c") == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_set_trims_to_max_size_every_evict_every_sets(db_path):
+    cache = SQLiteCache(db_path, "route", max_size=3, evict_every=4)
+    for i in range(4):
+        cache.set(i, i)
+    assert len(cache) == 3
+
+    for i in range(4, 7):
+        cache.set(i, i)
+    assert len(cache) == 6
+
+    cache.set(7, 7)
+    assert len(cache) == 3
+
+
+def test_max_size_zero_disables_the_cache(db_path):
+    cache = SQLiteCache(db_path, "route", max_size=0)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+
+
+def test_database_errors_are_treated_as_misses(db_path):
+    cache = SQLiteCache(db_path, "geocode")
+    cache.set("a", 1)
+
+    with patch.object(cache, "_conn", side_effect=sqlite3.OperationalError("database is locked")):
+        assert cache.get("a") is None
+        cache.set("b", 2)
+
+    assert cache.stats()["errors"] == 2
+    assert cache.get("a") == 1
+
+
+def test_concurrent_writers_from_many_threads(db_path):
+    cache = SQLiteCache(db_path, "geocode", max_size=10_000)
+
+    def write(i):
+        cache.set(f"addr {i}", [[float(i), 0.0]])
+        return cache.get(f"addr {i}")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(write, range(200)))
+
+    assert results == [[[float(i), 0.0]] for i in range(200)]
+    assert cache.stats()["errors"] == 0
@@ -0,0 +1,49 @@
+from unittest.mock import patch
+
+from walking_on_sunshine.common.cache.ttl_cache import TTLCache, normalize_key
+
+
+def test_get_counts_hits_and_misses():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_set_evicts_least_recently_used():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+@patch("walking_on_sunshine.common.cache.ttl_cache.time.monotonic")
+def test_get_expires_entries_after_ttl(mock_monotonic):
+    mock_monotonic.return_value = 100.0
+    cache = TTLCache(max_size=2, ttl_s=10)
+    cache.set("a", 1)
+
+    mock_monotonic.return_value = 109.0
+    assert cache.get("a") == 1
+    mock_monotonic.return_value = 111.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_zero_size_disables_cache():
+    cache = TTLCache(max_size=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_normalize_key():
+    assert normalize_key("  Abbey   ROAD ") == "abbey road"
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+
+class HttpConfig(BaseModel):
+    # Connections kept alive per host; requests beyond this wait for a free connection instead of opening more
+    pool_maxsize: int = 16
+    connect_timeout_s: float = 3.05
+    read_timeout_s: float = 10.0
+    # Retries on connection errors and retry_statuses, with exponential backoff plus up to backoff_factor jitter
+    retries: int = 3
+    backoff_factor: float = 0.3
+    backoff_max_s: float = 10.0
+    # Retry-After on 429/503 is honored but never waited on for longer than this
+    max_retry_after_s: float = 10.0
+    retry_statuses: list[int] = [429, 500, 502, 503, 504]
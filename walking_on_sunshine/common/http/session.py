@@ -0,0 +1,82 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from walking_on_sunshine.common.http.config import HttpConfig
+
+
+class CappedRetry(Retry):
+    """
+    Retry that honors Retry-After but caps the wait, so one throttled call cannot hold a worker for minutes.
+    """
+
+    max_retry_after_s: float = 10.0
+
+    def new(self, **kw) -> "CappedRetry":
+        retry = super().new(**kw)
+        retry.max_retry_after_s = self.max_retry_after_s
+        return retry
+
+    def get_retry_after(self, response) -> float | None:
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, self.max_retry_after_s)
+
+
+def build_retry(config: HttpConfig) -> CappedRetry:
+    retry = CappedRetry(
+        total=config.retries,
+        connect=config.retries,
+        read=False,
+        status=config.retries,
+        status_forcelist=config.retry_statuses,
+        # Directions are POSTs; they are safe to repeat
+        allowed_methods=frozenset(["GET", "POST"]),
+        backoff_factor=config.backoff_factor,
+        backoff_jitter=config.backoff_factor,
+        backoff_max=config.backoff_max_s,
+        respect_retry_after_header=True,
+    )
+    retry.max_retry_after_s = config.max_retry_after_s
+    return retry
+
+
+def build_session(config: HttpConfig) -> requests.Session:
+    """
+    Keep-alive session with a bounded connection pool and the retry policy from `config`.
+    Exhausted retries raise requests' RetryError, so client libraries do not stack their own retries on top.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=config.pool_maxsize, max_retries=build_retry(config))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def timeout(config: HttpConfig) -> tuple[float, float]:
+    return config.connect_timeout_s, config.read_timeout_s
+
+
+def session_stats(session: requests.Session) -> dict:
+    """
+    Connection reuse across the session's pools: requests sent versus new connections (each a TCP/TLS handshake).
+    """
+    requests_sent = 0
+    connections = 0
+    hosts = 0
+    for adapter in {id(a): a for a in session.adapters.values()}.values():
+        pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+        if pools is None:
+            continue
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts += 1
+            requests_sent += pool.num_requests
+            connections += pool.num_connections
+    return {
+        "hosts": hosts,
+        "requests": requests_sent,
+        "connections": connections,
+        "reuse_ratio": round(1 - connections / requests_sent, 3) if requests_sent else 0.0,
+    }
@@ -0,0 +1,77 @@
+import time
+
+import pytest
+import requests
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from walking_on_sunshine.common.http.config import HttpConfig
+from walking_on_sunshine.common.http.session import build_retry, build_session, session_stats
+from walking_on_sunshine.loadtest.standins import bound_port, serve_in_thread
+
+
+@pytest.fixture(scope="module")
+def flaky_url():
+    app = FastAPI()
+    calls = {"n": 0}
+
+    @app.get("/ok")
+    async def ok():
+        return {"ok": True}
+
+    @app.get("/throttled/{failures}")
+    async def throttled(failures: int):
+        calls["n"] += 1
+        if calls["n"] % (failures + 1):
+            return JSONResponse({"error": "slow down"}, status_code=429, headers={"Retry-After": "120"})
+        return {"calls": calls["n"]}
+
+    @app.get("/down")
+    async def down():
+        return JSONResponse({"error": "down"}, status_code=503)
+
+    server = serve_in_thread(app, "127.0.0.1", 0)
+    yield f"http://127.0.0.1:{bound_port(server)}"
+    server.should_exit = True
+
+
+def test_retries_honor_capped_retry_after(flaky_url):
+    session = build_session(HttpConfig(retries=3, backoff_factor=0, max_retry_after_s=0.05))
+
+    start = time.monotonic()
+    response = session.get(f"{flaky_url}/throttled/2", timeout=5)
+
+    assert response.status_code == 200
+    assert response.json() == {"calls": 3}
+    # Two Retry-After: 120 waits, each capped at 50 ms
+    assert 0.1 <= time.monotonic() - start < 2
+
+
+def test_exhausted_retries_raise(flaky_url):
+    session = build_session(HttpConfig(retries=2, backoff_factor=0.01))
+    with pytest.raises(requests.exceptions.RetryError):
+        session.get(f"{flaky_url}/down", timeout=5)
+
+
+def test_backoff_is_jittered_and_capped():
+    retry = build_retry(HttpConfig(backoff_factor=1.0, backoff_max_s=3.0))
+    for _ in range(3):
+        retry = retry.increment(method="GET", url="/")
+
+    assert retry.max_retry_after_s == 10.0
+    # 1.0 * 2^(3-1) = 4s, plus up to 1s of jitter, capped at 3s
+    assert retry.get_backoff_time() == 3.0
+    retry = (
+        build_retry(HttpConfig(backoff_factor=0.1)).increment(method="GET", url="/").increment(method="GET", url="/")
+    )
+    assert 0.2 <= retry.get_backoff_time() <= 0.3
+
+
+def test_session_stats_show_connection_reuse(flaky_url):
+    session = build_session(HttpConfig())
+    for _ in range(10):
+        session.get(f"{flaky_url}/ok", timeout=5)
+
+    stats = session_stats(session)
+
+    assert stats == {"hosts": 1, "requests": 10, "connections": 1, "reuse_ratio": 0.9}
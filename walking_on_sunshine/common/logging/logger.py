@@ -3,19 +3,28 @@ import sys
 import structlog
 from structlog.stdlib import BoundLogger
 
+from walking_on_sunshine.common.logging.processors import TruncateFields, sample_payloads
+from walking_on_sunshine.common.logging.queue_writer import QueueLoggerFactory, QueueLogWriter
+
 
 def get_logger(name: str) -> BoundLogger:
     return structlog.get_logger(name)
 
 
-def init_logger():
+def set_log_level(level: int):
+    """Change the minimum level of every logger, keeping the rest of the configuration"""
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(level))
+
+
+def init_logger(level: int | None = None, max_field_chars: int = 512):
     """Initialize the logger"""
     if structlog.is_configured():
-        print("Logger already initialized")
+        get_logger(__name__).debug("Logger already initialized")
         return
 
-    shared_processors = [
+    shared_processors: list[structlog.typing.Processor] = [
         structlog.contextvars.merge_contextvars,
+        sample_payloads,
         structlog.processors.add_log_level,
         structlog.dev.set_exc_info,
         structlog.processors.CallsiteParameterAdder(
@@ -24,6 +33,8 @@ def init_logger():
                 structlog.processors.CallsiteParameter.LINENO,
                 structlog.processors.CallsiteParameter.FUNC_NAME,
             },
+            # Report where a timing span was opened, not the span helper itself
+            additional_ignores=["walking_on_sunshine.common.logging.spans", "contextlib"],
         ),
         structlog.stdlib.PositionalArgumentsFormatter(),
         structlog.processors.StackInfoRenderer(),
@@ -32,18 +43,26 @@ def init_logger():
         structlog.processors.TimeStamper(fmt="%Y-%m-%d %H:%M.%S"),
     ]
 
-    processors = []
+    processors: list[structlog.typing.Processor] = []
     if sys.stderr.isatty():
         # Pretty printinm when we run in a terminal session.
         # Automatically prints pretty tracebacks when "rich" is installed
-        processors = [*shared_processors, structlog.dev.ConsoleRenderer()]
+        processors = [*shared_processors]
+        renderer: structlog.typing.Processor = structlog.dev.ConsoleRenderer()
     else:
         # Print JSON when we run, e.g., in a Docker container.
         # Also print structured tracebacks.
         processors = [
             *shared_processors,
             structlog.processors.dict_tracebacks,
-            structlog.processors.JSONRenderer(),
         ]
+        renderer = structlog.processors.JSONRenderer()
 
-    structlog.configure(processors=processors)
+    # Large values (route geometry, base64 map HTML) are summarized and copied on the calling thread;
+    # rendering and writing happen on the log writer thread.
+    processors.append(TruncateFields(max_chars=max_field_chars))
+    structlog.configure(
+        processors=processors,
+        logger_factory=QueueLoggerFactory(QueueLogWriter(renderer)),
+        wrapper_class=structlog.make_filtering_bound_logger(level) if level is not None else None,
+    )
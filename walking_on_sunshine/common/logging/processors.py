@@ -0,0 +1,64 @@
+import random
+
+from structlog import DropEvent
+from structlog.typing import EventDict
+
+# Fraction of events logged with sampled=True that are kept; see set_payload_sample_rate
+_payload_sample_rate = 0.0
+
+
+def set_payload_sample_rate(rate: float) -> None:
+    global _payload_sample_rate
+    _payload_sample_rate = rate
+
+
+def sample_payloads(logger, method_name: str, event_dict: EventDict) -> EventDict:
+    """
+    Keep only a sampled share of events logged with sampled=True, e.g. full response payloads.
+    """
+    if event_dict.pop("sampled", False) and random.random() >= _payload_sample_rate:
+        raise DropEvent
+    return event_dict
+
+
+def _summarize(value, max_chars: int, max_items: int, depth: int):
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        if value.startswith("data:"):
+            return f"<{value[: value.find(',') + 1]} {len(value)} chars>"
+        return f"{value[:max_chars]}...(+{len(value) - max_chars} chars)"
+    if isinstance(value, dict):
+        if depth <= 0:
+            return f"<dict of {len(value)} keys>"
+        items = list(value.items())
+        summary = {str(k): _summarize(v, max_chars, max_items, depth - 1) for k, v in items[:max_items]}
+        if len(items) > max_items:
+            summary["..."] = f"+{len(items) - max_items} keys"
+        return summary
+    if isinstance(value, (list, tuple)):
+        if depth <= 0:
+            return f"<list of {len(value)} items>"
+        summarized = [_summarize(v, max_chars, max_items, depth - 1) for v in value[:max_items]]
+        if len(value) > max_items:
+            summarized.append(f"...(+{len(value) - max_items} items)")
+        return summarized
+    return value
+
+
+class TruncateFields:
+    """
+    Shorten long strings (data URLs become a size note), long lists and deep structures in event values.
+    The result is a fresh copy, so the event is safe to render later on the writer thread.
+    """
+
+    def __init__(self, max_chars: int = 512, max_items: int = 20, max_depth: int = 4):
+        self.max_chars = max_chars
+        self.max_items = max_items
+        self.max_depth = max_depth
+
+    def __call__(self, logger, method_name: str, event_dict: EventDict) -> EventDict:
+        return {
+            key: _summarize(value, self.max_chars, self.max_items, self.max_depth) if key != "exception" else value
+            for key, value in event_dict.items()
+        }
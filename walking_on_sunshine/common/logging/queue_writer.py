@@ -0,0 +1,78 @@
+import atexit
+import queue
+import sys
+import threading
+from collections.abc import Callable
+from typing import TextIO
+
+_STOP = object()
+
+
+class QueueLogWriter:
+    """
+    Renders and writes log events on a background thread, so request threads only enqueue an event dict.
+    When the queue is full, events are dropped and counted instead of blocking the caller.
+    """
+
+    def __init__(self, renderer: Callable, stream: TextIO | None = None, max_queue: int = 10_000):
+        self.renderer = renderer
+        self.stream = stream
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, event_dict: dict) -> None:
+        try:
+            self._queue.put_nowait(event_dict)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            event_dict = self._queue.get()
+            try:
+                if event_dict is _STOP:
+                    return
+                # Resolve the stream late so pytest's capsys and similar redirection keep working
+                stream = self.stream or sys.stdout
+                stream.write(self.renderer(None, event_dict.get("level", "info"), event_dict) + "\n")
+                if self._queue.empty():
+                    stream.flush()
+            except Exception:
+                # Never let a bad event kill the writer thread
+                pass
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every queued event has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout=5)
+
+
+class QueueLogger:
+    """
+    structlog logger that hands the processed event dict to a QueueLogWriter; rendering happens on its thread.
+    """
+
+    def __init__(self, writer: QueueLogWriter):
+        self._writer = writer
+
+    def _submit(self, **event_dict) -> None:
+        self._writer.submit(event_dict)
+
+    msg = log = debug = info = warning = warn = error = err = critical = exception = fatal = _submit
+
+
+class QueueLoggerFactory:
+    def __init__(self, writer: QueueLogWriter):
+        self.writer = writer
+
+    def __call__(self, *args) -> QueueLogger:
+        return QueueLogger(self.writer)
@@ -0,0 +1,82 @@
+import contextvars
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from typing import Any
+
+from walking_on_sunshine.common.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# (stage name, duration in ms) recorded by the current request, None outside of collect_spans()
+_spans: contextvars.ContextVar[list[tuple[str, float]] | None] = contextvars.ContextVar("timing_spans", default=None)
+
+
+@contextmanager
+def collect_spans() -> Iterator[list[tuple[str, float]]]:
+    """
+    Collect the spans recorded inside the block, including those from threads started with submit_with_context.
+    """
+    spans: list[tuple[str, float]] = []
+    token = _spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _spans.reset(token)
+
+
+def record_span(name: str, duration_ms: float) -> None:
+    spans = _spans.get()
+    if spans is not None:
+        spans.append((name, duration_ms))
+
+
+@contextmanager
+def span(name: str, **fields: Any) -> Iterator[None]:
+    """
+    Time the block as stage `name` and log it with any extra fields; the request id comes from the bound context.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        record_span(name, duration_ms)
+        logger.debug("span", span=name, duration_ms=round(duration_ms, 3), **fields)
+
+
+def submit_with_context(executor: Executor, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """
+    executor.submit that runs fn in a copy of the caller's context, so spans and the request id follow it.
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def summarize_spans(spans: list[tuple[str, float]]) -> dict[str, float]:
+    """
+    Total milliseconds per stage, in the order stages first ran.
+    """
+    totals: dict[str, float] = {}
+    for name, duration_ms in spans:
+        totals[name] = totals.get(name, 0.0) + duration_ms
+    return {name: round(total, 1) for name, total in totals.items()}
+
+
+def server_timing(spans: list[tuple[str, float]], total_ms: float | None = None) -> str:
+    """
+    Format spans as a Server-Timing header value. Repeated stages (track pages, candidate directions) are summed,
+    and their count goes in the description.
+    """
+    counts: dict[str, int] = {}
+    for name, _ in spans:
+        counts[name] = counts.get(name, 0) + 1
+    metrics = []
+    for name, total in summarize_spans(spans).items():
+        metric = f"{name};dur={total}"
+        if counts[name] > 1:
+            metric += f';desc="{counts[name]}x"'
+        metrics.append(metric)
+    if total_ms is not None:
+        metrics.append(f"total;dur={round(total_ms, 1)}")
+    return ", ".join(metrics)
@@ -0,0 +1,45 @@
+import pytest
+from structlog import DropEvent
+
+from walking_on_sunshine.common.logging.processors import TruncateFields, sample_payloads, set_payload_sample_rate
+
+
+def test_truncate_fields_summarizes_large_values():
+    result = {
+        "map_embed_html": "data:text/html;base64," + "A" * 5000,
+        "maps_url": "x" * 40,
+        "route_coords": [[float(i), float(i)] for i in range(100)],
+        "nested": {"a": {"b": {"c": {"d": 1}}}},
+    }
+    event = {"event": "payload", "result": result, "exception": "Traceback " + "y" * 1000}
+
+    truncated = TruncateFields(max_chars=32, max_items=3, max_depth=3)(None, "debug", event)
+
+    summary = truncated["result"]
+    assert summary["map_embed_html"] == "<data:text/html;base64, 5022 chars>"
+    assert summary["maps_url"] == "x" * 32 + "...(+8 chars)"
+    assert summary["route_coords"] == [[0.0, 0.0], [1.0, 1.0], [2.0, 2.0], "...(+97 items)"]
+    assert summary["..."] == "+1 keys"
+    assert truncated["exception"] == event["exception"]
+    # The caller's objects are left alone
+    assert len(result["route_coords"]) == 100
+
+
+def test_truncate_fields_limits_depth():
+    truncated = TruncateFields(max_depth=2)(None, "info", {"nested": {"a": {"b": {"c": 1}}, "l": [[1, 2]]}})
+    assert truncated["nested"] == {"a": {"b": "<dict of 1 keys>"}, "l": ["<list of 2 items>"]}
+
+
+@pytest.mark.parametrize("rate,kept", [(0.0, False), (1.0, True)])
+def test_sample_payloads(rate, kept):
+    set_payload_sample_rate(rate)
+    try:
+        if kept:
+            assert sample_payloads(None, "debug", {"event": "payload", "sampled": True}) == {"event": "payload"}
+        else:
+            with pytest.raises(DropEvent):
+                sample_payloads(None, "debug", {"event": "payload", "sampled": True})
+        # Unmarked events are never sampled out
+        assert sample_payloads(None, "info", {"event": "other"}) == {"event": "other"}
+    finally:
+        set_payload_sample_rate(0.0)
@@ -0,0 +1,49 @@
+import io
+import threading
+
+import structlog
+
+from walking_on_sunshine.common.logging.queue_writer import QueueLoggerFactory, QueueLogWriter
+
+
+def test_events_are_rendered_on_the_writer_thread():
+    rendered_on = []
+
+    def renderer(logger, method_name, event_dict):
+        rendered_on.append(threading.current_thread().name)
+        return f"{event_dict['level']} {event_dict['event']}"
+
+    stream = io.StringIO()
+    writer = QueueLogWriter(renderer, stream=stream)
+    logger = structlog.wrap_logger(
+        QueueLoggerFactory(writer)(),
+        processors=[structlog.processors.add_log_level],
+    )
+
+    logger.info("hello")
+    logger.warning("careful")
+    writer.flush()
+    writer.close()
+
+    assert stream.getvalue() == "info hello\nwarning careful\n"
+    assert rendered_on == ["log-writer", "log-writer"]
+
+
+def test_full_queue_drops_instead_of_blocking():
+    release = threading.Event()
+
+    def slow_renderer(logger, method_name, event_dict):
+        release.wait()
+        return event_dict["event"]
+
+    stream = io.StringIO()
+    writer = QueueLogWriter(slow_renderer, stream=stream, max_queue=2)
+    for i in range(10):
+        writer.submit({"event": str(i)})
+    release.set()
+    writer.flush()
+    writer.close()
+
+    # One event was taken by the writer before the queue filled, two more fit in the queue
+    assert writer.dropped == 10 - len(stream.getvalue().split())
+    assert writer.dropped >= 7
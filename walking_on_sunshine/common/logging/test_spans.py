@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import structlog
+
+from walking_on_sunshine.common.logging.spans import (
+    collect_spans,
+    record_span,
+    server_timing,
+    span,
+    submit_with_context,
+    summarize_spans,
+)
+
+
+def test_spans_follow_work_into_executor_threads():
+    def stage():
+        with span("directions"):
+            return structlog.contextvars.get_contextvars().get("request_id")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with structlog.contextvars.bound_contextvars(request_id="abc"), collect_spans() as spans:
+            with span("album_fetch"):
+                pass
+            futures = [submit_with_context(executor, stage) for _ in range(2)]
+            request_ids = [future.result() for future in futures]
+        # Plain submit runs outside the request context
+        with collect_spans() as other:
+            executor.submit(stage).result()
+
+    assert request_ids == ["abc", "abc"]
+    assert [name for name, _ in spans] == ["album_fetch", "directions", "directions"]
+    assert other == []
+
+
+def test_record_span_outside_collection_is_ignored():
+    record_span("geocode", 1.0)
+    with collect_spans() as spans:
+        pass
+    assert spans == []
+
+
+def test_server_timing_sums_repeated_stages():
+    spans = [("album_fetch", 10.04), ("track_page", 5.0), ("track_page", 7.5), ("directions", 300.0)]
+
+    assert summarize_spans(spans) == {"album_fetch": 10.0, "track_page": 12.5, "directions": 300.0}
+    assert server_timing(spans, total_ms=321.26) == (
+        'album_fetch;dur=10.0, track_page;dur=12.5;desc="2x", directions;dur=300.0, total;dur=321.3'
+    )
+    assert server_timing([]) == ""
@@ -0,0 +1,213 @@
+import bisect
+import math
+import threading
+from collections.abc import Callable, Iterable
+
+# Seconds; covers cache hits through slow directions calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# (metric name suffix, labels, value) as rendered on one exposition line
+Sample = tuple[str, dict[str, str], float]
+
+
+class _ThreadShards:
+    """
+    One mutable shard per thread, so recording never takes a shared lock. The lock is only taken once
+    per thread to register its shard, and by collect() to snapshot the list of shards.
+    """
+
+    def __init__(self, factory: Callable[[], dict]):
+        self._factory = factory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: list[dict] = []
+
+    def get(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = self._factory()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def all(self) -> list[dict]:
+        with self._lock:
+            return list(self._shards)
+
+
+def _series_key(item: tuple) -> tuple[str, ...]:
+    return tuple(str(value) for value in item[0])
+
+
+def _label_dict(labelnames: tuple[str, ...], values: tuple) -> dict[str, str]:
+    return dict(zip(labelnames, (str(value) for value in values), strict=True))
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._shards = _ThreadShards(dict)
+
+    def inc(self, *labelvalues, amount: float = 1.0) -> None:
+        shard = self._shards.get()
+        shard[labelvalues] = shard.get(labelvalues, 0.0) + amount
+
+    def _totals(self) -> dict[tuple, float]:
+        totals: dict[tuple, float] = {}
+        for shard in self._shards.all():
+            for labelvalues, value in list(shard.items()):
+                totals[labelvalues] = totals.get(labelvalues, 0.0) + value
+        return totals
+
+    def value(self, *labelvalues) -> float:
+        return self._totals().get(labelvalues, 0.0)
+
+    def collect(self) -> list[Sample]:
+        suffix = "_total" if self.type == "counter" else ""
+        return [
+            (suffix, _label_dict(self.labelnames, lv), value)
+            for lv, value in sorted(self._totals().items(), key=_series_key)
+        ]
+
+
+class Gauge(Counter):
+    """
+    Up/down gauge built from per-thread deltas, e.g. requests in flight. inc and dec may run on different threads.
+    """
+
+    type = "gauge"
+
+    def dec(self, *labelvalues, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _ThreadShards(dict)
+
+    def observe(self, value: float, *labelvalues) -> None:
+        shard = self._shards.get()
+        series = shard.get(labelvalues)
+        if series is None:
+            # per-bucket counts (the last one is +Inf), then sum
+            series = shard[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def collect(self) -> list[Sample]:
+        merged: dict[tuple, list] = {}
+        for shard in self._shards.all():
+            for labelvalues, series in list(shard.items()):
+                total = merged.setdefault(labelvalues, [0] * len(series))
+                for i, value in enumerate(list(series)):
+                    total[i] += value
+
+        samples: list[Sample] = []
+        for labelvalues, series in sorted(merged.items(), key=_series_key):
+            labels = _label_dict(self.labelnames, labelvalues)
+            cumulative = 0
+            for upper, count in zip((*self.buckets, math.inf), series[:-1], strict=True):
+                cumulative += count
+                samples.append(("_bucket", {**labels, "le": _format_value(upper)}, cumulative))
+            samples.append(("_sum", labels, series[-1]))
+            samples.append(("_count", labels, cumulative))
+        return samples
+
+
+class CallbackMetric:
+    """
+    Metric read at scrape time from existing state, e.g. cache stats() counters, so it costs nothing to record.
+    `fn` returns {label values: value}.
+    """
+
+    def __init__(
+        self, name: str, help: str, type: str, labelnames: Iterable[str], fn: Callable[[], dict[tuple, float]]
+    ):
+        self.name = name
+        self.help = help
+        self.type = type
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+
+    def collect(self) -> list[Sample]:
+        suffix = "_total" if self.type == "counter" else ""
+        return [
+            (suffix, _label_dict(self.labelnames, lv), value)
+            for lv, value in sorted(self.fn().items(), key=_series_key)
+        ]
+
+
+Metric = Counter | Gauge | Histogram | CallbackMetric
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(float(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: dict[str, Metric] = {}
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} already registered as {metric.type}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(
+        self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets)
+
+    def render(self, extra: Iterable[Metric] = ()) -> str:
+        """
+        Prometheus text exposition (format 0.0.4) of every registered metric plus `extra`.
+        """
+        with self._lock:
+            metrics = [*self._metrics.values(), *extra]
+
+        lines = []
+        for metric in metrics:
+            # Counter families are named without the _total their samples carry
+            family = metric.name.removesuffix("_total")
+            lines.append(f"# HELP {family} {metric.help}")
+            lines.append(f"# TYPE {family} {metric.type}")
+            for suffix, labels, value in metric.collect():
+                label_str = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                series = f"{family}{suffix}{{{label_str}}}" if label_str else f"{family}{suffix}"
+                lines.append(f"{series} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry served by /metrics
+REGISTRY = Registry()
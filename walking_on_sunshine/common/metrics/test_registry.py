@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from walking_on_sunshine.common.metrics.registry import CallbackMetric, Registry
+from walking_on_sunshine.common.metrics.upstream import UPSTREAM_ERRORS, UPSTREAM_SECONDS, upstream_call
+
+
+def test_counter_sums_per_thread_shards():
+    registry = Registry()
+    counter = registry.counter("jobs_total", "Jobs.", ["kind"])
+
+    def work():
+        for _ in range(1000):
+            counter.inc("a")
+        counter.inc("b", amount=2)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value("a") == 8000
+    assert counter.value("b") == 16
+    assert registry.counter("jobs_total", "Jobs.", ["kind"]) is counter
+
+
+def test_render_exposition_format():
+    registry = Registry()
+    registry.counter("http_requests_total", "Requests.", ["route", "status"]).inc('/say/"hi"', 200)
+    in_flight = registry.gauge("in_flight", "In flight.")
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    histogram = registry.histogram("latency_seconds", "Latency.", ["route"], buckets=[0.1, 1])
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, "/")
+    size = CallbackMetric("cache_entries", "Entries.", "gauge", ["cache"], lambda: {("geocode",): 3})
+
+    assert registry.render([size]) == (
+        "# HELP http_requests Requests.\n"
+        "# TYPE http_requests counter\n"
+        'http_requests_total{route="/say/\\"hi\\"",status="200"} 1\n'
+        "# HELP in_flight In flight.\n"
+        "# TYPE in_flight gauge\n"
+        "in_flight 1\n"
+        "# HELP latency_seconds Latency.\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{route="/",le="0.1"} 2\n'
+        'latency_seconds_bucket{route="/",le="1"} 3\n'
+        'latency_seconds_bucket{route="/",le="+Inf"} 4\n'
+        'latency_seconds_sum{route="/"} 3.65\n'
+        'latency_seconds_count{route="/"} 4\n'
+        "# HELP cache_entries Entries.\n"
+        "# TYPE cache_entries gauge\n"
+        'cache_entries{cache="geocode"} 3\n'
+    )
+
+
+def test_registry_rejects_type_clash():
+    registry = Registry()
+    registry.counter("things_total", "Things.")
+    with pytest.raises(ValueError):
+        registry.gauge("things_total", "Things.")
+
+
+def test_upstream_call_records_latency_and_errors():
+    before = UPSTREAM_ERRORS.value("test", "boom", "RuntimeError")
+
+    with upstream_call("test", "ok"):
+        pass
+    with pytest.raises(RuntimeError), upstream_call("test", "boom"):
+        raise RuntimeError("upstream down")
+
+    assert UPSTREAM_ERRORS.value("test", "boom", "RuntimeError") == before + 1
+    counts = {labels["call"]: value for suffix, labels, value in UPSTREAM_SECONDS.collect() if suffix == "_count"}
+    assert counts["ok"] >= 1 and counts["boom"] >= 1
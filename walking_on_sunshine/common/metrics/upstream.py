@@ -0,0 +1,27 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from walking_on_sunshine.common.metrics.registry import REGISTRY
+
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "upstream_request_duration_seconds", "Latency of calls to Spotify and openrouteservice.", ["upstream", "call"]
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "upstream_errors_total", "Calls to Spotify and openrouteservice that raised.", ["upstream", "call", "error"]
+)
+
+
+@contextmanager
+def upstream_call(upstream: str, call: str) -> Iterator[None]:
+    """
+    Record the latency of one upstream call, and count it as an error by exception type if it raises.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        UPSTREAM_ERRORS.inc(upstream, call, type(e).__name__)
+        raise
+    finally:
+        UPSTREAM_SECONDS.observe(time.perf_counter() - start, upstream, call)
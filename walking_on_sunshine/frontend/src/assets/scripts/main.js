@@ -557,110 +557,102 @@ form.addEventListener('submit', (e) => {
     searchAlbum();
 });
 
-// Core action
-async function searchAlbum() {
-    const albumName = albumInput.value.trim();
-    const startAddress = addrInput.value.trim();
-
-    if (!albumName) {
-        albumInput.focus();
-        return;
+// Reads the NDJSON event stream of /generate_route/stream, calling onEvent(event, data) as each line arrives.
+// Returns the response so callers can check for a rejected request (e.g. 503 at capacity).
+async function streamRoute(params, onEvent) {
+    const response = await fetch(`/generate_route/stream?${params.toString()}`);
+    if (!response.ok || !response.body) {
+        return response;
     }
-    if (!startAddress) {
-        addrInput.focus();
-        return;
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let newline;
+        while ((newline = buffer.indexOf('\n')) >= 0) {
+            const line = buffer.slice(0, newline).trim();
+            buffer = buffer.slice(newline + 1);
+            if (line) {
+                const { event, data } = JSON.parse(line);
+                onEvent(event, data);
+            }
+        }
     }
+    return response;
+}
 
-    resultDiv.style.display = 'block';
-    resultDiv.innerHTML = `<div class="loading">Generating route…</div>`;
-
-    const effectiveAlbumName = selectedAlbum?.name || albumName;
-    const params = new URLSearchParams({
-        album_name: effectiveAlbumName,
-        start_address: startAddress,
-    });
-    if (selectedAlbum?.id) {
-        params.set('album_id', selectedAlbum.id);
+function showAlbumCard(data, name) {
+    if (data.album_image_url && albumArt) {
+        albumArt.src = data.album_image_url;
+        albumArt.alt = `${name} album art`;
+        albumArt.classList.remove('is-placeholder');
+        albumArt.removeAttribute('hidden');
+        albumArtBack?.style.setProperty('background-image', `url("${data.album_image_url}")`);
+        applyAlbumAccent(data.album_image_url);
     }
 
-    submitBtn.disabled = true;
-    try {
-        // Adjust this path if your backend differs
-        const url = `/generate_route?${params.toString()}`;
-        const response = await fetch(url);
-        const data = await response.json();
-
-        if (!response.ok) {
-            const message = data && data.error ? data.error : `Error: ${response.status}`;
-            resultDiv.innerHTML = `<p>${escapeHTML(message)}</p>`;
-            return;
-        }
+    if (albumPreviewTitle && name) {
+        albumPreviewTitle.textContent = name;
+    }
 
-        // Validate & format
-        const name = data.album_name ?? effectiveAlbumName;
+    if (albumPreviewArtist) {
         const artist = data.artist || '';
-        const lengthMin = Number(data.length_minutes);
-        const albumDurationLabel = data.album_duration_label || '';
-        const distanceKm = Number(data.distance_km);
-        const mapsUrl = data.maps_url || '#';
-        const hasMapsLink = !!mapsUrl && mapsUrl !== '#';
-        const resolvedStartAddress = (data.start_address && String(data.start_address).trim()) || startAddress;
-        const trackCount = Number(data.track_count);
-        const releaseYear = data.release_year ? String(data.release_year) : '';
-
-        if (addrInput && resolvedStartAddress) {
-            addrInput.value = resolvedStartAddress;
-        }
-
-        if (data.album_image_url && albumArt) {
-            albumArt.src = data.album_image_url;
-            albumArt.alt = `${name} album art`;
-            albumArt.classList.remove('is-placeholder');
-            albumArt.removeAttribute('hidden');
-            albumArtBack?.style.setProperty('background-image', `url("${data.album_image_url}")`);
-            applyAlbumAccent(data.album_image_url);
-        }
-
-        if (albumPreviewTitle && name) {
-            albumPreviewTitle.textContent = name;
-        }
-
-        if (albumPreviewArtist) {
-            albumPreviewArtist.textContent = artist ? `by ${artist}` : '';
-        }
-
-        const chips = [];
+        albumPreviewArtist.textContent = artist ? `by ${artist}` : '';
+    }
+}
 
-        const detailsExtras = [];
-        if (releaseYear) detailsExtras.push(`<span class="album-detail">${escapeHTML(releaseYear)}</span>`);
-        if (!Number.isNaN(trackCount) && trackCount > 0) {
-            detailsExtras.push(`<span class="album-detail">${escapeHTML(trackCount.toString())} tracks</span>`);
-        }
+// Renders whatever is known so far; later stream events fill in the start, route, maps link and map.
+function renderRouteResult(data, { albumName, startAddress, error = '' }) {
+    const name = data.album_name ?? albumName;
+    const lengthMin = Number(data.length_minutes);
+    const distanceKm = Number(data.distance_km);
+    const mapsUrl = data.maps_url || '#';
+    const hasMapsLink = !!mapsUrl && mapsUrl !== '#';
+    const resolvedStartAddress = (data.start_address && String(data.start_address).trim()) || startAddress;
+    const trackCount = Number(data.track_count);
+    const releaseYear = data.release_year ? String(data.release_year) : '';
+    const routePending = !data.route_id && !error;
+
+    const chips = [];
+
+    const detailsExtras = [];
+    if (releaseYear) detailsExtras.push(`<span class="album-detail">${escapeHTML(releaseYear)}</span>`);
+    if (!Number.isNaN(trackCount) && trackCount > 0) {
+        detailsExtras.push(`<span class="album-detail">${escapeHTML(trackCount.toString())} tracks</span>`);
+    }
 
-        const chipMarkup = chips.map(c => `<span class="chip">${escapeHTML(c)}</span>`).join('');
-        const hasDistance = !Number.isNaN(distanceKm);
-        const hasLength = !Number.isNaN(lengthMin);
-        const previewCoords = Array.isArray(data.route_preview)
-            ? data.route_preview
-                .map((pt) => ({ lat: Number(pt.lat), lon: Number(pt.lon) }))
-                .filter((pt) => Number.isFinite(pt.lat) && Number.isFinite(pt.lon))
-            : [];
-        const canRenderMap = previewCoords.length >= 2;
-        const mapEmbedHtml = typeof data.map_embed_html === 'string' ? data.map_embed_html : '';
-
-        let mapSection;
-        if (mapEmbedHtml) {
-            mapSection = `
+    const chipMarkup = chips.map(c => `<span class="chip">${escapeHTML(c)}</span>`).join('');
+    const hasDistance = !Number.isNaN(distanceKm);
+    const hasLength = !Number.isNaN(lengthMin);
+    const previewCoords = Array.isArray(data.route_preview)
+        ? data.route_preview
+            .map((pt) => ({ lat: Number(pt.lat), lon: Number(pt.lon) }))
+            .filter((pt) => Number.isFinite(pt.lat) && Number.isFinite(pt.lon))
+        : [];
+    const canRenderMap = previewCoords.length >= 2;
+    // Prefer the lazily rendered map endpoint; fall back to an inline embed if the server sent one.
+    const mapEmbedHtml = typeof data.map_url === 'string' && data.map_url
+        ? data.map_url
+        : (typeof data.map_embed_html === 'string' ? data.map_embed_html : '');
+
+    let mapSection;
+    if (mapEmbedHtml) {
+        mapSection = `
         <div class="map-canvas map-canvas--embed">
-          <iframe src="${mapEmbedHtml}" title="Route preview map" loading="lazy" allowfullscreen></iframe>
+          <iframe src="${escapeHTML(mapEmbedHtml)}" title="Route preview map" loading="lazy" allowfullscreen></iframe>
         </div>`;
-        } else if (canRenderMap) {
-            mapSection = `<div id="mapPreview" class="map-canvas" aria-label="Route preview map"></div>`;
-        } else {
-            mapSection = `<div class="map-preview-fallback">Map preview unavailable</div>`;
-        }
+    } else if (canRenderMap) {
+        mapSection = `<div id="mapPreview" class="map-canvas" aria-label="Route preview map"></div>`;
+    } else if (routePending) {
+        mapSection = `<div class="loading">Finding your route…</div>`;
+    } else {
+        mapSection = `<div class="map-preview-fallback">Map preview unavailable</div>`;
+    }
 
-        const albumHeader = `
+    const albumHeader = `
       <div class="album-header">
         <div class="album-header__info">
           <h2>${escapeHTML(name)}</h2>
@@ -668,12 +660,12 @@ async function searchAlbum() {
         </div>
       </div>`;
 
-        resultDiv.innerHTML = `
+    resultDiv.innerHTML = `
       ${albumHeader}
       <div class="stat-row">
         ${chipMarkup}
       </div>
-      ${mapSection}
+      ${error ? `<p>${escapeHTML(error)}</p>` : mapSection}
       <p>Start: ${escapeHTML(resolvedStartAddress)}</p>
       ${hasDistance || hasLength ? `<p>${hasDistance ? `${escapeHTML(distanceKm.toFixed(2))} km` : ''}${hasDistance && hasLength ? ' • ' : ''}${hasLength ? `Approx ${escapeHTML(Math.round(lengthMin))} min` : ''}</p>` : ''}
       ${hasMapsLink ? `<div class="result-actions">
@@ -682,12 +674,72 @@ async function searchAlbum() {
       </div>` : ''}
     `;
 
-        if (!mapEmbedHtml && canRenderMap) {
-            requestAnimationFrame(() => renderRoutePreview('mapPreview', previewCoords));
-        }
+    if (!error && !mapEmbedHtml && canRenderMap) {
+        requestAnimationFrame(() => renderRoutePreview('mapPreview', previewCoords));
+    }
+
+    if (hasMapsLink) {
+        setupCopyRouteButton(mapsUrl);
+    }
+}
+
+// Core action
+async function searchAlbum() {
+    const albumName = albumInput.value.trim();
+    const startAddress = addrInput.value.trim();
+
+    if (!albumName) {
+        albumInput.focus();
+        return;
+    }
+    if (!startAddress) {
+        addrInput.focus();
+        return;
+    }
+
+    resultDiv.style.display = 'block';
+    resultDiv.innerHTML = `<div class="loading">Generating route…</div>`;
+
+    const effectiveAlbumName = selectedAlbum?.name || albumName;
+    const params = new URLSearchParams({
+        album_name: effectiveAlbumName,
+        start_address: startAddress,
+    });
+    if (selectedAlbum?.id) {
+        params.set('album_id', selectedAlbum.id);
+    }
 
-        if (hasMapsLink) {
-            setupCopyRouteButton(mapsUrl);
+    submitBtn.disabled = true;
+    try {
+        // The album card is shown as soon as the Spotify stage is done; the route follows.
+        const data = {};
+        const context = { albumName: effectiveAlbumName, startAddress };
+        const response = await streamRoute(params, (event, payload) => {
+            if (event === 'error') {
+                const message = payload.detail || 'Something went wrong. Please try again.';
+                if (data.album_name) {
+                    renderRouteResult(data, { ...context, error: message });
+                } else {
+                    resultDiv.innerHTML = `<p>${escapeHTML(message)}</p>`;
+                }
+                return;
+            }
+            if (event === 'done') return;
+
+            Object.assign(data, payload);
+            if (event === 'album') {
+                showAlbumCard(data, data.album_name ?? effectiveAlbumName);
+            }
+            if (event === 'start' && addrInput && data.start_address) {
+                addrInput.value = String(data.start_address).trim();
+            }
+            renderRouteResult(data, context);
+        });
+
+        if (!response.ok) {
+            const body = await response.json().catch(() => null);
+            const message = body && (body.detail || body.error) ? (body.detail || body.error) : `Error: ${response.status}`;
+            resultDiv.innerHTML = `<p>${escapeHTML(message)}</p>`;
         }
     } catch (err) {
         resultDiv.innerHTML = `<p>Something went wrong. Please try again.</p>`;
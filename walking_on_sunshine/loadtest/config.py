@@ -0,0 +1,28 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class LatencyConfig(BaseModel):
+    # "fixed" always waits median_ms, "uniform" draws from 0..2 * median_ms,
+    # "lognormal" has the given median and a long tail reaching p99_ms at the 99th percentile
+    distribution: Literal["fixed", "uniform", "lognormal"] = "lognormal"
+    median_ms: float = 80
+    p99_ms: float = 400
+
+
+class UpstreamConfig(BaseModel):
+    latency: LatencyConfig = LatencyConfig()
+    # Share of requests answered with error_status instead of a result
+    error_rate: float = 0.0
+    error_status: int = 500
+
+
+class Config(BaseModel):
+    host: str = "127.0.0.1"
+    spotify_port: int = 8701
+    ors_port: int = 8702
+    api_port: int = 8700
+    spotify: UpstreamConfig = UpstreamConfig(latency=LatencyConfig(median_ms=60, p99_ms=300))
+    ors: UpstreamConfig = UpstreamConfig(latency=LatencyConfig(median_ms=250, p99_ms=1500))
+    seed: int | None = None
@@ -0,0 +1,79 @@
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+_ALBUMS = ["Walking on Sunshine", "Rumours", "Blue", "Abbey Road", "Kind of Blue", "Purple Rain", "Homogenic"]
+_STARTS = ["Ferry Building, San Francisco", "Dolores Park", "37.7694, -122.4862", "Coit Tower", "37.8024, -122.4058"]
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list, 0.0 when it is empty.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies_ms: list[float], statuses: Counter, elapsed_s: float) -> dict:
+    ordered = sorted(latencies_ms)
+    total = sum(statuses.values())
+    return {
+        "requests": total,
+        "ok": statuses.get(200, 0),
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=lambda item: str(item[0]))},
+        "elapsed_s": elapsed_s,
+        "throughput_rps": total / elapsed_s if elapsed_s else 0.0,
+        "p50_ms": percentile(ordered, 50),
+        "p95_ms": percentile(ordered, 95),
+        "p99_ms": percentile(ordered, 99),
+        "max_ms": ordered[-1] if ordered else 0.0,
+    }
+
+
+def route_params(rng: random.Random) -> dict:
+    return {"album_name": rng.choice(_ALBUMS), "start_address": rng.choice(_STARTS)}
+
+
+def run_load(
+    base_url: str,
+    concurrency: int,
+    total_requests: int,
+    path: str = "/generate_route",
+    timeout_s: float = 60.0,
+    seed: int | None = None,
+) -> dict:
+    """
+    Send `total_requests` GETs to `path` from `concurrency` workers, each with its own keep-alive session,
+    and summarize throughput and latency. Timeouts and connection errors are counted under "error".
+    """
+    rng = random.Random(seed)
+    params = [route_params(rng) for _ in range(total_requests)]
+    sessions = threading.local()
+    lock = threading.Lock()
+    latencies_ms: list[float] = []
+    statuses: Counter = Counter()
+
+    def one(request_params: dict) -> None:
+        session = getattr(sessions, "session", None)
+        if session is None:
+            session = sessions.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            status = session.get(base_url.rstrip("/") + path, params=request_params, timeout=timeout_s).status_code
+        except requests.RequestException:
+            status = "error"
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies_ms.append(elapsed_ms)
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load") as pool:
+        list(pool.map(one, params))
+    return summarize(latencies_ms, statuses, time.perf_counter() - started)
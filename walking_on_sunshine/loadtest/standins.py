@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import math
+import random
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from walking_on_sunshine.loadtest.config import LatencyConfig, UpstreamConfig
+
+# Spotify's page size for album tracks
+_TRACK_PAGE_SIZE = 50
+# z-score of the 99th percentile of a standard normal
+_Z_P99 = 2.3263
+
+
+def _stable_int(text: str) -> int:
+    return int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "big")
+
+
+class UpstreamBehaviour:
+    """
+    Draws the latency and failure of each stand-in response from an UpstreamConfig.
+    """
+
+    def __init__(self, config: UpstreamConfig, seed: int | None = None):
+        self.config = config
+        self._rng = random.Random(seed)
+
+    def latency_s(self) -> float:
+        latency: LatencyConfig = self.config.latency
+        if latency.distribution == "fixed":
+            ms = latency.median_ms
+        elif latency.distribution == "uniform":
+            ms = self._rng.uniform(0, 2 * latency.median_ms)
+        else:
+            sigma = math.log(max(latency.p99_ms, latency.median_ms) / latency.median_ms) / _Z_P99
+            ms = self._rng.lognormvariate(math.log(latency.median_ms), sigma)
+        return ms / 1000
+
+    async def respond(self, body: dict) -> JSONResponse:
+        await asyncio.sleep(self.latency_s())
+        if self._rng.random() < self.config.error_rate:
+            return JSONResponse(
+                {"error": {"status": self.config.error_status, "message": "stand-in failure"}},
+                status_code=self.config.error_status,
+            )
+        return JSONResponse(body)
+
+
+def _album(album_id: str) -> dict:
+    """
+    Deterministic fake album: the track count (6..80) and durations are derived from the id,
+    so long albums exercise track paging.
+    """
+    h = _stable_int(album_id)
+    n_tracks = 6 + h % 75
+    return {
+        "id": album_id,
+        "name": f"Stand-in Album {album_id[-6:]}",
+        "artists": [{"name": f"Artist {h % 997}"}],
+        "images": [{"url": f"https://example.com/{album_id}.jpg"}],
+        "release_date": f"{1960 + h % 65}-01-01",
+        "total_tracks": n_tracks,
+        "tracks_ms": [120_000 + (h >> (i % 32)) % 240_000 for i in range(n_tracks)],
+    }
+
+
+def _tracks_page(base_url: str, album: dict, offset: int, limit: int) -> dict:
+    durations = album["tracks_ms"][offset : offset + limit]
+    end = offset + len(durations)
+    next_url = None
+    if end < album["total_tracks"]:
+        next_url = f"{base_url}v1/albums/{album['id']}/tracks?offset={end}&limit={limit}"
+    return {
+        "items": [{"name": f"Track {offset + i + 1}", "duration_ms": ms} for i, ms in enumerate(durations)],
+        "offset": offset,
+        "limit": limit,
+        "total": album["total_tracks"],
+        "next": next_url,
+    }
+
+
+def _album_object(base_url: str, album_id: str) -> dict:
+    album = _album(album_id)
+    tracks = _tracks_page(base_url, album, 0, _TRACK_PAGE_SIZE)
+    return {key: value for key, value in album.items() if key != "tracks_ms"} | {"tracks": tracks}
+
+
+def create_spotify_app(config: UpstreamConfig, seed: int | None = None) -> FastAPI:
+    """
+    Stand-in for the Spotify Web API endpoints the app calls: token, search, album, albums and album tracks.
+    """
+    app = FastAPI()
+    behaviour = UpstreamBehaviour(config, seed)
+
+    @app.post("/api/token")
+    async def token():
+        return JSONResponse({"access_token": "stand-in", "token_type": "Bearer", "expires_in": 3600})
+
+    @app.get("/v1/search")
+    async def search(q: str, limit: int = 10):
+        text = q.removeprefix("album:")
+        items = []
+        for i in range(min(limit, 50)):
+            album_id = f"sa{_stable_int(f'{text}|{i}'):016x}"[:22]
+            album = _album(album_id)
+            items.append(
+                {"id": album_id, "name": f"{text} {i + 1}", "artists": album["artists"], "images": album["images"]}
+            )
+        return await behaviour.respond({"albums": {"items": items, "limit": limit, "total": len(items)}})
+
+    @app.get("/v1/albums/")
+    async def albums(request: Request, ids: str):
+        base_url = str(request.base_url)
+        return await behaviour.respond({"albums": [_album_object(base_url, album_id) for album_id in ids.split(",")]})
+
+    @app.get("/v1/albums/{album_id}")
+    async def album(request: Request, album_id: str):
+        return await behaviour.respond(_album_object(str(request.base_url), album_id))
+
+    @app.get("/v1/albums/{album_id}/tracks")
+    @app.get("/v1/albums/{album_id}/tracks/")
+    async def album_tracks(request: Request, album_id: str, offset: int = 0, limit: int = _TRACK_PAGE_SIZE):
+        return await behaviour.respond(_tracks_page(str(request.base_url), _album(album_id), offset, limit))
+
+    return app
+
+
+def synthetic_loop(lon: float, lat: float, length_m: float, seed: int, n_points: int = 400) -> list[list[float]]:
+    """
+    Closed, wobbly loop through (lon, lat) about `length_m` long, shaped by the seed like an ORS round trip.
+    """
+    rng = random.Random(seed)
+    radius_m = length_m / (2 * math.pi)
+    heading = rng.uniform(0, 2 * math.pi)
+    # Circle centre one radius away from the start, so the loop passes through it
+    m_per_deg_lat = 111_320
+    m_per_deg_lon = m_per_deg_lat * math.cos(math.radians(lat))
+    c_lon = lon + radius_m * math.cos(heading) / m_per_deg_lon
+    c_lat = lat + radius_m * math.sin(heading) / m_per_deg_lat
+    coords = []
+    for i in range(n_points):
+        angle = heading + math.pi + 2 * math.pi * i / (n_points - 1)
+        r = radius_m * (1 + 0.05 * math.sin(5 * angle)) if 0 < i < n_points - 1 else radius_m
+        coords.append([c_lon + r * math.cos(angle) / m_per_deg_lon, c_lat + r * math.sin(angle) / m_per_deg_lat])
+    coords[-1] = list(coords[0])
+    return coords
+
+
+def _feature(lon: float, lat: float, label: str) -> dict:
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [lon, lat]},
+        "properties": {"label": label, "name": label},
+    }
+
+
+def create_ors_app(config: UpstreamConfig, seed: int | None = None) -> FastAPI:
+    """
+    Stand-in for the openrouteservice endpoints the app calls: pelias search and reverse, and round-trip directions.
+    """
+    app = FastAPI()
+    behaviour = UpstreamBehaviour(config, seed)
+
+    @app.get("/geocode/search")
+    async def pelias_search(text: str):
+        h = _stable_int(text.lower())
+        # Spread addresses over a ~10 km square around San Francisco
+        lon = -122.47 + (h % 1000) / 10_000
+        lat = 37.72 + ((h >> 16) % 1000) / 10_000
+        return await behaviour.respond({"type": "FeatureCollection", "features": [_feature(lon, lat, text)]})
+
+    @app.get("/geocode/reverse")
+    async def pelias_reverse(request: Request):
+        lon = float(request.query_params["point.lon"])
+        lat = float(request.query_params["point.lat"])
+        label = f"{lat:.4f}, {lon:.4f} (stand-in)"
+        return await behaviour.respond({"type": "FeatureCollection", "features": [_feature(lon, lat, label)]})
+
+    @app.post("/v2/directions/{profile}/geojson")
+    async def directions(profile: str, request: Request):
+        body = await request.json()
+        lon, lat = body["coordinates"][0]
+        round_trip = body.get("options", {}).get("round_trip", {})
+        coords = synthetic_loop(lon, lat, round_trip.get("length", 2000), round_trip.get("seed") or 0)
+        feature = {"type": "Feature", "geometry": {"type": "LineString", "coordinates": coords}, "properties": {}}
+        return await behaviour.respond({"type": "FeatureCollection", "features": [feature]})
+
+    return app
+
+
+def serve_in_thread(app: FastAPI, host: str, port: int, startup_timeout_s: float = 10.0) -> uvicorn.Server:
+    """
+    Serve a stand-in from a daemon thread and return once it accepts connections; set `should_exit` to stop it.
+    Port 0 picks a free port, see `bound_port`. Raises RuntimeError when the server exits during startup
+    (e.g. the port is taken) or is not up within startup_timeout_s.
+    """
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name=f"standin-{port}", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + startup_timeout_s
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Stand-in on {host}:{port} failed to start; is the port already in use?")
+        if time.monotonic() > deadline:
+            server.should_exit = True
+            raise RuntimeError(f"Stand-in on {host}:{port} did not start within {startup_timeout_s:.0f}s")
+        time.sleep(0.05)
+    return server
+
+
+def bound_port(server: uvicorn.Server) -> int:
+    return server.servers[0].sockets[0].getsockname()[1]
@@ -0,0 +1,91 @@
+from collections import Counter
+
+import pytest
+
+from walking_on_sunshine.app.album_length import AlbumLength
+from walking_on_sunshine.app.geometry import path_length_m
+from walking_on_sunshine.app.path_gen import PathGen
+from walking_on_sunshine.loadtest.config import LatencyConfig, UpstreamConfig
+from walking_on_sunshine.loadtest.driver import percentile, summarize
+from walking_on_sunshine.loadtest.standins import (
+    UpstreamBehaviour,
+    bound_port,
+    create_ors_app,
+    create_spotify_app,
+    serve_in_thread,
+)
+
+_FAST = UpstreamConfig(latency=LatencyConfig(distribution="fixed", median_ms=1))
+
+
+@pytest.fixture(scope="module")
+def spotify_url():
+    server = serve_in_thread(create_spotify_app(_FAST, seed=1), "127.0.0.1", 0)
+    yield f"http://127.0.0.1:{bound_port(server)}"
+    server.should_exit = True
+
+
+@pytest.fixture(scope="module")
+def ors_url():
+    server = serve_in_thread(create_ors_app(_FAST, seed=1), "127.0.0.1", 0)
+    yield f"http://127.0.0.1:{bound_port(server)}"
+    server.should_exit = True
+
+
+# uvicorn calls sys.exit in the server thread when it cannot bind
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_serve_in_thread_raises_when_the_port_is_taken(ors_url):
+    port = int(ors_url.rsplit(":", 1)[1])
+
+    with pytest.raises(RuntimeError, match="failed to start"):
+        serve_in_thread(create_spotify_app(_FAST, seed=1), "127.0.0.1", port, startup_timeout_s=5)
+
+
+def test_album_length_pages_through_spotify_standin(spotify_url, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    al = AlbumLength("id", "secret", api_url=f"{spotify_url}/v1", token_url=f"{spotify_url}/api/token")
+
+    results = al.search_albums("walking on")
+    assert len(results) == 10
+    # Pick an album long enough to need a second track page
+    album_id = next(r["id"] for r in results if al.get_album_details("", album_id=r["id"])["track_count"] > 50)
+    details = al.get_album_details("", album_id=album_id)
+
+    assert details["total_ms"] > 0
+    assert len(al._get_tracks(album_id)) == details["track_count"]
+    assert al.get_many_album_details([album_id])[album_id]["total_ms"] == details["total_ms"]
+    # The stand-in token must not be left in spotipy's file cache for a real server to pick up
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_path_gen_builds_route_from_ors_standin(ors_url):
+    pg = PathGen(key=None, base_url=ors_url)
+
+    start = pg.resolve_start("Dolores Park")
+    route = pg.build_route(start, album_length=30 * 60 * 1000, seed=7)
+
+    assert start["address"] == "Dolores Park"
+    assert route["route_coords"][0] == route["route_coords"][-1]
+    assert path_length_m(route["route_coords"]) == pytest.approx(1250, rel=0.1)
+    assert pg._reverse_geocode(37.77, -122.42).endswith("(stand-in)")
+
+
+def test_behaviour_draws_latency_and_errors():
+    lognormal = UpstreamBehaviour(UpstreamConfig(latency=LatencyConfig(median_ms=100, p99_ms=1000)), seed=3)
+    samples = sorted(lognormal.latency_s() * 1000 for _ in range(5000))
+
+    assert percentile(samples, 50) == pytest.approx(100, rel=0.1)
+    assert percentile(samples, 99) == pytest.approx(1000, rel=0.25)
+
+    uniform = UpstreamBehaviour(UpstreamConfig(latency=LatencyConfig(distribution="uniform", median_ms=10)))
+    assert all(0 <= uniform.latency_s() <= 0.02 for _ in range(100))
+
+
+def test_summarize_reports_percentiles_and_throughput():
+    report = summarize([float(ms) for ms in range(1, 101)], Counter({200: 98, 503: 2}), elapsed_s=4.0)
+
+    assert report["requests"] == 100
+    assert report["ok"] == 98
+    assert report["statuses"] == {"200": 98, "503": 2}
+    assert report["throughput_rps"] == 25.0
+    assert (report["p50_ms"], report["p95_ms"], report["p99_ms"], report["max_ms"]) == (50.0, 95.0, 99.0, 100.0)